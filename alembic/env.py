@@ -13,9 +13,12 @@ load_dotenv()
 config = context.config
 
 # ✅ Override DB URL from environment
+# (same driver as the app: plain postgresql:// URLs are run through psycopg 3)
+from app.db import normalize_database_url
+
 database_url = os.getenv("DATABASE_URL")
 if database_url:
-    config.set_main_option("sqlalchemy.url", database_url)
+    config.set_main_option("sqlalchemy.url", normalize_database_url(database_url))
 
 # ✅ Setup logging
 if config.config_file_name is not None:
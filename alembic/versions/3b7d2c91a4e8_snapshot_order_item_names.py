@@ -0,0 +1,47 @@
+"""snapshot order item names
+
+Revision ID: 3b7d2c91a4e8
+Revises: eac8b59f0fe6
+Create Date: 2026-10-19 10:12:44.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7d2c91a4e8'
+down_revision: Union[str, Sequence[str], None] = 'eac8b59f0fe6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('order_items', sa.Column('item_name', sa.String(), nullable=True))
+    op.add_column('order_items', sa.Column('category_name', sa.String(), nullable=True))
+
+    # Backfill existing lines from the live menu; lines whose item is already gone stay NULL
+    op.execute(
+        """
+        UPDATE order_items
+        SET item_name = (
+                SELECT menu_items.name FROM menu_items
+                WHERE menu_items.id = order_items.menu_item_id
+            ),
+            category_name = (
+                SELECT food_categories.name FROM menu_items
+                JOIN food_categories ON food_categories.id = menu_items.food_category_id
+                WHERE menu_items.id = order_items.menu_item_id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('order_items') as batch_op:
+        batch_op.drop_column('category_name')
+        batch_op.drop_column('item_name')
@@ -0,0 +1,58 @@
+"""unique table numbers
+
+Revision ID: 3f9b0d6a1c27
+Revises: 0c7a5d3e81f9
+Create Date: 2026-10-19 20:12:48.603417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9b0d6a1c27'
+down_revision: Union[str, Sequence[str], None] = '0c7a5d3e81f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = ['admin_id', 'table_number']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Duplicates may already carry orders and printed QR codes, so they are
+    # not merged here: the restaurant has to renumber them first
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT admin_id, table_number, COUNT(*) FROM tables "
+        "GROUP BY admin_id, table_number HAVING COUNT(*) > 1"
+    )).all()
+    if duplicates:
+        listed = ", ".join(f"admin {admin_id} table {number} (x{count})" for admin_id, number, count in duplicates)
+        raise RuntimeError(f"Renumber duplicate tables before upgrading: {listed}")
+
+    if op.get_bind().dialect.name == "postgresql":
+        # Build the unique index before dropping the plain one, so lookups
+        # never lose their index; CONCURRENTLY needs to run outside a transaction
+        with op.get_context().autocommit_block():
+            op.create_index('uq_tables_admin_id_table_number', 'tables', COLUMNS, unique=True,
+                            postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index('ix_tables_admin_id_table_number', table_name='tables',
+                          postgresql_concurrently=True, if_exists=True)
+    else:
+        op.create_index('uq_tables_admin_id_table_number', 'tables', COLUMNS, unique=True)
+        op.drop_index('ix_tables_admin_id_table_number', table_name='tables')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index('ix_tables_admin_id_table_number', 'tables', COLUMNS, unique=False,
+                            postgresql_concurrently=True, if_not_exists=True)
+            op.drop_index('uq_tables_admin_id_table_number', table_name='tables',
+                          postgresql_concurrently=True, if_exists=True)
+    else:
+        op.create_index('ix_tables_admin_id_table_number', 'tables', COLUMNS, unique=False)
+        op.drop_index('uq_tables_admin_id_table_number', table_name='tables')
@@ -0,0 +1,30 @@
+"""purge job heartbeat
+
+Revision ID: 4a8c2f7e6b90
+Revises: e27b5c8a4d19
+Create Date: 2026-10-20 11:20:37.405118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4a8c2f7e6b90'
+down_revision: Union[str, Sequence[str], None] = 'e27b5c8a4d19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('tenant_purge_jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tenant_purge_jobs', schema=None) as batch_op:
+        batch_op.drop_column('heartbeat_at')
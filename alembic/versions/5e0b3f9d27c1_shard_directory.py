@@ -0,0 +1,59 @@
+"""shard directory
+
+Revision ID: 5e0b3f9d27c1
+Revises: c52e9a17d3f0
+Create Date: 2026-10-19 15:02:41.308117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b3f9d27c1'
+down_revision: Union[str, Sequence[str], None] = 'c52e9a17d3f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tenant_shards',
+    sa.Column('admin_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.String(), nullable=False),
+    sa.Column('moving', sa.Boolean(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['admin_id'], ['admins.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('admin_id')
+    )
+    op.create_table('table_directory',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('admin_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['admin_id'], ['admins.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_table_directory_admin_id'), 'table_directory', ['admin_id'], unique=False)
+
+    # Existing tables keep their ids; new ones are numbered after them
+    op.execute(
+        """
+        INSERT INTO table_directory (id, admin_id)
+        SELECT id, admin_id FROM tables WHERE admin_id IS NOT NULL
+        """
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            """
+            SELECT setval(pg_get_serial_sequence('table_directory', 'id'),
+                          GREATEST((SELECT COALESCE(MAX(id), 0) FROM table_directory), 1))
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_table_directory_admin_id'), table_name='table_directory')
+    op.drop_table('table_directory')
+    op.drop_table('tenant_shards')
@@ -0,0 +1,75 @@
+"""table sessions
+
+Revision ID: 6b2e94f0c3d8
+Revises: d18f6a2c9e57
+Create Date: 2026-10-19 18:24:58.601866
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b2e94f0c3d8'
+down_revision: Union[str, Sequence[str], None] = 'd18f6a2c9e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('table_sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('admin_id', sa.Integer(), nullable=False),
+    sa.Column('table_id', sa.Integer(), nullable=True),
+    sa.Column('table_number', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('subtotal', sa.Float(), nullable=False),
+    sa.Column('tax_rate', sa.Float(), nullable=False),
+    sa.Column('tax', sa.Float(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('opened_at', sa.DateTime(), nullable=True),
+    sa.Column('closed_at', sa.DateTime(), nullable=True),
+    sa.Column('snapshot', sa.JSON(), nullable=True),
+    sa.ForeignKeyConstraint(['admin_id'], ['admins.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['table_id'], ['tables.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_table_sessions_admin_id'), 'table_sessions', ['admin_id'], unique=False)
+    op.create_index(op.f('ix_table_sessions_id'), 'table_sessions', ['id'], unique=False)
+    op.create_index('uq_table_sessions_open_table_id', 'table_sessions', ['table_id'], unique=True, sqlite_where=sa.text("status = 'open'"), postgresql_where=sa.text("status = 'open'"))
+    op.create_table('table_session_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.Integer(), nullable=False),
+    sa.Column('item_name', sa.String(), nullable=True),
+    sa.Column('selected_type', sa.String(), nullable=False),
+    sa.Column('unit_price', sa.Float(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['table_sessions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_table_session_items_id'), 'table_session_items', ['id'], unique=False)
+    op.create_index(op.f('ix_table_session_items_session_id'), 'table_session_items', ['session_id'], unique=False)
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('table_session_id', sa.Integer(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_orders_table_session_id'), ['table_session_id'], unique=False)
+        batch_op.create_foreign_key('fk_orders_table_session_id', 'table_sessions', ['table_session_id'], ['id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_orders_table_session_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_orders_table_session_id'))
+        batch_op.drop_column('table_session_id')
+    op.drop_index(op.f('ix_table_session_items_session_id'), table_name='table_session_items')
+    op.drop_index(op.f('ix_table_session_items_id'), table_name='table_session_items')
+    op.drop_table('table_session_items')
+    op.drop_index('uq_table_sessions_open_table_id', table_name='table_sessions', sqlite_where=sa.text("status = 'open'"), postgresql_where=sa.text("status = 'open'"))
+    op.drop_index(op.f('ix_table_sessions_id'), table_name='table_sessions')
+    op.drop_index(op.f('ix_table_sessions_admin_id'), table_name='table_sessions')
+    op.drop_table('table_sessions')
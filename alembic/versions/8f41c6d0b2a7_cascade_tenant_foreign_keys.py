@@ -0,0 +1,73 @@
+"""cascade tenant foreign keys and tenant purge jobs
+
+Revision ID: 8f41c6d0b2a7
+Revises: 3b7d2c91a4e8
+Create Date: 2026-10-19 11:02:17.540921
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f41c6d0b2a7'
+down_revision: Union[str, Sequence[str], None] = '3b7d2c91a4e8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, referred table, ondelete)
+FOREIGN_KEYS = [
+    ('food_categories', 'admin_id', 'admins', 'CASCADE'),
+    ('tables', 'admin_id', 'admins', 'CASCADE'),
+    ('menu_items', 'admin_id', 'admins', 'CASCADE'),
+    ('menu_items', 'food_category_id', 'food_categories', 'CASCADE'),
+    ('orders', 'admin_id', 'admins', 'CASCADE'),
+    ('menu_item_quantity_prices', 'menu_item_id', 'menu_items', 'CASCADE'),
+    ('order_items', 'order_id', 'orders', 'CASCADE'),
+    ('order_items', 'menu_item_id', 'menu_items', 'SET NULL'),
+]
+
+# The initial migration left these FKs unnamed. Postgres named them
+# <table>_<column>_fkey; on SQLite batch mode names reflected FKs with this convention.
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def _replace_foreign_keys(ondelete_for) -> None:
+    for table, column, referred, ondelete in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete_for(ondelete))
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('admins', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_table('tenant_purge_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('admin_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('current_step', sa.String(), nullable=True),
+    sa.Column('deleted_rows', sa.Integer(), nullable=False),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_tenant_purge_jobs_id'), 'tenant_purge_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_tenant_purge_jobs_admin_id'), 'tenant_purge_jobs', ['admin_id'], unique=False)
+
+    _replace_foreign_keys(lambda ondelete: ondelete)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_foreign_keys(lambda ondelete: None)
+
+    op.drop_index(op.f('ix_tenant_purge_jobs_admin_id'), table_name='tenant_purge_jobs')
+    op.drop_index(op.f('ix_tenant_purge_jobs_id'), table_name='tenant_purge_jobs')
+    op.drop_table('tenant_purge_jobs')
+    with op.batch_alter_table('admins') as batch_op:
+        batch_op.drop_column('deleted_at')
@@ -0,0 +1,55 @@
+"""menu change versions
+
+Revision ID: 9d4e6b1f0a35
+Revises: 3f9b0d6a1c27
+Create Date: 2026-10-20 10:14:52.381906
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4e6b1f0a35'
+down_revision: Union[str, Sequence[str], None] = '3f9b0d6a1c27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('menu_change_sequences',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('admin_id', sa.Integer(), nullable=False),
+    sa.Column('last_seq', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['admin_id'], ['admins.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('admin_id')
+    )
+
+    # Existing rows keep their id as version, so the `since` clients already
+    # hold stays valid; each tenant's counter continues from its highest id
+    with op.batch_alter_table('menu_changes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=True))
+    op.execute("UPDATE menu_changes SET version = id")
+    op.execute(
+        """
+        INSERT INTO menu_change_sequences (admin_id, last_seq)
+        SELECT admin_id, MAX(id) FROM menu_changes GROUP BY admin_id
+        """
+    )
+    with op.batch_alter_table('menu_changes', schema=None) as batch_op:
+        batch_op.alter_column('version', existing_type=sa.Integer(), nullable=False)
+        batch_op.drop_index('ix_menu_changes_admin_id_id')
+        batch_op.create_index('uq_menu_changes_admin_id_version', ['admin_id', 'version'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('menu_changes', schema=None) as batch_op:
+        batch_op.drop_index('uq_menu_changes_admin_id_version')
+        batch_op.create_index('ix_menu_changes_admin_id_id', ['admin_id', 'id'], unique=False)
+        batch_op.drop_column('version')
+    op.drop_table('menu_change_sequences')
@@ -0,0 +1,38 @@
+"""order version
+
+Revision ID: a7c3e18b5d42
+Revises: 5e0b3f9d27c1
+Create Date: 2026-10-19 16:21:09.554372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e18b5d42'
+down_revision: Union[str, Sequence[str], None] = '5e0b3f9d27c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+    # Statuses used to be free text; fold case and stray spaces onto the defined values
+    op.execute(
+        """
+        UPDATE orders SET status = LOWER(TRIM(status))
+        WHERE LOWER(TRIM(status)) IN ('pending', 'accepted', 'preparing', 'ready', 'served', 'completed', 'cancelled')
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('orders', schema=None) as batch_op:
+        batch_op.drop_column('version')
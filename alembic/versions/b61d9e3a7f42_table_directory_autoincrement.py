@@ -0,0 +1,35 @@
+"""table directory autoincrement
+
+Revision ID: b61d9e3a7f42
+Revises: 4a8c2f7e6b90
+Create Date: 2026-10-20 11:48:09.226153
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b61d9e3a7f42'
+down_revision: Union[str, Sequence[str], None] = '4a8c2f7e6b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Without AUTOINCREMENT SQLite hands out MAX(id) + 1, so deleting the newest
+    # table frees its id for the next one. Postgres sequences never go back.
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table('table_directory', recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': True}) as batch_op:
+            pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table('table_directory', recreate='always') as batch_op:
+            pass
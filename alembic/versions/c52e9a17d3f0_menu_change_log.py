@@ -0,0 +1,57 @@
+"""menu change log
+
+Revision ID: c52e9a17d3f0
+Revises: 8f41c6d0b2a7
+Create Date: 2026-10-19 11:48:03.772615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c52e9a17d3f0'
+down_revision: Union[str, Sequence[str], None] = '8f41c6d0b2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('menu_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('admin_id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['admin_id'], ['admins.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_menu_changes_admin_id_id', 'menu_changes', ['admin_id', 'id'], unique=False)
+
+    # Seed one upsert per existing row so `since=0` returns the full current menu
+    op.execute(
+        """
+        INSERT INTO menu_changes (admin_id, entity, entity_id, op, created_at)
+        SELECT admin_id, 'food_category', id, 'upsert', CURRENT_TIMESTAMP
+        FROM food_categories WHERE admin_id IS NOT NULL
+        ORDER BY id
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO menu_changes (admin_id, entity, entity_id, op, created_at)
+        SELECT admin_id, 'menu_item', id, 'upsert', CURRENT_TIMESTAMP
+        FROM menu_items WHERE admin_id IS NOT NULL
+        ORDER BY id
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_menu_changes_admin_id_id', table_name='menu_changes')
+    op.drop_table('menu_changes')
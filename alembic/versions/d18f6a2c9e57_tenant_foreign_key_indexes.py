@@ -0,0 +1,55 @@
+"""tenant foreign key indexes
+
+Revision ID: d18f6a2c9e57
+Revises: a7c3e18b5d42
+Create Date: 2026-10-19 17:05:33.918204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd18f6a2c9e57'
+down_revision: Union[str, Sequence[str], None] = 'a7c3e18b5d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_food_categories_admin_id_name', 'food_categories', ['admin_id', 'name']),
+    ('ix_menu_items_admin_id', 'menu_items', ['admin_id']),
+    ('ix_menu_items_food_category_id', 'menu_items', ['food_category_id']),
+    ('ix_menu_item_quantity_prices_menu_item_id', 'menu_item_quantity_prices', ['menu_item_id']),
+    ('ix_tables_admin_id_table_number', 'tables', ['admin_id', 'table_number']),
+    ('ix_orders_admin_id_created_at', 'orders', ['admin_id', 'created_at']),
+    ('ix_orders_table_id', 'orders', ['table_id']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_order_items_menu_item_id', 'order_items', ['menu_item_id']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        # CONCURRENTLY keeps the tables writable while the index builds, but
+        # cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,38 @@
+"""orders.table_id set null
+
+Revision ID: e27b5c8a4d19
+Revises: 9d4e6b1f0a35
+Create Date: 2026-10-20 10:48:06.729114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e27b5c8a4d19'
+down_revision: Union[str, Sequence[str], None] = '9d4e6b1f0a35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Left unnamed by the initial migration; see 8f41c6d0b2a7
+NAMING_CONVENTION = {"fk": "%(table_name)s_%(column_0_name)s_fkey"}
+
+
+def _replace_foreign_key(ondelete) -> None:
+    with op.batch_alter_table('orders', naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint('orders_table_id_fkey', type_='foreignkey')
+        batch_op.create_foreign_key('orders_table_id_fkey', 'tables', ['table_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Deleting a table keeps its order history, detached from the table
+    _replace_foreign_key('SET NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_foreign_key(None)
@@ -0,0 +1,123 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# All limits are per worker process
+IP_RATE_PER_MINUTE = float(os.getenv("IP_RATE_PER_MINUTE", 120))
+IP_BURST = float(os.getenv("IP_BURST", 30))
+TENANT_RATE_PER_MINUTE = float(os.getenv("TENANT_RATE_PER_MINUTE", 1200))
+TENANT_BURST = float(os.getenv("TENANT_BURST", 200))
+
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 64))
+QUEUE_WAIT_BUDGET_MS = int(os.getenv("QUEUE_WAIT_BUDGET_MS", 500))
+
+# Only honour X-Forwarded-For behind a proxy that sets it (e.g. Render)
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "false").lower() == "true"
+# Proxies in front of us that append to X-Forwarded-For; Render has one. Entries
+# left of those are whatever the client sent and cannot be trusted
+TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", 1))
+
+# Paths never queued or shed, so orchestration can always see the worker
+UNLIMITED_PATH_PREFIXES = ("/health",)
+
+
+class TokenBucketLimiter:
+    """Token buckets keyed by client or tenant; the least recently seen keys are evicted."""
+
+    def __init__(self, rate_per_minute: float, burst: float, max_keys: int = 10000):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()   # key -> (tokens, last refill)
+        self._lock = threading.Lock()
+
+    def acquire(self, key) -> float:
+        """Take one token; returns 0 if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, last = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - last) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+ip_limiter = TokenBucketLimiter(IP_RATE_PER_MINUTE, IP_BURST)
+tenant_limiter = TokenBucketLimiter(TENANT_RATE_PER_MINUTE, TENANT_BURST)
+
+
+def _too_many_requests(wait: float, detail: str):
+    raise HTTPException(
+        status_code=429,
+        detail=detail,
+        headers={"Retry-After": str(max(1, int(wait + 0.999)))},
+    )
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_PROXY_HEADERS:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            # Counted from the right: the client can prepend anything, but not what our proxies append
+            hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+            if hops:
+                return hops[-min(TRUSTED_PROXY_HOPS, len(hops))]
+    return request.client.host if request.client else "unknown"
+
+
+def limit_by_ip(request: Request):
+    """Route dependency for unauthenticated endpoints."""
+    wait = ip_limiter.acquire(client_ip(request))
+    if wait:
+        _too_many_requests(wait, "Too many requests, slow down.")
+
+
+def check_tenant(admin_id: int):
+    """Call once the tenant behind a public request is known (e.g. from table_id)."""
+    wait = tenant_limiter.acquire(admin_id)
+    if wait:
+        _too_many_requests(wait, "This restaurant is receiving too many requests, retry shortly.")
+
+
+class ConcurrencyLimitMiddleware:
+    """Caps in-flight requests; a request that waits longer than the budget gets 503."""
+
+    def __init__(self, app, max_concurrent: int = MAX_CONCURRENT_REQUESTS, queue_wait_budget_ms: int = QUEUE_WAIT_BUDGET_MS):
+        self.app = app
+        self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.queue_wait_budget = queue_wait_budget_ms / 1000.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(UNLIMITED_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), timeout=self.queue_wait_budget)
+        except asyncio.TimeoutError:
+            response = JSONResponse(
+                status_code=503,
+                content={"detail": "Server busy, retry shortly."},
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.semaphore.release()
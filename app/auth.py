@@ -1,12 +1,15 @@
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from app.db import SessionLocal
+from app import statements
+from app.db import SessionLocal, get_db
 from app.models import Admin
+import math
 import os
+import time
 from dotenv import load_dotenv
 
 # ---------- Load Environment Variables ----------
@@ -19,6 +22,14 @@ SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY")
 FROM_EMAIL = os.getenv("FROM_EMAIL")
 
 # ---------- Password Hashing ----------
+# bcrypt rounds are picked at startup so one hash takes about this long on this hardware
+PASSWORD_HASH_TARGET_MS = float(os.getenv("PASSWORD_HASH_TARGET_MS", 250))
+PASSWORD_HASH_MIN_ROUNDS = int(os.getenv("PASSWORD_HASH_MIN_ROUNDS", 10))
+PASSWORD_HASH_MAX_ROUNDS = int(os.getenv("PASSWORD_HASH_MAX_ROUNDS", 16))
+# Set to skip the benchmark, e.g. when workers on one box start together and skew it
+PASSWORD_HASH_ROUNDS = os.getenv("PASSWORD_HASH_ROUNDS")
+BENCHMARK_ROUNDS = 8   # each extra round doubles the cost, so a cheap probe is enough
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def hash_password(password: str) -> str:
@@ -27,6 +38,46 @@ def hash_password(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def tune_password_hashing() -> int:
+    """Pick bcrypt rounds for PASSWORD_HASH_TARGET_MS and apply them to pwd_context."""
+    if PASSWORD_HASH_ROUNDS:
+        rounds = int(PASSWORD_HASH_ROUNDS)
+    else:
+        probe = pwd_context.handler("bcrypt").using(rounds=BENCHMARK_ROUNDS)
+        best = min(_time_hash(probe) for _ in range(3))
+        rounds = BENCHMARK_ROUNDS + math.floor(math.log2(PASSWORD_HASH_TARGET_MS / 1000 / best))
+        rounds = max(PASSWORD_HASH_MIN_ROUNDS, min(PASSWORD_HASH_MAX_ROUNDS, rounds))
+
+    # Hashes outside [rounds, rounds + 1] are redone at the next login. The extra
+    # round stops workers that land either side of a boundary from undoing each other
+    pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds, bcrypt__max_rounds=rounds + 1)
+    print(f"✅ Password hashing: bcrypt with {rounds} rounds")
+    return rounds
+
+def _time_hash(handler) -> float:
+    started = time.perf_counter()
+    handler.hash("benchmark")
+    return time.perf_counter() - started
+
+def verify_password_for_rehash(plain_password: str, hashed_password: str):
+    """(valid, needs_rehash). passlib's verify_and_update would also compute the
+    new hash right here; rehash_password does that after the response instead."""
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False, False
+    return True, pwd_context.needs_update(hashed_password)
+
+def rehash_password(admin_id: int, plain_password: str, old_hash: str):
+    """Store a hash with the current rounds, unless the password changed meanwhile."""
+    db = SessionLocal()
+    try:
+        db.query(Admin).filter(
+            Admin.id == admin_id,
+            Admin.hashed_password == old_hash
+        ).update({Admin.hashed_password: hash_password(plain_password)}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
 # ---------- JWT Token Handling ----------
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
@@ -37,16 +88,9 @@ def create_access_token(data: dict) -> str:
 # ---------- OAuth2 Dependency ----------
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
-# ---------- Database Dependency ----------
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # ---------- Admin Authentication ----------
 def get_current_admin(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> Admin:
@@ -63,9 +107,12 @@ def get_current_admin(
     except JWTError:
         raise credentials_exception
 
-    admin = db.query(Admin).filter(Admin.email == email).first()
+    admin = db.scalars(statements.active_admin_by_email(email)).first()
     if not admin:
         raise credentials_exception
+
+    # Lets read-only sessions honour read-your-writes for this admin
+    request.state.admin_id = admin.id
     return admin
 
 # ---------- Superuser Access Control ----------
@@ -0,0 +1,219 @@
+import os
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from pytz import timezone
+
+from app.models import (
+    Order, OrderItem, OrderStatus, Table, TableSession, TableSessionItem, TableSessionStatus, ist_now
+)
+
+load_dotenv()
+
+# Applied to every new bill; a bill keeps the rate it was opened with
+BILL_TAX_RATE = float(os.getenv("BILL_TAX_RATE", 0.05))
+
+IST = timezone("Asia/Kolkata")
+
+OPEN = TableSessionStatus.open.value
+CLOSED = TableSessionStatus.closed.value
+
+
+def _ist_wall_clock() -> datetime:
+    # Bill times are naive IST wall-clock time. An aware value would be sent as
+    # timestamptz and stored in the session's time zone (UTC on most Postgres)
+    return ist_now().replace(tzinfo=None)
+
+
+def _timestamp(value):
+    if not value:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(IST).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def _type_value(selected_type) -> str:
+    return getattr(selected_type, "value", selected_type)
+
+
+def _bill_lines(items) -> dict:
+    """(item name, size, unit price) -> [quantity, amount] for order items."""
+    lines = {}
+    for item in items:
+        line = lines.setdefault((item.item_name, _type_value(item.selected_type), item.price_at_order), [0, 0.0])
+        line[0] += item.quantity
+        line[1] += item.quantity * item.price_at_order
+    return lines
+
+
+# ---------- RUNNING TOTALS ----------
+
+def open_bill_ids(db: Session, orders) -> list:
+    """Open bill id for each pending order's table, opening bills where needed.
+
+    Call before writing anything else in the transaction: losing the race to
+    open a bill rolls it back. The bills stay locked until commit, so a
+    close-out cannot slip in between an order and its charge. Rows are locked
+    in id order, so two batches spanning the same tables cannot deadlock."""
+    table_ids = {order.table_id for order in orders}
+    for attempt in (1, 2):
+        bill_ids = dict(
+            db.query(TableSession.table_id, TableSession.id).filter(
+                TableSession.table_id.in_(table_ids),
+                TableSession.status == OPEN,
+            ).order_by(TableSession.id).with_for_update()
+        )
+        missing = table_ids - bill_ids.keys()
+        if missing:
+            admin_ids = {order.table_id: order.admin_id for order in orders}
+            numbers = dict(db.query(Table.id, Table.table_number).filter(Table.id.in_(missing)))
+            new_bills = {
+                table_id: TableSession(
+                    admin_id=admin_ids[table_id], table_id=table_id, table_number=numbers.get(table_id),
+                    status=OPEN, order_count=0, subtotal=0, tax_rate=BILL_TAX_RATE, tax=0, total=0,
+                    opened_at=_ist_wall_clock(),
+                )
+                for table_id in sorted(missing)
+            }
+            db.add_all(new_bills.values())
+            try:
+                db.flush()
+            except IntegrityError:
+                # Another order opened one of these bills first: start over and lock theirs
+                db.rollback()
+                if attempt == 2:
+                    raise
+                continue
+            bill_ids.update({table_id: bill.id for table_id, bill in new_bills.items()})
+        return [bill_ids[order.table_id] for order in orders]
+
+
+def charge(db: Session, bill_id: int, items, order_count: int, sign: int = 1) -> bool:
+    """Add (sign=1) or take back (sign=-1) orders and their items on an open bill.
+
+    Runs as in-place increments; closed bills are never changed. The caller commits."""
+    lines = _bill_lines(items)
+    amount = sign * sum(line_amount for _, line_amount in lines.values())
+
+    charged = db.execute(
+        update(TableSession)
+        .where(TableSession.id == bill_id, TableSession.status == OPEN)
+        .values(
+            order_count=TableSession.order_count + sign * order_count,
+            subtotal=TableSession.subtotal + amount,
+            tax=(TableSession.subtotal + amount) * TableSession.tax_rate,
+            total=(TableSession.subtotal + amount) * (1 + TableSession.tax_rate),
+        )
+        .returning(TableSession.id)
+    ).scalar()
+    if charged is None:
+        return False
+
+    for (item_name, selected_type, unit_price), (quantity, line_amount) in lines.items():
+        name_matches = TableSessionItem.item_name.is_(None) if item_name is None else TableSessionItem.item_name == item_name
+        updated = db.execute(
+            update(TableSessionItem)
+            .where(
+                TableSessionItem.session_id == bill_id,
+                name_matches,
+                TableSessionItem.selected_type == selected_type,
+                TableSessionItem.unit_price == unit_price,
+            )
+            .values(
+                quantity=TableSessionItem.quantity + sign * quantity,
+                amount=TableSessionItem.amount + sign * line_amount,
+            )
+        ).rowcount
+        if not updated and sign > 0:
+            db.execute(insert(TableSessionItem).values(
+                session_id=bill_id, item_name=item_name, selected_type=selected_type,
+                unit_price=unit_price, quantity=quantity, amount=line_amount,
+            ))
+    if sign < 0:
+        db.execute(delete(TableSessionItem).where(
+            TableSessionItem.session_id == bill_id, TableSessionItem.quantity <= 0
+        ))
+    return True
+
+
+def remove_orders(db: Session, order_ids):
+    """Take cancelled or deleted orders back off their open bills. Call before deleting them."""
+    orders = db.query(Order.id, Order.table_session_id).filter(
+        Order.id.in_(order_ids),
+        Order.table_session_id.isnot(None),
+    ).all()
+    if not orders:
+        return
+    items = db.query(OrderItem).filter(OrderItem.order_id.in_([order.id for order in orders])).all()
+
+    for bill_id in sorted({order.table_session_id for order in orders}):
+        bill_order_ids = {order.id for order in orders if order.table_session_id == bill_id}
+        charge(
+            db, bill_id,
+            [item for item in items if item.order_id in bill_order_ids],
+            len(bill_order_ids), sign=-1,
+        )
+
+
+# ---------- READ / CLOSE ----------
+
+def bill_out(bill: TableSession) -> dict:
+    """The bill as returned by the API: one row plus one per distinct dish, whatever the order count."""
+    if bill.snapshot is not None:
+        # Keyed by the current id: moving a tenant to another shard renumbers bills
+        return {**bill.snapshot, "id": bill.id}
+    subtotal, tax = round(bill.subtotal, 2), round(bill.tax, 2)
+    return {
+        "id": bill.id,
+        "table_id": bill.table_id,
+        "table_number": bill.table_number,
+        "status": bill.status,
+        "order_count": bill.order_count,
+        "subtotal": subtotal,
+        "tax_rate": bill.tax_rate,
+        "tax": tax,
+        "total": round(subtotal + tax, 2),
+        "opened_at": _timestamp(bill.opened_at),
+        "closed_at": _timestamp(bill.closed_at),
+        "items": [
+            {
+                "item_name": item.item_name,
+                "selected_type": item.selected_type,
+                "unit_price": item.unit_price,
+                "quantity": item.quantity,
+                "amount": round(item.amount, 2),
+            }
+            for item in sorted(bill.items, key=lambda item: item.id)
+        ],
+    }
+
+
+def close_bill(db: Session, admin_id: int, bill_id: int) -> dict:
+    bill = db.query(TableSession).filter(
+        TableSession.id == bill_id,
+        TableSession.admin_id == admin_id,
+    ).with_for_update().first()
+    if not bill:
+        raise HTTPException(status_code=404, detail="Bill not found")
+    if bill.status != OPEN:
+        raise HTTPException(status_code=409, detail=f"Bill {bill_id} is already closed.")
+
+    bill.status = CLOSED
+    bill.closed_at = _ist_wall_clock()
+    snapshot = bill_out(bill)
+    # Cancelled orders were taken off the bill, so they are not part of what was paid
+    snapshot["order_ids"] = [
+        order_id for order_id, in
+        db.query(Order.id).filter(
+            Order.table_session_id == bill_id,
+            Order.status != OrderStatus.cancelled.value,
+        ).order_by(Order.id)
+    ]
+    bill.snapshot = snapshot
+    db.commit()
+    return snapshot
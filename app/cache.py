@@ -0,0 +1,395 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# memory://  |  sqlite:///./cache.db  |  redis://[:password@]host:6379/0
+CACHE_URL = os.getenv("CACHE_URL", "memory://")
+
+INVALIDATION_CHANNEL = "cache-invalidate"
+
+# Identifies this worker on the bus so it can skip its own invalidations
+WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class CacheBackend(ABC):
+    """Shared key/value store plus a pub/sub channel for cross-worker messages."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+    @abstractmethod
+    def publish(self, channel: str, message: str):
+        ...
+
+    @abstractmethod
+    def listen(self, channel: str, callback: Callable[[str], None]):
+        """Deliver every message published on `channel` (by any worker) to callback."""
+
+    def after_fork(self):
+        """Reset connections and listener threads in a freshly forked worker."""
+
+
+# ---------- IN-PROCESS ----------
+
+class MemoryCache(CacheBackend):
+    """Single-process backend; fine for one worker and for local development."""
+
+    def __init__(self):
+        self._data = {}
+        self._listeners = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def publish(self, channel, message):
+        for callback in list(self._listeners.get(channel, ())):
+            callback(message)
+
+    def listen(self, channel, callback):
+        self._listeners.setdefault(channel, []).append(callback)
+
+
+# ---------- SQLITE FILE ----------
+
+class SQLiteCache(CacheBackend):
+    """Backend shared by all workers on one host through a WAL-mode SQLite file."""
+
+    POLL_INTERVAL = 0.5
+    MESSAGE_RETENTION_SECONDS = 60
+
+    def __init__(self, path: str):
+        self._path = path
+        self._lock = threading.Lock()
+        self._subscriptions = []
+        self._conn = self._connect()
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                expires_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS cache_messages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                message TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            """
+        )
+
+    def _connect(self):
+        conn = sqlite3.connect(self._path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at is not None and expires_at <= time.time():
+                self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def publish(self, channel, message):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO cache_messages (channel, message, created_at) VALUES (?, ?, ?)",
+                (channel, message, now),
+            )
+            self._conn.execute(
+                "DELETE FROM cache_messages WHERE created_at < ?",
+                (now - self.MESSAGE_RETENTION_SECONDS,),
+            )
+
+    def listen(self, channel, callback):
+        self._subscriptions.append((channel, callback))
+        with self._lock:
+            last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM cache_messages").fetchone()[0]
+        threading.Thread(target=self._poll, args=(channel, callback, last_id), daemon=True).start()
+
+    def after_fork(self):
+        # SQLite handles and threads do not survive fork()
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        subscriptions, self._subscriptions = self._subscriptions, []
+        for channel, callback in subscriptions:
+            self.listen(channel, callback)
+
+    def _poll(self, channel, callback, last_id):
+        conn = self._connect()
+        while True:
+            time.sleep(self.POLL_INTERVAL)
+            try:
+                rows = conn.execute(
+                    "SELECT id, message FROM cache_messages WHERE id > ? AND channel = ? ORDER BY id",
+                    (last_id, channel),
+                ).fetchall()
+            except sqlite3.Error:
+                continue
+            for message_id, message in rows:
+                last_id = message_id
+                callback(message)
+
+
+# ---------- REDIS PROTOCOL ----------
+
+class RESPError(Exception):
+    pass
+
+
+class _RESPConnection:
+    """Minimal RESP2 client, enough for GET/SET/DEL/PUBLISH/SUBSCRIBE."""
+
+    def __init__(self, host: str, port: int, password: Optional[str], db: int, timeout: Optional[float]):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._reader = self._sock.makefile("rb")
+        if password:
+            self.command("AUTH", password)
+        if db:
+            self.command("SELECT", db)
+
+    def send(self, *args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self._sock.sendall(b"".join(parts))
+
+    def read(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RESPError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self.read() for _ in range(length)]
+        raise RESPError(f"Unexpected reply: {line!r}")
+
+    def command(self, *args):
+        self.send(*args)
+        return self.read()
+
+    def close(self):
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+
+class RedisCache(CacheBackend):
+    """Backend for any server speaking the Redis protocol (Redis, Valkey, KeyDB...)."""
+
+    RECONNECT_DELAY = 1.0
+    # After a failed reconnect, calls fail fast for this long instead of each
+    # waiting out the connect timeout
+    RETRY_AFTER_FAILURE = 5.0
+
+    def __init__(self, url: str, timeout: float = 2.0):
+        parsed = urlparse(url)
+        self._host = parsed.hostname or "localhost"
+        self._port = parsed.port or 6379
+        self._password = parsed.password
+        self._db = int(parsed.path.lstrip("/") or 0)
+        self._timeout = timeout
+        self._conn = None
+        self._down_until = 0.0
+        self._lock = threading.Lock()
+        self._subscriptions = []
+
+    def _connection(self, timeout=None) -> _RESPConnection:
+        return _RESPConnection(self._host, self._port, self._password, self._db, timeout)
+
+    def _command(self, *args):
+        if time.monotonic() < self._down_until:
+            raise ConnectionError(f"Redis at {self._host}:{self._port} is unreachable, retrying shortly")
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._conn is None:
+                        self._conn = self._connection(self._timeout)
+                    return self._conn.command(*args)
+                except (OSError, ConnectionError):
+                    if self._conn is not None:
+                        self._conn.close()
+                    self._conn = None
+                    if attempt:
+                        self._down_until = time.monotonic() + self.RETRY_AFTER_FAILURE
+                        raise
+
+    def get(self, key):
+        return self._command("GET", key)
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            self._command("SET", key, value, "PX", int(ttl * 1000))
+        else:
+            self._command("SET", key, value)
+
+    def delete(self, key):
+        self._command("DEL", key)
+
+    def publish(self, channel, message):
+        self._command("PUBLISH", channel, message)
+
+    def listen(self, channel, callback):
+        self._subscriptions.append((channel, callback))
+        threading.Thread(target=self._subscribe, args=(channel, callback), daemon=True).start()
+
+    def after_fork(self):
+        # Sockets and threads inherited from the master are not ours to use
+        self._lock = threading.Lock()
+        self._conn = None
+        self._down_until = 0.0
+        subscriptions, self._subscriptions = self._subscriptions, []
+        for channel, callback in subscriptions:
+            self.listen(channel, callback)
+
+    def _subscribe(self, channel, callback):
+        while True:
+            conn = None
+            try:
+                conn = self._connection()
+                conn.command("SUBSCRIBE", channel)
+                while True:
+                    reply = conn.read()
+                    if isinstance(reply, list) and len(reply) == 3 and reply[0] == b"message":
+                        callback(reply[2].decode())
+            except (OSError, ConnectionError, RESPError):
+                if conn is not None:
+                    conn.close()
+                time.sleep(self.RECONNECT_DELAY)
+
+
+# What a backend raises when its server or file is unavailable; callers that
+# can fall back to the database catch these
+BACKEND_ERRORS = (OSError, ConnectionError, RESPError, sqlite3.Error)
+
+
+# ---------- FACTORY / INVALIDATION BUS ----------
+
+def create_backend(url: str) -> CacheBackend:
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryCache()
+    if scheme == "sqlite":
+        return SQLiteCache(url[len("sqlite:///"):])
+    if scheme in ("redis", "rediss"):
+        return RedisCache(url)
+    raise ValueError(f"Unsupported CACHE_URL scheme: {scheme!r}")
+
+
+backend = create_backend(CACHE_URL)
+
+_handlers = []   # (key prefix, callback)
+_listening = False
+_listen_lock = threading.Lock()
+
+
+def _dispatch(message: str):
+    origin, _, key = message.partition("|")
+    if origin == WORKER_ID:
+        return
+    for prefix, callback in list(_handlers):
+        if key.startswith(prefix):
+            callback(key)
+
+
+def on_invalidate(prefix: str, callback: Callable[[str], None]):
+    """Call `callback(key)` when another worker invalidates a key starting with `prefix`."""
+    global _listening
+    _handlers.append((prefix, callback))
+    with _listen_lock:
+        if not _listening:
+            backend.listen(INVALIDATION_CHANNEL, _dispatch)
+            _listening = True
+
+
+def _after_fork_in_child():
+    global WORKER_ID
+    WORKER_ID = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    backend.after_fork()
+
+
+# With gunicorn's preload_app the module is imported once in the master and
+# then forked, so each worker needs its own identity, connections and threads
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def invalidate(key: str):
+    """Drop `key` from the shared cache and tell every other worker to drop its copy."""
+    try:
+        backend.delete(key)
+        backend.publish(INVALIDATION_CHANNEL, f"{WORKER_ID}|{key}")
+    except BACKEND_ERRORS as e:
+        # Local state is already updated; peers fall back to their rebuild interval
+        print(f"⚠️ Cache invalidation for {key} failed: {e}")
@@ -1,23 +1,232 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event, inspect, make_url, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from dotenv import load_dotenv
+from fastapi import Depends, Request
+import itertools
 import os
+import threading
+import time
+
+from app import cache
 
 load_dotenv()
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+def normalize_database_url(url: str) -> str:
+    """Driverless Postgres URLs (what Render hands out) use psycopg 3."""
+    for prefix in ("postgres://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+psycopg://" + url[len(prefix):]
+    return url
+
+
+DATABASE_URL = normalize_database_url(os.getenv("DATABASE_URL", "sqlite:///./app.db"))
+
+# Extra tenant shards as comma-separated name=url pairs. The primary above is
+# the "default" shard and also holds the directory (admins, shard map, table ids)
+SHARD_URLS = dict(
+    pair.strip().split("=", 1) for pair in os.getenv("SHARD_URLS", "").split(",") if pair.strip()
+)
+DEFAULT_SHARD = "default"
+
+# Tables that only exist meaningfully on the primary; every other table is tenant data
+DIRECTORY_TABLES = {
+    "admins", "email_otps", "password_change_otps", "tenant_purge_jobs", "tenant_shards", "table_directory",
+}
+
+# Comma-separated; read-only endpoints are spread over these when set
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+
+# A replica further behind than this is skipped until it catches up
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", 2))
+REPLICA_RETRY_SECONDS = 30
+
+# After an admin writes, their reads stay on the primary for this long
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", 10))
+
+# Compiled SQL kept per engine; every distinct statement shape takes one slot
+SQL_COMPILED_CACHE_SIZE = int(os.getenv("SQL_COMPILED_CACHE_SIZE", 1000))
+# psycopg 3 prepares a statement server-side once it has run this many times on
+# a connection, so hot queries skip parsing and planning after that
+PG_PREPARE_THRESHOLD = int(os.getenv("PG_PREPARE_THRESHOLD", 2))
+
+# Counters and bulk table creation rely on INSERT ... ON CONFLICT, which
+# SQLAlchemy only builds for these dialects
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def _create_engine(url: str, writable: bool = True):
+    url = normalize_database_url(url)
+    # SQLite-specific connection args
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    if url.startswith("postgresql+psycopg:"):
+        connect_args["prepare_threshold"] = PG_PREPARE_THRESHOLD
+    backend = make_url(url).get_backend_name()
+    if writable and backend not in UPSERT_INSERTS:
+        raise RuntimeError(
+            f"Unsupported database {backend!r} in {make_url(url)!r}: the primary and every shard "
+            f"must be one of {', '.join(sorted(UPSERT_INSERTS))} (INSERT ... ON CONFLICT)"
+        )
+    db_engine = create_engine(url, connect_args=connect_args, query_cache_size=SQL_COMPILED_CACHE_SIZE)
+
+    if url.startswith("sqlite"):
+        # SQLite ignores ON DELETE CASCADE unless foreign keys are enabled per connection
+        @event.listens_for(db_engine, "connect")
+        def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    return db_engine
+
+
+engine = _create_engine(DATABASE_URL)
+replica_engines = [_create_engine(url, writable=False) for url in DATABASE_REPLICA_URLS]
+shard_engines = {DEFAULT_SHARD: engine, **{name: _create_engine(url) for name, url in SHARD_URLS.items()}}
+
+
+# ---------- REPLICA SELECTION ----------
+
+# Zero when the replica has replayed everything it received, so an idle
+# primary does not look like lag
+PG_REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+class _Replica:
+    def __init__(self, replica_engine):
+        self.engine = replica_engine
+        self.lag = 0.0
+        self.checked_at = None
+        self.down_until = 0.0
+
+    def measure_lag(self) -> float:
+        if self.engine.dialect.name != "postgresql":
+            # Nothing to measure (e.g. a local SQLite copy)
+            return 0.0
+        with self.engine.connect() as conn:
+            return float(conn.execute(PG_REPLICA_LAG_SQL).scalar() or 0)
+
+    def usable(self) -> bool:
+        now = time.monotonic()
+        if now < self.down_until:
+            return False
+        if self.checked_at is None or now - self.checked_at >= REPLICA_LAG_CHECK_SECONDS:
+            try:
+                self.lag = self.measure_lag()
+            except Exception as e:
+                print(f"⚠️ Replica {self.engine.url!r} unreachable, using primary: {e}")
+                self.down_until = now + REPLICA_RETRY_SECONDS
+                return False
+            finally:
+                self.checked_at = now
+        return self.lag <= REPLICA_MAX_LAG_SECONDS
 
-# SQLite-specific connection args
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
-SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+_replicas = [_Replica(replica_engine) for replica_engine in replica_engines]
+_replica_cycle = itertools.cycle(range(len(_replicas))) if _replicas else None
+_replica_lock = threading.Lock()
+
+
+def choose_read_engine():
+    """Next replica that is reachable and caught up, else the primary."""
+    for _ in range(len(_replicas)):
+        with _replica_lock:
+            replica = _replicas[next(_replica_cycle)]
+        if replica.usable():
+            return replica.engine
+    return engine
+
+
+# ---------- READ-YOUR-WRITES ----------
+
+def _pin_key(admin_id: int) -> str:
+    return f"rw-pin:{admin_id}"
+
+
+def pin_to_primary(admin_id: int):
+    """Send this admin's reads to the primary until replicas have their write."""
+    try:
+        cache.backend.set(_pin_key(admin_id), b"1", ttl=READ_YOUR_WRITES_SECONDS)
+    except Exception as e:
+        print(f"⚠️ Could not pin admin {admin_id} to primary: {e}")
+
+
+def is_pinned_to_primary(admin_id: int) -> bool:
+    try:
+        return cache.backend.get(_pin_key(admin_id)) is not None
+    except Exception:
+        # Unknown, so stay safe
+        return True
+
+
+# ---------- SESSIONS ----------
+
+class RoutingSession(Session):
+    """Tenant tables go to the tenant's shard. On the primary, writes and
+    flushes always use it directly, while read-only sessions pick a replica on
+    first use and keep it for the rest of the request."""
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if len(shard_engines) > 1 and mapper is not None and mapper.local_table.name not in DIRECTORY_TABLES:
+            shard_engine = self._tenant_engine()
+            if shard_engine is not engine:
+                return shard_engine
+        if not self.info.get("read_only") or self._flushing:
+            return engine
+        # The auth lookup may run on this session before the admin is known, so
+        # the pin is only checked (once) when a later query has an admin
+        if "pinned" not in self.info:
+            request = self.info.get("request")
+            admin_id = getattr(request.state, "admin_id", None) if request is not None else None
+            if admin_id is not None:
+                self.info["pinned"] = is_pinned_to_primary(admin_id)
+        if self.info.get("pinned"):
+            return engine
+        bind = self.info.get("bind")
+        if bind is None:
+            bind = self.info["bind"] = choose_read_engine()
+        return bind
+
+    def _tenant_engine(self):
+        shard_engine = self.info.get("shard_engine")
+        if shard_engine is None:
+            from app import shards  # app.shards needs the models, which import this module
+            shard_engine = shard_engines[shards.shard_for_session(self)]
+            self.info["shard_engine"] = shard_engine
+        return shard_engine
+
+
+def dialect_insert(db: Session, model):
+    """insert(model) for the database the model lives on, with that dialect's on_conflict_* clauses."""
+    # _create_engine refuses any other dialect for a writable engine
+    return UPSERT_INSERTS[db.get_bind(mapper=inspect(model)).dialect.name](model)
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, bind=engine, autocommit=False, autoflush=False)
 Base = declarative_base()
 
 # ✅ Add this function:
-def get_db():
-    db = SessionLocal()
+# One session per request: FastAPI caches this dependency, so get_current_admin,
+# verify_secret_key and the handler all share it. A connection is only checked
+# out on the first query, so requests served from memory never take one.
+# The request lets the session find the tenant's shard (JWT admin or table_id in the path).
+def get_db(request: Request):
+    db = SessionLocal(info={"request": request})
     try:
         yield db
     finally:
         db.close()
+
+
+# For endpoints that only read: the same request session, with its remaining
+# queries sent to a replica when one is configured
+def get_read_db(db: Session = Depends(get_db)):
+    if _replicas:
+        db.info["read_only"] = True
+    return db
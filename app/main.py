@@ -1,37 +1,84 @@
-from fastapi import FastAPI
+import threading
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routers import superuser, admin_auth, menu, table, order, qr, otp
-
-app = FastAPI(title="Multi-Tenant Food Ordering API")
-
-# ✅ CORS configuration
-origins = [
-    "https://www.jiffymenu.com"
-]
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,  # or use ["*"] in development
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# ⚠️ DO NOT include this if you're using Alembic for migrations:
-# from app.db import Base, engine
-# Base.metadata.create_all(bind=engine)
-
-# ✅ API Routers
-app.include_router(admin_auth.router)
-app.include_router(superuser.router)
-app.include_router(menu.router)
-app.include_router(table.router)
-app.include_router(order.router)
-app.include_router(qr.router, prefix="/api")
-app.include_router(otp.router)
-
-# ✅ Optional: Health check route
-@app.get("/")
-def read_root():
-    return {"message": "🚀 Food Ordering API is live!"}
+from app.admission import ConcurrencyLimitMiddleware
+from app.auth import tune_password_hashing
+from app.db import replica_engines, pin_to_primary
+from app.profiler import ProfilerMiddleware
+from app.purge import resume_tenant_purges
+from app.warmup import PREWARM_ON_STARTUP, prewarm
+
+
+# ✅ Runs in every worker before it accepts traffic
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sizes bcrypt for this instance before the first login hashes anything
+    await run_in_threadpool(tune_password_hashing)
+    if PREWARM_ON_STARTUP:
+        await run_in_threadpool(prewarm)
+    # Tenant purges cut off by a recycled or redeployed worker carry on here
+    threading.Thread(target=resume_tenant_purges, name="resume-tenant-purges", daemon=True).start()
+    yield
+
+
+def create_app() -> FastAPI:
+    # Routers (and what they pull in) load when an app is built, not when this module is imported
+    from app.routers import superuser, admin_auth, menu, table, order, bill, qr, otp, dashboard, health
+
+    app = FastAPI(title="Multi-Tenant Food Ordering API", lifespan=lifespan)
+
+    # ✅ Superusers can profile a single request with "X-Profile: 1" (innermost, so queueing is not counted)
+    app.add_middleware(ProfilerMiddleware)
+
+    # ✅ Shed load once requests queue past the wait budget (added first so CORS wraps its 503s)
+    app.add_middleware(ConcurrencyLimitMiddleware)
+
+    # ✅ Read-your-writes: after an admin changes something, keep their reads off the replicas
+    if replica_engines:
+        @app.middleware("http")
+        async def pin_writers_to_primary(request: Request, call_next):
+            response = await call_next(request)
+            admin_id = getattr(request.state, "admin_id", None)
+            if admin_id is not None and request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+                pin_to_primary(admin_id)
+            return response
+
+    # ✅ CORS configuration
+    origins = [
+        "https://www.jiffymenu.com"
+    ]
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,  # or use ["*"] in development
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # ⚠️ DO NOT include this if you're using Alembic for migrations:
+    # from app.db import Base, engine
+    # Base.metadata.create_all(bind=engine)
+
+    # ✅ API Routers
+    app.include_router(admin_auth.router)
+    app.include_router(superuser.router)
+    app.include_router(menu.router)
+    app.include_router(table.router)
+    app.include_router(order.router)
+    app.include_router(bill.router)
+    app.include_router(qr.router, prefix="/api")
+    app.include_router(otp.router)
+    app.include_router(dashboard.router)
+
+    # ✅ Health checks: /health/live (process up) and /health/ready (DB reachable)
+    app.include_router(health.router)
+
+    return app
+
+
+app = create_app()
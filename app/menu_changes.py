@@ -0,0 +1,99 @@
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app import sequences
+from app.models import FoodCategory, MenuChange, MenuChangeSequence, MenuItem
+
+MENU_ITEM = "menu_item"
+FOOD_CATEGORY = "food_category"
+MENU = "menu"
+
+UPSERT = "upsert"
+DELETE = "delete"
+# Logged against MENU when every id changed (e.g. the tenant moved shards)
+RESET = "reset"
+
+
+def record_menu_change(db: Session, admin_id: int, entity: str, entity_id: int, op: str = UPSERT):
+    record_menu_changes(db, admin_id, [(entity, entity_id, op)])
+
+
+def record_menu_changes(db: Session, admin_id: int, changes):
+    """Write (entity, entity_id, op) change-log rows in the caller's transaction.
+
+    Versions come from the tenant's counter row, locked until commit: ids
+    are handed out at insert but become visible at commit, in any order, so
+    a client that synced up to the highest id could miss a lower one."""
+    last_version = sequences.allocate(db, MenuChangeSequence, admin_id, len(changes))
+    first_version = last_version - len(changes) + 1
+    db.execute(insert(MenuChange), [
+        {"admin_id": admin_id, "version": first_version + position, "entity": entity, "entity_id": entity_id, "op": op}
+        for position, (entity, entity_id, op) in enumerate(changes)
+    ])
+
+
+def collect_menu_changes(db: Session, admin_id: int, since: int) -> dict:
+    """Net upserts and deletes for a tenant's menu after version `since`."""
+    changes = db.query(MenuChange.version, MenuChange.entity, MenuChange.entity_id, MenuChange.op).filter(
+        MenuChange.admin_id == admin_id,
+        MenuChange.version > since
+    ).order_by(MenuChange.version).all()
+
+    # A version this log never reached also means the client's cache is from elsewhere
+    if not changes and since:
+        latest_version = db.query(func.max(MenuChange.version)).filter(MenuChange.admin_id == admin_id).scalar() or 0
+        if latest_version < since:
+            return _full_menu(db, admin_id, latest_version)
+    if any(op == RESET for _, _, _, op in changes):
+        return _full_menu(db, admin_id, changes[-1][0])
+
+    # Later changes to the same row win, so a client only sees its final state
+    latest = {}
+    version = since
+    for change_version, entity, entity_id, op in changes:
+        latest[(entity, entity_id)] = op
+        version = change_version
+
+    upserted = {MENU_ITEM: [], FOOD_CATEGORY: []}
+    deleted = {MENU_ITEM: set(), FOOD_CATEGORY: set()}
+    for (entity, entity_id), op in latest.items():
+        if op == DELETE:
+            deleted[entity].add(entity_id)
+        else:
+            upserted[entity].append(entity_id)
+
+    menu_items = []
+    if upserted[MENU_ITEM]:
+        menu_items = db.query(MenuItem).filter(
+            MenuItem.admin_id == admin_id,
+            MenuItem.id.in_(upserted[MENU_ITEM])
+        ).all()
+    food_categories = []
+    if upserted[FOOD_CATEGORY]:
+        food_categories = db.query(FoodCategory).filter(
+            FoodCategory.admin_id == admin_id,
+            FoodCategory.id.in_(upserted[FOOD_CATEGORY])
+        ).all()
+
+    # Rows removed without a log entry (e.g. a category cascade) are reported as deleted
+    deleted[MENU_ITEM].update(set(upserted[MENU_ITEM]) - {item.id for item in menu_items})
+    deleted[FOOD_CATEGORY].update(set(upserted[FOOD_CATEGORY]) - {category.id for category in food_categories})
+
+    return {
+        "version": version,
+        "menu_items": menu_items,
+        "food_categories": food_categories,
+        "deleted_menu_item_ids": sorted(deleted[MENU_ITEM]),
+        "deleted_food_category_ids": sorted(deleted[FOOD_CATEGORY]),
+    }
+
+
+def _full_menu(db: Session, admin_id: int, version: int) -> dict:
+    return {
+        "version": version,
+        "menu_items": db.query(MenuItem).filter(MenuItem.admin_id == admin_id).all(),
+        "food_categories": db.query(FoodCategory).filter(FoodCategory.admin_id == admin_id).all(),
+        "deleted_menu_item_ids": [],
+        "deleted_food_category_ids": [],
+        "reset": True,
+    }
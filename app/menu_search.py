@@ -0,0 +1,241 @@
+import bisect
+import os
+import re
+import threading
+import time
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app import cache
+from app.models import MenuItem, TableDirectory
+
+# Other workers' menu writes arrive over the cache invalidation bus; this
+# periodic rebuild is the fallback if a message is lost
+MENU_SEARCH_REBUILD_SECONDS = int(os.getenv("MENU_SEARCH_REBUILD_SECONDS", 300))
+
+# Cap on how many vocabulary tokens one query token may expand to by prefix
+MAX_PREFIX_EXPANSION = 50
+
+EXACT_SCORE = 3
+PREFIX_SCORE = 2
+FUZZY_SCORE = 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+_indexes = {}        # admin_id -> _TenantIndex
+_table_admins = {}   # table_id -> admin_id
+_lock = threading.Lock()
+
+
+def tokenize(text) -> list:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _deletes(token: str) -> set:
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def _item_doc(item: MenuItem) -> dict:
+    category = item.food_category
+    return {
+        "id": item.id,
+        "name": item.name,
+        "is_available": item.is_available,
+        "food_category": {"id": category.id, "name": category.name} if category else None,
+        "quantity_prices": [
+            {"quantity_type": qp.quantity_type, "price": qp.price} for qp in item.quantity_prices
+        ],
+    }
+
+
+class _TenantIndex:
+    """Inverted index over item and category names for one tenant."""
+
+    def __init__(self):
+        self.built_at = time.monotonic()
+        self.docs = {}          # item_id -> doc
+        self.item_tokens = {}   # item_id -> set of tokens
+        self.postings = {}      # token -> set of item_ids
+        self.neighbours = {}    # token or one-char deletion of it -> set of tokens
+        self.sorted_tokens = []
+
+    def _add_token(self, token: str, item_id: int):
+        if token not in self.postings:
+            self.postings[token] = set()
+            bisect.insort(self.sorted_tokens, token)
+            for key in _deletes(token) | {token}:
+                self.neighbours.setdefault(key, set()).add(token)
+        self.postings[token].add(item_id)
+
+    def _drop_token(self, token: str, item_id: int):
+        ids = self.postings.get(token)
+        if ids is None:
+            return
+        ids.discard(item_id)
+        if ids:
+            return
+        del self.postings[token]
+        del self.sorted_tokens[bisect.bisect_left(self.sorted_tokens, token)]
+        for key in _deletes(token) | {token}:
+            tokens = self.neighbours.get(key)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self.neighbours[key]
+
+    def remove(self, item_id: int):
+        for token in self.item_tokens.pop(item_id, ()):
+            self._drop_token(token, item_id)
+        self.docs.pop(item_id, None)
+
+    def upsert(self, doc: dict):
+        self.remove(doc["id"])
+        category = doc["food_category"]
+        tokens = set(tokenize(doc["name"])) | set(tokenize(category["name"] if category else None))
+        for token in tokens:
+            self._add_token(token, doc["id"])
+        self.item_tokens[doc["id"]] = tokens
+        self.docs[doc["id"]] = doc
+
+    def _matches(self, query_token: str) -> dict:
+        """item_id -> best score for one query token."""
+        scores = {}
+
+        def credit(token, score):
+            for item_id in self.postings.get(token, ()):
+                if scores.get(item_id, 0) < score:
+                    scores[item_id] = score
+
+        start = bisect.bisect_left(self.sorted_tokens, query_token)
+        for token in self.sorted_tokens[start:start + MAX_PREFIX_EXPANSION]:
+            if not token.startswith(query_token):
+                break
+            credit(token, EXACT_SCORE if token == query_token else PREFIX_SCORE)
+
+        # Typo tolerance: tokens within one insert, delete or substitution
+        if len(query_token) >= 3:
+            for key in _deletes(query_token) | {query_token}:
+                for token in self.neighbours.get(key, ()):
+                    credit(token, FUZZY_SCORE)
+        return scores
+
+    def search(self, query: str, limit: int) -> list:
+        totals = None
+        for query_token in tokenize(query):
+            matches = self._matches(query_token)
+            if totals is None:
+                totals = matches
+            else:
+                totals = {item_id: totals[item_id] + score for item_id, score in matches.items() if item_id in totals}
+            if not totals:
+                return []
+        if not totals:
+            return []
+
+        ranked = sorted(totals, key=lambda item_id: (-totals[item_id], self.docs[item_id]["name"].lower()))
+        return [self.docs[item_id] for item_id in ranked[:limit]]
+
+
+def _build(db: Session, admin_id: int) -> _TenantIndex:
+    items = db.query(MenuItem).options(
+        joinedload(MenuItem.food_category),
+        selectinload(MenuItem.quantity_prices),
+    ).filter(MenuItem.admin_id == admin_id).all()
+
+    index = _TenantIndex()
+    for item in items:
+        index.upsert(_item_doc(item))
+    return index
+
+
+TABLE_ADMIN_TTL_SECONDS = 3600
+
+
+def resolve_table_admin(db: Session, table_id: int):
+    """admin_id for a table via worker memory, then the shared cache, then the DB."""
+    admin_id = _table_admins.get(table_id)
+    if admin_id is not None:
+        return admin_id
+
+    key = f"table:{table_id}"
+    try:
+        cached = cache.backend.get(key)
+    except cache.BACKEND_ERRORS as e:
+        # A shared cache outage costs a directory lookup, not the request
+        print(f"⚠️ Cache read for {key} failed: {e}")
+        cached = None
+    if cached is not None:
+        admin_id = int(cached)
+    else:
+        # The directory is on the primary, whichever shard holds the table
+        entry = db.query(TableDirectory).filter(TableDirectory.id == table_id).first()
+        if not entry:
+            return None
+        admin_id = entry.admin_id
+        try:
+            cache.backend.set(key, str(admin_id).encode(), ttl=TABLE_ADMIN_TTL_SECONDS)
+        except cache.BACKEND_ERRORS as e:
+            print(f"⚠️ Cache write for {key} failed: {e}")
+
+    _table_admins[table_id] = admin_id
+    return admin_id
+
+
+def forget_table(table_id: int):
+    _table_admins.pop(table_id, None)
+    cache.invalidate(f"table:{table_id}")
+
+
+def search_menu(db: Session, admin_id: int, query: str, limit: int) -> list:
+    with _lock:
+        index = _indexes.get(admin_id)
+        if index is not None and time.monotonic() - index.built_at < MENU_SEARCH_REBUILD_SECONDS:
+            return index.search(query, limit)
+
+    index = _build(db, admin_id)
+    with _lock:
+        _indexes[admin_id] = index
+        return index.search(query, limit)
+
+
+def index_menu_item(admin_id: int, item: MenuItem):
+    """Reflect a created or edited item in this worker's index, if it has one."""
+    if admin_id in _indexes:
+        doc = _item_doc(item)
+        with _lock:
+            index = _indexes.get(admin_id)
+            if index is not None:
+                index.upsert(doc)
+    cache.invalidate(f"menu:{admin_id}")
+
+
+def unindex_menu_item(admin_id: int, item_id: int):
+    with _lock:
+        index = _indexes.get(admin_id)
+        if index is not None:
+            index.remove(item_id)
+    cache.invalidate(f"menu:{admin_id}")
+
+
+def set_indexed_availability(admin_id: int, item_ids, is_available: bool):
+    with _lock:
+        index = _indexes.get(admin_id)
+        if index is not None:
+            for item_id in item_ids:
+                doc = index.docs.get(item_id)
+                if doc is not None:
+                    doc["is_available"] = is_available
+    cache.invalidate(f"menu:{admin_id}")
+
+
+def _drop_index(key: str):
+    with _lock:
+        _indexes.pop(int(key.split(":", 1)[1]), None)
+
+
+def _drop_table(key: str):
+    _table_admins.pop(int(key.split(":", 1)[1]), None)
+
+
+cache.on_invalidate("menu:", _drop_index)
+cache.on_invalidate("table:", _drop_table)
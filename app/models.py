@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, Integer, String, Float, ForeignKey, Enum as SqlEnum, DateTime,
-    UniqueConstraint, Boolean
+    UniqueConstraint, Boolean, Index, JSON, text
 )
 from sqlalchemy.orm import relationship
 from app.db import Base
@@ -15,6 +15,15 @@ class QuantityEnum(str, enum.Enum):
     half = "half"
     full = "full"
 
+class OrderStatus(str, enum.Enum):
+    pending = "pending"
+    accepted = "accepted"
+    preparing = "preparing"
+    ready = "ready"
+    served = "served"
+    completed = "completed"
+    cancelled = "cancelled"
+
 # ---------- ADMIN ----------
 import uuid
 class Admin(Base):
@@ -28,11 +37,13 @@ class Admin(Base):
     hashed_password = Column(String, nullable=False)
     is_superuser = Column(Integer, default=0)
     secret_key = Column(String, unique=True, nullable=True, default=lambda: str(uuid.uuid4()))
-    # Relationships
-    menu_items = relationship("MenuItem", back_populates="admin", cascade="all, delete")
-    food_categories = relationship("FoodCategory", back_populates="admin", cascade="all, delete")
-    tables = relationship("Table", back_populates="admin", cascade="all, delete")
-    orders = relationship("Order", back_populates="admin", cascade="all, delete")
+    # Set when a tenant purge is queued; the admin can no longer log in from that point
+    deleted_at = Column(DateTime, nullable=True)
+    # Relationships (child rows are removed by ON DELETE CASCADE, never loaded for deletion)
+    menu_items = relationship("MenuItem", back_populates="admin", cascade="all, delete", passive_deletes=True)
+    food_categories = relationship("FoodCategory", back_populates="admin", cascade="all, delete", passive_deletes=True)
+    tables = relationship("Table", back_populates="admin", cascade="all, delete", passive_deletes=True)
+    orders = relationship("Order", back_populates="admin", cascade="all, delete", passive_deletes=True)
     
 
 # ---------- FOOD CATEGORY ----------
@@ -43,10 +54,14 @@ class FoodCategory(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
 
-    admin_id = Column(Integer, ForeignKey("admins.id"))
+    admin_id = Column(Integer, ForeignKey("admins.id", ondelete="CASCADE"))
     admin = relationship("Admin", back_populates="food_categories")
 
-    menu_items = relationship("MenuItem", back_populates="food_category", cascade="all, delete")
+    menu_items = relationship("MenuItem", back_populates="food_category", cascade="all, delete", passive_deletes=True)
+
+    __table_args__ = (
+        Index("ix_food_categories_admin_id_name", "admin_id", "name"),
+    )
 
 # ---------- MENU ITEM ----------
 
@@ -57,14 +72,14 @@ class MenuItem(Base):
     name = Column(String, nullable=False)
     is_available = Column(Boolean, nullable=False, default=True)
 
-    food_category_id = Column(Integer, ForeignKey("food_categories.id"), nullable=False)
+    food_category_id = Column(Integer, ForeignKey("food_categories.id", ondelete="CASCADE"), nullable=False, index=True)
     food_category = relationship("FoodCategory", back_populates="menu_items")
 
-    admin_id = Column(Integer, ForeignKey("admins.id"))
+    admin_id = Column(Integer, ForeignKey("admins.id", ondelete="CASCADE"), index=True)
     admin = relationship("Admin", back_populates="menu_items")
 
-    order_items = relationship("OrderItem", back_populates="menu_item", cascade="all, delete")
-    quantity_prices = relationship("MenuItemQuantityPrice", back_populates="menu_item", cascade="all, delete")
+    order_items = relationship("OrderItem", back_populates="menu_item", passive_deletes=True)
+    quantity_prices = relationship("MenuItemQuantityPrice", back_populates="menu_item", cascade="all, delete", passive_deletes=True)
 
     def get_allowed_quantities(self):
         return [qp.quantity_type for qp in self.quantity_prices]
@@ -81,7 +96,7 @@ class MenuItemQuantityPrice(Base):
     __tablename__ = "menu_item_quantity_prices"
 
     id = Column(Integer, primary_key=True)
-    menu_item_id = Column(Integer, ForeignKey("menu_items.id"), nullable=False)
+    menu_item_id = Column(Integer, ForeignKey("menu_items.id", ondelete="CASCADE"), nullable=False, index=True)
     quantity_type = Column(SqlEnum(QuantityEnum), nullable=False)  # full, half, quarter
     price = Column(Float, nullable=False)
 
@@ -99,9 +114,14 @@ class Table(Base):
     id = Column(Integer, primary_key=True, index=True)
     table_number = Column(Integer, nullable=False)
 
-    admin_id = Column(Integer, ForeignKey("admins.id"))
+    admin_id = Column(Integer, ForeignKey("admins.id", ondelete="CASCADE"))
     admin = relationship("Admin", back_populates="tables")
 
+    # One table per number per restaurant; also serves lookups by admin_id alone
+    __table_args__ = (
+        Index("uq_tables_admin_id_table_number", "admin_id", "table_number", unique=True),
+    )
+
 # ---------- ORDER ----------
 
 def ist_now():
@@ -111,16 +131,26 @@ class Order(Base):
     __tablename__ = "orders"
 
     id = Column(Integer, primary_key=True, index=True)
-    table_id = Column(Integer, ForeignKey("tables.id"))
-    admin_id = Column(Integer, ForeignKey("admins.id"))
-    status = Column(String, default="pending")
+    # Orders outlive their table: deleting a table keeps its history
+    table_id = Column(Integer, ForeignKey("tables.id", ondelete="SET NULL"), nullable=True, index=True)
+    admin_id = Column(Integer, ForeignKey("admins.id", ondelete="CASCADE"))
+    status = Column(String, default=OrderStatus.pending.value)
+    # Bumped on every status change so clients can detect concurrent edits
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     estimated_time = Column(String, nullable=True)
     total_amount = Column(Float, default=0)
     created_at = Column(DateTime, default=ist_now)
+    # The table's bill this order is charged to
+    table_session_id = Column(Integer, ForeignKey("table_sessions.id", name="fk_orders_table_session_id"), nullable=True, index=True)
 
     admin = relationship("Admin", back_populates="orders")
     table = relationship("Table")
-    items = relationship("OrderItem", back_populates="order", cascade="all, delete")
+    items = relationship("OrderItem", back_populates="order", cascade="all, delete", passive_deletes=True)
+
+    # Also serves lookups by admin_id alone
+    __table_args__ = (
+        Index("ix_orders_admin_id_created_at", "admin_id", "created_at"),
+    )
 
     @property
     def table_number(self):
@@ -132,16 +162,122 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
-    menu_item_id = Column(Integer, ForeignKey("menu_items.id"))
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), index=True)
+    menu_item_id = Column(Integer, ForeignKey("menu_items.id", ondelete="SET NULL"), index=True)
 
     quantity = Column(Integer, nullable=False)
     selected_type = Column(SqlEnum(QuantityEnum), nullable=False)
     price_at_order = Column(Float, nullable=False)
 
+    # Snapshot of the menu item at order time, so history survives menu edits/deletes
+    item_name = Column(String, nullable=True)
+    category_name = Column(String, nullable=True)
+
     order = relationship("Order", back_populates="items")
     menu_item = relationship("MenuItem", back_populates="order_items")
 
+# ---------- ORDER EVENT LOG ----------
+
+class OrderEvent(Base):
+    __tablename__ = "order_events"
+
+    # Append-only; consumers page through a tenant's events by seq
+    id = Column(Integer, primary_key=True)
+    admin_id = Column(Integer, ForeignKey("admins.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)  # 1, 2, 3... per tenant, kept when the tenant moves shard
+    order_id = Column(Integer, nullable=True)  # no FK: events outlive deleted orders
+    type = Column(String, nullable=False)  # created, status_changed, updated, deleted
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=ist_now)
+
+    __table_args__ = (
+        UniqueConstraint("admin_id", "seq", name="uq_order_events_admin_id_seq"),
+    )
+
+class OrderEventSequence(Base):
+    __tablename__ = "order_event_sequences"
+
+    # Last seq handed out per tenant; its row lock orders a tenant's event writes
+    id = Column(Integer, primary_key=True)
+    admin_id = Column(Integer, ForeignKey("admins.id", ondelete="CASCADE"), nullable=False, unique=True)
+    last_seq = Column(Integer, nullable=False, default=0)
+
+# ---------- TABLE SESSION (BILL) ----------
+
+class TableSessionStatus(str, enum.Enum):
+    open = "open"
+    closed = "closed"
+
+class TableSession(Base):
+    __tablename__ = "table_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    admin_id = Column(Integer, ForeignKey("admins.id", ondelete="CASCADE"), nullable=False, index=True)
+    table_id = Column(Integer, ForeignKey("tables.id", ondelete="SET NULL"), nullable=True)
+    table_number = Column(Integer, nullable=True)
+    status = Column(String, nullable=False, default=TableSessionStatus.open.value)
+
+    # Running totals, updated in the same transaction as every order that changes them
+    order_count = Column(Integer, nullable=False, default=0)
+    subtotal = Column(Float, nullable=False, default=0)
+    tax_rate = Column(Float, nullable=False, default=0)
+    tax = Column(Float, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0)
+
+    opened_at = Column(DateTime, default=ist_now)
+    closed_at = Column(DateTime, nullable=True)
+    # The whole bill as it was at close-out; later order edits do not touch it
+    snapshot = Column(JSON, nullable=True)
+
+    items = relationship("TableSessionItem", cascade="all, delete", passive_deletes=True)
+
+    # At most one open bill per table
+    __table_args__ = (
+        Index(
+            "uq_table_sessions_open_table_id", "table_id", unique=True,
+            sqlite_where=text("status = 'open'"), postgresql_where=text("status = 'open'"),
+        ),
+    )
+
+class TableSessionItem(Base):
+    __tablename__ = "table_session_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("table_sessions.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # One line per dish, size and price across all the bill's orders
+    item_name = Column(String, nullable=True)
+    selected_type = Column(String, nullable=False)
+    unit_price = Column(Float, nullable=False)
+    quantity = Column(Integer, nullable=False, default=0)
+    amount = Column(Float, nullable=False, default=0)
+
+# ---------- MENU CHANGE LOG ----------
+
+# Append-only change log for a tenant's menu; version is the menu version clients sync from
+class MenuChange(Base):
+    __tablename__ = "menu_changes"
+
+    id = Column(Integer, primary_key=True)
+    admin_id = Column(Integer, ForeignKey("admins.id", ondelete="CASCADE"), nullable=False)
+    version = Column(Integer, nullable=False)  # from menu_change_sequences, gap-free per tenant
+    entity = Column(String, nullable=False)  # menu_item, food_category
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False)  # upsert, delete
+    created_at = Column(DateTime, default=ist_now)
+
+    __table_args__ = (
+        Index("uq_menu_changes_admin_id_version", "admin_id", "version", unique=True),
+    )
+
+class MenuChangeSequence(Base):
+    __tablename__ = "menu_change_sequences"
+
+    # Last menu version handed out per tenant; its row lock orders a tenant's menu writes
+    id = Column(Integer, primary_key=True)
+    admin_id = Column(Integer, ForeignKey("admins.id", ondelete="CASCADE"), nullable=False, unique=True)
+    last_seq = Column(Integer, nullable=False, default=0)
+
 # ---------- EMAIL OTP ----------
 
 class EmailOTP(Base):
@@ -170,3 +306,43 @@ class PasswordOTP(Base):
     created_at = Column(DateTime(timezone=True), default=ist_now)
 
     __table_args__ = (UniqueConstraint("email", name="uq_password_email_otp"),)
+
+
+# ---------- TENANT PURGE JOB ----------
+
+class TenantPurgeJob(Base):
+    __tablename__ = "tenant_purge_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Plain column, not a FK: the job outlives the admin row it deletes
+    admin_id = Column(Integer, nullable=False, index=True)
+    status = Column(String, nullable=False, default="queued")  # queued, running, done, failed
+    current_step = Column(String, nullable=True)
+    deleted_rows = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=ist_now)
+    # Touched after every batch; a running job that stops touching it lost its worker
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+# ---------- SHARD DIRECTORY ----------
+# Both live on the primary database only, next to the admins table
+
+# Tenants without a row live on the "default" shard (the primary)
+class TenantShard(Base):
+    __tablename__ = "tenant_shards"
+
+    admin_id = Column(Integer, ForeignKey("admins.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(String, nullable=False, default="default")
+    moving = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, default=ist_now, onupdate=ist_now)
+
+# Hands out table ids, so they stay unique across shards and a public
+# table_id can be routed without knowing the shard
+class TableDirectory(Base):
+    __tablename__ = "table_directory"
+    # Ids are never reused on SQLite either, even after the newest table is deleted
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    id = Column(Integer, primary_key=True)
+    admin_id = Column(Integer, ForeignKey("admins.id", ondelete="CASCADE"), nullable=False, index=True)
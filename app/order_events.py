@@ -0,0 +1,54 @@
+from collections import defaultdict
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import sequences
+from app.models import OrderEvent, OrderEventSequence, ist_now
+
+CREATED = "created"
+STATUS_CHANGED = "status_changed"
+UPDATED = "updated"      # same status, e.g. a new estimated_time
+DELETED = "deleted"
+
+
+def record(db: Session, events):
+    """Append (admin_id, order_id, type, payload) events in the caller's transaction.
+
+    Call after the order writes and just before commit: the sequence rows stay
+    locked from here until then. They are taken in admin_id order, so two
+    multi-tenant batches cannot deadlock on them."""
+    by_admin = defaultdict(list)
+    for admin_id, order_id, event_type, payload in events:
+        by_admin[admin_id].append((order_id, event_type, payload))
+
+    now = ist_now()
+    for admin_id in sorted(by_admin):
+        tenant_events = by_admin[admin_id]
+        first_seq = sequences.allocate(db, OrderEventSequence, admin_id, len(tenant_events)) - len(tenant_events) + 1
+        db.execute(insert(OrderEvent), [
+            {
+                "admin_id": admin_id,
+                "seq": first_seq + position,
+                "order_id": order_id,
+                "type": event_type,
+                "payload": payload,
+                "created_at": now,
+            }
+            for position, (order_id, event_type, payload) in enumerate(tenant_events)
+        ])
+
+
+def read_events(db: Session, admin_id: int, after: int, limit: int) -> dict:
+    """Up to `limit` events with seq > after, oldest first."""
+    rows = db.query(OrderEvent).filter(
+        OrderEvent.admin_id == admin_id,
+        OrderEvent.seq > after
+    ).order_by(OrderEvent.seq).limit(limit + 1).all()
+
+    events = rows[:limit]
+    return {
+        "events": events,
+        "next_offset": events[-1].seq if events else after,
+        "has_more": len(rows) > limit,
+    }
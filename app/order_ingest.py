@@ -0,0 +1,160 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app import bills, order_events
+from app.models import Order, OrderItem, OrderStatus, ist_now
+from app.shards import shard_for_admin, tenant_session
+
+# Off by default: each order is then written and committed by its own request
+ORDER_GROUP_COMMIT = os.getenv("ORDER_GROUP_COMMIT", "false").lower() == "true"
+ORDER_BATCH_MAX = int(os.getenv("ORDER_BATCH_MAX", 100))
+# How long the first order of a batch waits for company; with 0 a batch is
+# whatever queued up while the previous one was committing
+ORDER_BATCH_LINGER_MS = float(os.getenv("ORDER_BATCH_LINGER_MS", 2))
+ORDER_SUBMIT_TIMEOUT_SECONDS = float(os.getenv("ORDER_SUBMIT_TIMEOUT_SECONDS", 10))
+
+ITEM_FIELDS = ("menu_item_id", "quantity", "selected_type", "price_at_order", "item_name", "category_name")
+
+
+class PendingOrder:
+    """A priced order waiting to be written; items are unsaved OrderItem objects."""
+
+    def __init__(self, admin_id: int, table_id: int, total_amount: float, items: list):
+        self.admin_id = admin_id
+        self.table_id = table_id
+        self.total_amount = total_amount
+        self.items = items
+        self.future = Future()
+
+
+def _created_payload(order: PendingOrder, bill_id: int) -> dict:
+    return {
+        "status": OrderStatus.pending.value,
+        "table_id": order.table_id,
+        "table_session_id": bill_id,
+        "total_amount": order.total_amount,
+        "items": [
+            {field: getattr(getattr(item, field), "value", getattr(item, field)) for field in ITEM_FIELDS}
+            for item in order.items
+        ],
+    }
+
+
+def write_orders(db: Session, orders: list) -> list:
+    """One multi-row INSERT for the orders and one for their items, charged to
+    their tables' bills and logged as events; returns order ids. The caller commits."""
+    bill_ids = bills.open_bill_ids(db, orders)
+    now = ist_now()
+    order_ids = db.execute(
+        insert(Order).returning(Order.id, sort_by_parameter_order=True),
+        [
+            {
+                "table_id": order.table_id,
+                "admin_id": order.admin_id,
+                "status": OrderStatus.pending.value,
+                "total_amount": order.total_amount,
+                "created_at": now,
+                "table_session_id": bill_id,
+            }
+            for order, bill_id in zip(orders, bill_ids)
+        ],
+    ).scalars().all()
+
+    item_rows = [
+        {**{field: getattr(item, field) for field in ITEM_FIELDS}, "order_id": order_id}
+        for order, order_id in zip(orders, order_ids)
+        for item in order.items
+    ]
+    if item_rows:
+        db.execute(insert(OrderItem), item_rows)
+
+    for bill_id in set(bill_ids):
+        bill_orders = [order for order, order_bill_id in zip(orders, bill_ids) if order_bill_id == bill_id]
+        bills.charge(db, bill_id, [item for order in bill_orders for item in order.items], len(bill_orders))
+
+    order_events.record(db, [
+        (order.admin_id, order_id, order_events.CREATED, _created_payload(order, bill_id))
+        for order, order_id, bill_id in zip(orders, order_ids, bill_ids)
+    ])
+    return order_ids
+
+
+class _Batcher:
+    """One writer thread per shard that commits queued orders together."""
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _next_batch(self) -> list:
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + ORDER_BATCH_LINGER_MS / 1000.0
+        while len(batch) < ORDER_BATCH_MAX:
+            try:
+                batch.append(self.queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            self._commit(self._next_batch())
+
+    def _commit(self, batch: list):
+        db = tenant_session(batch[0].admin_id)
+        try:
+            order_ids = write_orders(db, batch)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            if len(batch) == 1:
+                batch[0].future.set_exception(e)
+                return
+            # One bad order must not sink the others: retry them one by one
+            for order in batch:
+                self._commit([order])
+            return
+        finally:
+            db.close()
+
+        for order, order_id in zip(batch, order_ids):
+            order.future.set_result(order_id)
+
+
+_batchers = {}   # shard -> _Batcher
+_lock = threading.Lock()
+
+
+def submit(order: PendingOrder) -> int:
+    """Queue an order for the next batch on its shard and wait for its id."""
+    shard = shard_for_admin(order.admin_id)
+    with _lock:
+        batcher = _batchers.get(shard)
+        if batcher is None:
+            batcher = _batchers[shard] = _Batcher()
+    batcher.queue.put(order)
+    return order.future.result(timeout=ORDER_SUBMIT_TIMEOUT_SECONDS)
+
+
+def _after_fork_in_child():
+    global _lock
+    # Writer threads do not survive fork(); each worker starts its own on first use
+    _lock = threading.Lock()
+    _batchers.clear()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,31 @@
+from app.models import OrderStatus
+
+# Kitchen flow: an order may skip ahead (e.g. pending -> preparing) but never go back
+ORDER_FLOW = (
+    OrderStatus.pending,
+    OrderStatus.accepted,
+    OrderStatus.preparing,
+    OrderStatus.ready,
+    OrderStatus.served,
+    OrderStatus.completed,
+)
+
+# Cancelling is allowed until the food has been served
+CANCELLABLE = (OrderStatus.pending, OrderStatus.accepted, OrderStatus.preparing, OrderStatus.ready)
+
+# status -> statuses it may move to; completed and cancelled are final
+ALLOWED_TRANSITIONS = {status.value: set() for status in OrderStatus}
+for position, status in enumerate(ORDER_FLOW):
+    ALLOWED_TRANSITIONS[status.value].update(later.value for later in ORDER_FLOW[position + 1:])
+for status in CANCELLABLE:
+    ALLOWED_TRANSITIONS[status.value].add(OrderStatus.cancelled.value)
+
+
+def can_transition(current: str, target: str) -> bool:
+    """Staying in the same status is allowed (e.g. to update estimated_time only)."""
+    return current == target or target in ALLOWED_TRANSITIONS.get(current, ())
+
+
+def sources_for(target: str) -> list:
+    """Statuses an order can be in to move to `target`."""
+    return [status for status, targets in ALLOWED_TRANSITIONS.items() if target in targets]
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import cache
+from app.models import Order, OrderItem, OrderStatus
+
+# Orders in these states still have food to cook
+OPEN_ORDER_STATUSES = tuple(
+    status.value for status in (OrderStatus.pending, OrderStatus.accepted, OrderStatus.preparing)
+)
+
+# Other workers' order writes arrive over the cache invalidation bus; each
+# worker also rebuilds from the DB at least this often to correct any drift
+PREP_LIST_RECONCILE_SECONDS = int(os.getenv("PREP_LIST_RECONCILE_SECONDS", 60))
+
+# admin_id -> {"built_at": float, "dishes": {(menu_item_id, selected_type): {...}}}
+_prep_lists = {}
+_lock = threading.Lock()
+
+
+def _type_value(selected_type) -> str:
+    return getattr(selected_type, "value", selected_type)
+
+
+def is_open_status(status: str) -> bool:
+    return status in OPEN_ORDER_STATUSES
+
+
+def _load_from_db(db: Session, admin_id: int) -> dict:
+    rows = db.query(
+        OrderItem.menu_item_id,
+        OrderItem.selected_type,
+        func.max(OrderItem.item_name),
+        func.sum(OrderItem.quantity),
+    ).join(Order, Order.id == OrderItem.order_id).filter(
+        Order.admin_id == admin_id,
+        Order.status.in_(OPEN_ORDER_STATUSES),
+    ).group_by(OrderItem.menu_item_id, OrderItem.selected_type).all()
+
+    return {
+        (menu_item_id, _type_value(selected_type)): {"item_name": item_name, "quantity": int(quantity)}
+        for menu_item_id, selected_type, item_name, quantity in rows
+    }
+
+
+def order_lines(items) -> list:
+    """Snapshot order items as plain tuples, safe to use after the session commits."""
+    return [
+        (item.menu_item_id, _type_value(item.selected_type), item.item_name, item.quantity)
+        for item in items
+    ]
+
+
+def _apply(admin_id: int, lines, sign: int):
+    """Add (sign=1) or remove (sign=-1) order lines from a cached prep list."""
+    with _lock:
+        entry = _prep_lists.get(admin_id)
+        if entry is None:
+            # Not cached in this worker; the next read builds it from the DB
+            return
+        dishes = entry["dishes"]
+        for menu_item_id, selected_type, item_name, quantity in lines:
+            key = (menu_item_id, selected_type)
+            dish = dishes.setdefault(key, {"item_name": item_name, "quantity": 0})
+            dish["quantity"] += sign * quantity
+            if dish["quantity"] <= 0:
+                del dishes[key]
+
+
+def record_order_opened(admin_id: int, lines):
+    if lines:
+        _apply(admin_id, lines, 1)
+        cache.invalidate(f"prep:{admin_id}")
+
+
+def record_order_closed(admin_id: int, lines):
+    if lines:
+        _apply(admin_id, lines, -1)
+        cache.invalidate(f"prep:{admin_id}")
+
+
+def reset(admin_id: int):
+    """Forget a tenant's prep list everywhere; the next read rebuilds it from the DB."""
+    with _lock:
+        _prep_lists.pop(admin_id, None)
+    cache.invalidate(f"prep:{admin_id}")
+
+
+def get_prep_list(db: Session, admin_id: int) -> list:
+    with _lock:
+        entry = _prep_lists.get(admin_id)
+        fresh = entry is not None and time.monotonic() - entry["built_at"] < PREP_LIST_RECONCILE_SECONDS
+        if fresh:
+            dishes = {key: dict(dish) for key, dish in entry["dishes"].items()}
+
+    if not fresh:
+        dishes = _load_from_db(db, admin_id)
+        with _lock:
+            _prep_lists[admin_id] = {"built_at": time.monotonic(), "dishes": dishes}
+            dishes = {key: dict(dish) for key, dish in dishes.items()}
+
+    return [
+        {
+            "menu_item_id": menu_item_id,
+            "item_name": dish["item_name"],
+            "selected_type": selected_type,
+            "pending_quantity": dish["quantity"],
+        }
+        for (menu_item_id, selected_type), dish in dishes.items()
+    ]
+
+
+def _drop_prep_list(key: str):
+    with _lock:
+        _prep_lists.pop(int(key.split(":", 1)[1]), None)
+
+
+cache.on_invalidate("prep:", _drop_prep_list)
@@ -0,0 +1,255 @@
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Optional
+from urllib.parse import parse_qs
+
+from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from dotenv import load_dotenv
+
+from app import cache
+from app.auth import get_current_admin, get_current_superuser, oauth2_scheme
+from app.db import SessionLocal
+
+load_dotenv()
+
+# A superuser sends "X-Profile: 1" (or ?profile=1) and gets an X-Profile-Id
+# header back; the profile is then served by /superuser/profiles/{id}
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", 5))
+# Profiles live in the shared cache, so with several workers CACHE_URL must not be memory://
+PROFILE_TTL_SECONDS = int(os.getenv("PROFILE_TTL_SECONDS", 3600))
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_current = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    """Stack samples and SQL timings for one request."""
+
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.statements = []
+        self._frames = []          # speedscope shared frames
+        self._frame_index = {}     # code object -> index in _frames
+        self._threads = {}         # thread id -> (samples, weights)
+        self._done = threading.Event()
+        self._sampler = threading.Thread(target=self._sample, daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._sampler.start()
+
+    def stop(self):
+        self.duration = time.perf_counter() - self.started
+        self._done.set()
+        self._sampler.join()
+
+    def _frame(self, code) -> int:
+        index = self._frame_index.get(code)
+        if index is None:
+            index = self._frame_index[code] = len(self._frames)
+            self._frames.append({"name": code.co_name, "file": code.co_filename, "line": code.co_firstlineno})
+        return index
+
+    def _sample(self):
+        interval = PROFILE_SAMPLE_INTERVAL_MS / 1000.0
+        last = time.perf_counter()
+        while not self._done.wait(interval):
+            now = time.perf_counter()
+            weight, last = (now - last) * 1000.0, now
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self._sampler.ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                # Idle pool threads and the event loop waiting on sockets are
+                # noise; other requests running app code on this worker are not
+                # told apart from this one
+                if not any(code.co_filename.startswith(APP_DIR) for code in stack):
+                    continue
+                samples, weights = self._threads.setdefault(thread_id, ([], []))
+                samples.append([self._frame(code) for code in reversed(stack)])
+                weights.append(weight)
+
+    def speedscope(self) -> dict:
+        end = self.duration * 1000.0
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path}",
+            "exporter": "food-order-server",
+            "activeProfileIndex": 0,
+            "shared": {"frames": self._frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": f"thread {thread_id}",
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": end,
+                    "samples": samples,
+                    "weights": weights,
+                }
+                for thread_id, (samples, weights) in self._threads.items()
+            ],
+        }
+
+    def to_dict(self, status_code: Optional[int]) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status_code": status_code,
+            "duration_ms": round(self.duration * 1000.0, 3),
+            "sql_time_ms": round(sum(s["duration_ms"] for s in self.statements), 3),
+            "statements": self.statements,
+            "speedscope": self.speedscope(),
+        }
+
+
+# ---------- SQL TIMINGS ----------
+# Engine listeners exist only while a profile is running, so ordinary
+# requests never pay for them
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("profile_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _current.get()
+    started = conn.info.get("profile_started")
+    if profile is None or not started:
+        return
+    # Parameters are left out: they can hold password hashes and customer data
+    profile.statements.append({
+        "statement": statement,
+        "duration_ms": round((time.perf_counter() - started.pop()) * 1000.0, 3),
+        "executemany": executemany,
+        "database": conn.engine.url.render_as_string(hide_password=True),
+    })
+
+
+_active = 0
+_listeners_lock = threading.Lock()
+
+
+def _attach_listeners():
+    global _active
+    with _listeners_lock:
+        _active += 1
+        if _active == 1:
+            event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _detach_listeners():
+    global _active
+    with _listeners_lock:
+        _active -= 1
+        if _active == 0:
+            event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+            event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ---------- STORAGE ----------
+
+def _save_profile(profile: dict):
+    try:
+        cache.backend.set(f"profile:{profile['id']}", json.dumps(profile).encode(), ttl=PROFILE_TTL_SECONDS)
+    except (OSError, ConnectionError, cache.RESPError) as e:
+        print(f"⚠️ Saving profile {profile['id']} failed: {e}")
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    data = cache.backend.get(f"profile:{profile_id}")
+    return json.loads(data) if data is not None else None
+
+
+# ---------- MIDDLEWARE ----------
+
+def _is_flagged(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == PROFILE_HEADER:
+            return value.lower() in (b"1", b"true")
+    if scope["query_string"]:
+        values = parse_qs(scope["query_string"].decode("latin-1")).get(PROFILE_QUERY_PARAM)
+        return bool(values) and values[-1].lower() in ("1", "true")
+    return False
+
+
+def _authorize(request: Request, token: str):
+    # Same checks as the get_current_superuser dependency, run before the route
+    db = SessionLocal(info={"request": request})
+    try:
+        get_current_superuser(get_current_admin(request, token, db))
+    finally:
+        db.close()
+
+
+class ProfilerMiddleware:
+    """Profiles requests that ask for it; everything else passes straight through."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not _is_flagged(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        try:
+            token = await oauth2_scheme(request)
+            await run_in_threadpool(_authorize, request, token)
+        except HTTPException as e:
+            response = JSONResponse(status_code=e.status_code, content={"detail": e.detail}, headers=e.headers)
+            await response(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        status_code = None
+
+        async def send_with_profile(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Stored before the last byte goes out, so the id is fetchable as soon as the client has it
+                finish()
+            await send(message)
+
+        finished = False
+
+        def finish():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            profile.stop()
+            _detach_listeners()
+            _save_profile(profile.to_dict(status_code))
+
+        _attach_listeners()
+        context_token = _current.set(profile)
+        profile.start()
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            finish()
+            _current.reset(context_token)
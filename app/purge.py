@@ -0,0 +1,120 @@
+import os
+from datetime import timedelta
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models import Admin, TenantPurgeJob, ist_now
+from app.shards import TENANT_PARENT_MODELS, drop_admin_row, shard_for_admin, use_tenant
+
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", 500))
+# A running job whose heartbeat is older than this lost its worker (recycled,
+# redeployed) and is picked up again at the next startup
+PURGE_STALE_SECONDS = int(os.getenv("PURGE_STALE_SECONDS", 300))
+
+# Parents are deleted in this order; their children (order_items, quantity prices)
+# go with them through ON DELETE CASCADE, so nothing is loaded into the session.
+PURGE_STEPS = [(model.__tablename__, model) for model in TENANT_PARENT_MODELS]
+
+
+def queue_tenant_purge(db: Session, admin: Admin) -> TenantPurgeJob:
+    """Lock the admin out and record a purge job; the caller schedules run_tenant_purge."""
+    admin.deleted_at = ist_now()
+    job = TenantPurgeJob(admin_id=admin.id, status="queued", deleted_rows=0)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _delete_in_batches(db: Session, job: TenantPurgeJob, model, admin_id: int):
+    while True:
+        ids = [
+            row.id for row in
+            db.query(model.id).filter(model.admin_id == admin_id).limit(PURGE_BATCH_SIZE).all()
+        ]
+        if not ids:
+            return
+        deleted = db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        job.deleted_rows += deleted
+        job.heartbeat_at = ist_now()
+        db.commit()
+
+
+def _claimable():
+    stale_before = ist_now() - timedelta(seconds=PURGE_STALE_SECONDS)
+    return or_(
+        TenantPurgeJob.status == "queued",
+        and_(
+            TenantPurgeJob.status == "running",
+            or_(TenantPurgeJob.heartbeat_at.is_(None), TenantPurgeJob.heartbeat_at < stale_before),
+        ),
+    )
+
+
+def _claim(db: Session, job_id: int) -> bool:
+    """Mark the job running unless another worker already has it. Deleting is
+    idempotent, so a reclaimed job just carries on with what is left."""
+    claimed = db.query(TenantPurgeJob).filter(TenantPurgeJob.id == job_id, _claimable()).update(
+        {TenantPurgeJob.status: "running", TenantPurgeJob.heartbeat_at: ist_now()},
+        synchronize_session=False,
+    )
+    db.commit()
+    return bool(claimed)
+
+
+def run_tenant_purge(job_id: int):
+    """Delete a tenant in short batched transactions, recording progress on the job row."""
+    db = SessionLocal()
+    try:
+        if not _claim(db, job_id):
+            return
+        job = db.query(TenantPurgeJob).filter(TenantPurgeJob.id == job_id).first()
+
+        # Tenant rows are deleted on the tenant's shard, the job and admin rows on the primary
+        shard = shard_for_admin(job.admin_id)
+        use_tenant(db, job.admin_id)
+
+        for step, model in PURGE_STEPS:
+            job.current_step = step
+            db.commit()
+            _delete_in_batches(db, job, model, job.admin_id)
+
+        job.current_step = "admins"
+        drop_admin_row(job.admin_id, shard)
+        job.deleted_rows += db.query(Admin).filter(Admin.id == job.admin_id).delete(synchronize_session=False)
+        job.status = "done"
+        job.current_step = None
+        job.finished_at = ist_now()
+        db.commit()
+    except Exception as e:
+        # Anything left unmarked would sit in "running" until it goes stale;
+        # failed jobs are re-run from POST /superuser/purge-jobs/{id}/retry
+        db.rollback()
+        job = db.query(TenantPurgeJob).filter(TenantPurgeJob.id == job_id).first()
+        if job:
+            job.status = "failed"
+            job.error = str(getattr(e, "detail", None) or e)
+            db.commit()
+    finally:
+        db.close()
+
+
+def retry_tenant_purge(db: Session, job: TenantPurgeJob):
+    """Queue a failed job again; the caller schedules run_tenant_purge."""
+    job.status = "queued"
+    job.error = None
+    db.commit()
+
+
+def resume_tenant_purges():
+    """Run jobs that were queued or cut off when a worker stopped. Every worker
+    calls this at startup; each job is claimed by one of them."""
+    db = SessionLocal()
+    try:
+        job_ids = [job_id for job_id, in db.query(TenantPurgeJob.id).filter(_claimable()).order_by(TenantPurgeJob.id)]
+    finally:
+        db.close()
+    for job_id in job_ids:
+        run_tenant_purge(job_id)
@@ -0,0 +1,194 @@
+import math
+import zlib
+from functools import lru_cache
+from io import BytesIO
+from typing import Optional
+from xml.sax.saxutils import escape
+
+# Layout in QR modules, the proportions of the original 10 px/module PNG: a
+# footer under the code with the welcome line, logo and credit. Vector output
+# leaves the raster logo out (it would be most of the file), so its footer is shorter
+FOOTER_MODULES = 13
+VECTOR_FOOTER_MODULES = 8
+VECTOR_CREDIT_TOP = 5
+WELCOME_SIZE = 2.4
+CREDIT_SIZE = 1.6
+CREDIT_TEXT = "Powered by JiffyMenu"
+LOGO_PATH = "app/static/logo.png"
+
+# Helvetica advance widths (1/1000 em) for WinAnsi 32..126, used to centre PDF text
+HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+
+
+def qr_matrix(data: str) -> list:
+    """Rows of booleans (True = dark), quiet zone included."""
+    import qrcode
+
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=4)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def _dark_runs(matrix):
+    """(x, y, length) for each horizontal run of dark modules."""
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < len(row):
+            if row[x]:
+                start = x
+                while x < len(row) and row[x]:
+                    x += 1
+                yield start, y, x - start
+            else:
+                x += 1
+
+
+# ---------- SVG ----------
+
+def render_svg(matrix, title: str, size_mm: float) -> bytes:
+    n = len(matrix)
+    height = n + VECTOR_FOOTER_MODULES
+    path = "".join(f"M{x} {y}h{length}v1h-{length}z" for x, y, length in _dark_runs(matrix))
+    svg = (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {n} {height}" '
+        f'width="{size_mm:g}mm" height="{size_mm * height / n:g}mm" shape-rendering="crispEdges">'
+        f'<rect width="{n}" height="{height}" fill="#fff"/>'
+        f'<path d="{path}" fill="#000"/>'
+        f'<g font-family="Arial,Helvetica,sans-serif" text-anchor="middle">'
+        f'<text x="{n / 2:g}" y="{n + 1 + WELCOME_SIZE * 0.8:g}" font-size="{WELCOME_SIZE:g}">{escape(title)}</text>'
+        f'<text x="{n / 2:g}" y="{n + VECTOR_CREDIT_TOP + CREDIT_SIZE * 0.8:g}" font-size="{CREDIT_SIZE:g}" fill="#808080">{CREDIT_TEXT}</text>'
+        f'</g></svg>'
+    )
+    return svg.encode()
+
+
+# ---------- PDF ----------
+
+def _pdf_text(text: str) -> bytes:
+    data = text.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _text_width(text: str, size: float) -> float:
+    widths = (HELVETICA_WIDTHS[ord(c) - 32] if 32 <= ord(c) <= 126 else 556 for c in text)
+    return sum(widths) * size / 1000.0
+
+
+def render_pdf(matrix, title: str, size_mm: float) -> bytes:
+    n = len(matrix)
+    module = size_mm / 25.4 * 72 / n      # points per module
+    width, height = n * module, (n + VECTOR_FOOTER_MODULES) * module
+
+    def text_line(text, size, top, gray):
+        size_pt = size * module
+        x = (width - _text_width(text, size_pt)) / 2
+        y = height - (top + size * 0.8) * module
+        return b"%.3f g BT /F1 %.3f Tf %.3f %.3f Td %s Tj ET\n" % (gray, size_pt, x, y, _pdf_text(text))
+
+    content = BytesIO()
+    # Module units with y growing downwards, like the matrix rows
+    content.write(b"q %.5f 0 0 %.5f 0 %.3f cm 0 g\n" % (module, -module, height))
+    for x, y, length in _dark_runs(matrix):
+        content.write(b"%d %d %d 1 re\n" % (x, y, length))
+    content.write(b"f Q\n")
+    content.write(text_line(title, WELCOME_SIZE, n + 1, 0))
+    content.write(text_line(CREDIT_TEXT, CREDIT_SIZE, n + VECTOR_CREDIT_TOP, 0.5))
+    stream = zlib.compress(content.getvalue())
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.3f %.3f] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>" % (width, height),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream),
+    ]
+    pdf = BytesIO()
+    pdf.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(pdf.tell())
+        pdf.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = pdf.tell()
+    pdf.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        pdf.write(b"%010d 00000 n \n" % offset)
+    pdf.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return pdf.getvalue()
+
+
+# ---------- PNG ----------
+
+@lru_cache(maxsize=8)
+def _logo(height: int):
+    from PIL import Image
+
+    logo = Image.open(LOGO_PATH).convert("RGBA")
+    ratio = logo.width / logo.height
+    return logo.resize((int(height * ratio), height), Image.LANCZOS)
+
+
+def render_png(matrix, title: str, box_size: int, dpi: Optional[int] = None) -> bytes:
+    from PIL import Image, ImageDraw, ImageFont
+
+    n = len(matrix)
+    # One pixel per module, then a nearest-neighbour upscale: no per-module drawing
+    qr_img = Image.new("L", (n, n))
+    qr_img.putdata([0 if dark else 255 for row in matrix for dark in row])
+    qr_img = qr_img.resize((n * box_size, n * box_size), Image.NEAREST).convert("RGB")
+    scale = box_size / 10
+
+    try:
+        # Load logo, resized once per size
+        logo = _logo(round(60 * scale))
+
+        # Create a new image with white background for QR + space below
+        footer_height = FOOTER_MODULES * box_size  # space for text and logo
+        final_img = Image.new("RGB", (qr_img.width, qr_img.height + footer_height), "white")
+
+        # Paste QR on top
+        final_img.paste(qr_img, (0, 0))
+
+        draw = ImageDraw.Draw(final_img)
+
+        # Load fonts
+        try:
+            font_large = ImageFont.truetype("arial.ttf", round(WELCOME_SIZE * box_size))
+            font_small = ImageFont.truetype("arial.ttf", round(CREDIT_SIZE * box_size))
+        except OSError:
+            font_large = ImageFont.load_default(round(WELCOME_SIZE * box_size))
+            font_small = ImageFont.load_default(round(CREDIT_SIZE * box_size))
+
+        # Draw "Welcome to {Cafe Name}"
+        text_w = draw.textlength(title, font=font_large)
+        draw.text(((qr_img.width - text_w) // 2, qr_img.height + box_size), title, font=font_large, fill="black")
+
+        # Paste logo
+        logo_x = (qr_img.width - logo.width) // 2
+        logo_y = qr_img.height + 4 * box_size
+        final_img.paste(logo, (logo_x, logo_y), mask=logo)
+
+        # Draw small footer
+        small_text_w = draw.textlength(CREDIT_TEXT, font=font_small)
+        draw.text(((qr_img.width - small_text_w) // 2, logo_y + logo.height + math.ceil(scale * 5)), CREDIT_TEXT, font=font_small, fill="gray")
+
+    except FileNotFoundError:
+        print("⚠️ Logo not found, generating QR without branding.")
+        final_img = qr_img
+
+    buffer = BytesIO()
+    # Only a PNG sized for print says how big it is; the default screen PNG
+    # carries no pHYs chunk, as before
+    if dpi:
+        final_img.save(buffer, format="PNG", dpi=(dpi, dpi))
+    else:
+        final_img.save(buffer, format="PNG")
+    return buffer.getvalue()
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
-from app import models, auth, schemas
+from app import auth, schemas, statements
 from app.db import get_db
+from app.admission import limit_by_ip
 
 router = APIRouter(prefix="/login", tags=["Auth"])
 
-@router.post("", response_model=schemas.LoginResponse)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.Admin).filter(models.Admin.email == form_data.username).first()
-    if not user or not auth.verify_password(form_data.password, user.hashed_password):
+@router.post("", response_model=schemas.LoginResponse, dependencies=[Depends(limit_by_ip)])
+def login(
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+):
+    user = db.scalars(statements.active_admin_by_email(form_data.username)).first()
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
+    valid, needs_rehash = auth.verify_password_for_rehash(form_data.password, user.hashed_password)
+    if not valid:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+
+    # Hashed with other rounds than this instance uses: redo it after the response
+    if needs_rehash:
+        background_tasks.add_task(auth.rehash_password, user.id, form_data.password, user.hashed_password)
 
     token = auth.create_access_token({"sub": user.email})
 
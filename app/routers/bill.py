@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session, selectinload
+
+from app import models, schemas, bills
+from app.db import get_db
+from app.auth import get_current_admin
+
+router = APIRouter(prefix="/bills", tags=["Bills"])
+
+
+# ---------- OPEN BILL FOR A TABLE ----------
+@router.get("/by-table-id/{table_id}", response_model=schemas.BillOut)
+def get_open_bill_for_table(
+    table_id: int,
+    db: Session = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    # Totals are kept up to date by every order, so nothing is summed here
+    bill = db.query(models.TableSession).options(selectinload(models.TableSession.items)).filter(
+        models.TableSession.table_id == table_id,
+        models.TableSession.admin_id == current_admin.id,
+        models.TableSession.status == bills.OPEN
+    ).first()
+    if not bill:
+        raise HTTPException(status_code=404, detail="No open bill for this table")
+    return bills.bill_out(bill)
+
+
+# ---------- BILL BY ID ----------
+@router.get("/{bill_id}", response_model=schemas.BillOut)
+def get_bill(
+    bill_id: int,
+    db: Session = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    bill = db.query(models.TableSession).filter(
+        models.TableSession.id == bill_id,
+        models.TableSession.admin_id == current_admin.id
+    ).first()
+    if not bill:
+        raise HTTPException(status_code=404, detail="Bill not found")
+    return bills.bill_out(bill)
+
+
+# ---------- CLOSE OUT ----------
+# Freezes the bill; the table's next order opens a new one
+@router.post("/{bill_id}/close", response_model=schemas.BillOut)
+def close_bill(
+    bill_id: int,
+    db: Session = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    return bills.close_bill(db, current_admin.id, bill_id)
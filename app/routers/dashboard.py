@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app import models, schemas
+from app.db import get_read_db
+from app.auth import get_current_admin
+from app.prep_list import OPEN_ORDER_STATUSES
+
+router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+
+
+def _tables(db: Session, admin_id: int):
+    tables = db.query(models.Table).filter(models.Table.admin_id == admin_id).all()
+    return [schemas.TableOut.model_validate(table) for table in tables]
+
+
+def _menu_items(db: Session, admin_id: int):
+    items = db.query(models.MenuItem).options(
+        joinedload(models.MenuItem.food_category),
+        selectinload(models.MenuItem.quantity_prices),
+    ).filter(models.MenuItem.admin_id == admin_id).all()
+    return [schemas.MenuItemOut.model_validate(item) for item in items]
+
+
+def _food_categories(db: Session, admin_id: int):
+    categories = db.query(models.FoodCategory).filter(models.FoodCategory.admin_id == admin_id).all()
+    return [schemas.FoodCategoryOut.model_validate(category) for category in categories]
+
+
+def _active_orders(db: Session, admin_id: int):
+    orders = db.query(models.Order).options(
+        joinedload(models.Order.table),
+        selectinload(models.Order.items),
+    ).filter(
+        models.Order.admin_id == admin_id,
+        models.Order.status.in_(OPEN_ORDER_STATUSES)
+    ).order_by(models.Order.created_at).all()
+    return [schemas.OrderHistoryOut.model_validate(order) for order in orders]
+
+
+def _menu_version(db: Session, admin_id: int):
+    return db.query(func.max(models.MenuChange.version)).filter(models.MenuChange.admin_id == admin_id).scalar() or 0
+
+
+# ---------- DASHBOARD BOOTSTRAP ----------
+# The loaders run one after another on the request's session: one pooled
+# connection per request, however many loaders the dashboard grows
+@router.get("/bootstrap", response_model=schemas.DashboardBootstrapOut)
+def get_dashboard_bootstrap(
+    db: Session = Depends(get_read_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    admin_id = current_admin.id
+    return {
+        "tables": _tables(db, admin_id),
+        "menu_items": _menu_items(db, admin_id),
+        "food_categories": _food_categories(db, admin_id),
+        "active_orders": _active_orders(db, admin_id),
+        "menu_version": _menu_version(db, admin_id),
+    }
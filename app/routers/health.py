@@ -0,0 +1,39 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.db import replica_engines, shard_engines
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+# ---------- LIVENESS ----------
+# The process is up and serving; no dependencies are checked
+@router.get("/live")
+def liveness():
+    return {"status": "ok"}
+
+
+# ---------- READINESS ----------
+def _reachable(db_engine) -> bool:
+    try:
+        with db_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except SQLAlchemyError as e:
+        # Driver errors name hosts, ports and users: server log only
+        print(f"⚠️ Readiness check failed for {db_engine.url!r}: {e}")
+        return False
+    return True
+
+
+# Safe to route traffic here: the primary and every shard answer. Replicas are
+# reported but never fail the check, since reads fall back to the primary.
+@router.get("/ready")
+def readiness():
+    if not all([_reachable(shard_engine) for shard_engine in shard_engines.values()]):
+        return JSONResponse(status_code=503, content={"status": "unavailable"})
+    body = {"status": "ok", "database": "ok"}
+    if replica_engines:
+        body["replicas"] = ["ok" if _reachable(replica) else "unavailable" for replica in replica_engines]
+    return body
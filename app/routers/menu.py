@@ -1,43 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import update
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
-from app import models, schemas
-from app.db import get_db
+from app import models, schemas, statements
+from app.db import get_db, get_read_db
 from app.auth import get_current_admin
+from app.admission import check_tenant, limit_by_ip
+from app import menu_search
+from app.menu_changes import (
+    FOOD_CATEGORY, MENU_ITEM, DELETE, UPSERT, collect_menu_changes, record_menu_change, record_menu_changes
+)
 
 router = APIRouter(prefix="/menu", tags=["Menu"])
 
 
-# ---------- CREATE MENU ITEM ----------
-@router.post("/", response_model=schemas.MenuItemOut)
-def create_menu_item(
-    item: schemas.MenuItemCreate,
-    db: Session = Depends(get_db),
-    current_admin: models.Admin = Depends(get_current_admin)
-):
-    # Handle category
+# Look up a category by name (creating it if new) or by id; None if neither is given
+def resolve_category(db: Session, admin_id: int, food_category_name: Optional[str], food_category_id: Optional[int]):
     category = None
-    if item.food_category_name:
+    if food_category_name:
         category = db.query(models.FoodCategory).filter_by(
-            name=item.food_category_name.strip().lower(),
-            admin_id=current_admin.id
+            name=food_category_name.strip().lower(),
+            admin_id=admin_id
         ).first()
         if not category:
             category = models.FoodCategory(
-                name=item.food_category_name.strip().lower(),
-                admin_id=current_admin.id
+                name=food_category_name.strip().lower(),
+                admin_id=admin_id
             )
             db.add(category)
-            db.commit()
-            db.refresh(category)
-    elif item.food_category_id:
+            db.flush()
+            record_menu_change(db, admin_id, FOOD_CATEGORY, category.id)
+    elif food_category_id:
         category = db.query(models.FoodCategory).filter_by(
-            id=item.food_category_id,
-            admin_id=current_admin.id
+            id=food_category_id,
+            admin_id=admin_id
         ).first()
         if not category:
             raise HTTPException(status_code=404, detail="Category not found.")
+    return category
+
+
+# ---------- CREATE MENU ITEM ----------
+@router.post("/", response_model=schemas.MenuItemOut)
+def create_menu_item(
+    item: schemas.MenuItemCreate,
+    db: Session = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    # Handle category
+    category = resolve_category(db, current_admin.id, item.food_category_name, item.food_category_id)
 
     # Create MenuItem
     menu_item = models.MenuItem(
@@ -58,8 +70,10 @@ def create_menu_item(
             price=qp.price
         )
         db.add(price_entry)
+    record_menu_change(db, current_admin.id, MENU_ITEM, menu_item.id)
     db.commit()
     db.refresh(menu_item)
+    menu_search.index_menu_item(current_admin.id, menu_item)
 
     return menu_item
 
@@ -67,41 +81,85 @@ def create_menu_item(
 # ---------- GET MENU ITEMS FOR CURRENT ADMIN ----------
 @router.get("/", response_model=List[schemas.MenuItemOut])
 def get_menu_for_admin(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    items = db.query(models.MenuItem).filter(models.MenuItem.admin_id == current_admin.id).all()
+    items = db.scalars(statements.menu_items_of_admin(current_admin.id)).all()
     return items
 
 
 # ---------- GET MENU ITEMS BY TABLE ID (PUBLIC) ----------
-@router.get("/public/by-table-id/{table_id}", response_model=List[schemas.MenuItemOut])
+@router.get("/public/by-table-id/{table_id}", response_model=List[schemas.MenuItemOut], dependencies=[Depends(limit_by_ip)])
 def get_menu_by_table_id(
     table_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    table = db.query(models.Table).filter(models.Table.id == table_id).first()
+    table = db.scalars(statements.table_by_id(table_id)).first()
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
+    check_tenant(table.admin_id)
 
-    items = db.query(models.MenuItem).filter(models.MenuItem.admin_id == table.admin_id).all()
+    items = db.scalars(statements.menu_items_of_admin(table.admin_id)).all()
     return items
 
 
 # ---------- GET CATEGORIES BY TABLE ID ----------
-@router.get("/public/categories/by-table-id/{table_id}", response_model=List[schemas.FoodCategoryOut])
+@router.get("/public/categories/by-table-id/{table_id}", response_model=List[schemas.FoodCategoryOut], dependencies=[Depends(limit_by_ip)])
 def get_categories_by_table_id(
     table_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    table = db.query(models.Table).filter(models.Table.id == table_id).first()
+    table = db.scalars(statements.table_by_id(table_id)).first()
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
+    check_tenant(table.admin_id)
 
-    categories = db.query(models.FoodCategory).filter(models.FoodCategory.admin_id == table.admin_id).all()
+    categories = db.scalars(statements.categories_of_admin(table.admin_id)).all()
     return categories
 
 
+# ---------- MENU CHANGES SINCE VERSION (ADMIN) ----------
+@router.get("/changes", response_model=schemas.MenuChangesOut)
+def get_menu_changes(
+    since: int = Query(default=0, ge=0),
+    db: Session = Depends(get_read_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    return collect_menu_changes(db, current_admin.id, since)
+
+
+# ---------- MENU CHANGES SINCE VERSION BY TABLE ID (PUBLIC) ----------
+@router.get("/public/changes/by-table-id/{table_id}", response_model=schemas.MenuChangesOut, dependencies=[Depends(limit_by_ip)])
+def get_menu_changes_by_table_id(
+    table_id: int,
+    since: int = Query(default=0, ge=0),
+    db: Session = Depends(get_read_db)
+):
+    table = db.scalars(statements.table_by_id(table_id)).first()
+    if not table:
+        raise HTTPException(status_code=404, detail="Table not found")
+    check_tenant(table.admin_id)
+
+    return collect_menu_changes(db, table.admin_id, since)
+
+
+# ---------- SEARCH MENU BY TABLE ID (PUBLIC) ----------
+@router.get("/public/search/by-table-id/{table_id}", response_model=List[schemas.MenuItemOut], dependencies=[Depends(limit_by_ip)])
+def search_menu_by_table_id(
+    table_id: int,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: Session = Depends(get_db)
+):
+    # Served from this worker's in-memory index; the DB is only hit to (re)build it
+    admin_id = menu_search.resolve_table_admin(db, table_id)
+    if admin_id is None:
+        raise HTTPException(status_code=404, detail="Table not found")
+    check_tenant(admin_id)
+
+    return menu_search.search_menu(db, admin_id, q, limit)
+
+
 # ---------- UPDATE MENU ITEM ----------
 @router.put("/{item_id}", response_model=schemas.MenuItemOut)
 def update_menu_item(
@@ -119,27 +177,7 @@ def update_menu_item(
         raise HTTPException(status_code=404, detail="Menu item not found")
 
     # Handle category again
-    category = None
-    if item.food_category_name:
-        category = db.query(models.FoodCategory).filter_by(
-            name=item.food_category_name.strip().lower(),
-            admin_id=current_admin.id
-        ).first()
-        if not category:
-            category = models.FoodCategory(
-                name=item.food_category_name.strip().lower(),
-                admin_id=current_admin.id
-            )
-            db.add(category)
-            db.commit()
-            db.refresh(category)
-    elif item.food_category_id:
-        category = db.query(models.FoodCategory).filter_by(
-            id=item.food_category_id,
-            admin_id=current_admin.id
-        ).first()
-        if not category:
-            raise HTTPException(status_code=404, detail="Category not found.")
+    category = resolve_category(db, current_admin.id, item.food_category_name, item.food_category_id)
 
     # Update basic fields
     db_item.name = item.name
@@ -159,8 +197,98 @@ def update_menu_item(
             price=qp.price
         )
         db.add(price_entry)
+    record_menu_change(db, current_admin.id, MENU_ITEM, db_item.id)
+    db.commit()
+    db.refresh(db_item)
+    menu_search.index_menu_item(current_admin.id, db_item)
+
+    return db_item
+
+
+# ---------- BULK AVAILABILITY TOGGLE ----------
+@router.patch("/availability")
+def set_menu_availability(
+    data: schemas.MenuAvailabilityUpdate,
+    db: Session = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    if not data.ids:
+        return {"updated_ids": []}
+
+    # One UPDATE; rows already in the requested state are left alone
+    updated_ids = db.execute(
+        update(models.MenuItem)
+        .where(
+            models.MenuItem.admin_id == current_admin.id,
+            models.MenuItem.id.in_(data.ids),
+            models.MenuItem.is_available != data.is_available,
+        )
+        .values(is_available=data.is_available)
+        .returning(models.MenuItem.id)
+    ).scalars().all()
+
+    if updated_ids:
+        record_menu_changes(db, current_admin.id, [(MENU_ITEM, item_id, UPSERT) for item_id in updated_ids])
+    db.commit()
+    menu_search.set_indexed_availability(current_admin.id, updated_ids, data.is_available)
+    return {"updated_ids": sorted(updated_ids)}
+
+
+# ---------- PARTIAL UPDATE MENU ITEM ----------
+@router.patch("/{item_id}", response_model=schemas.MenuItemOut)
+def patch_menu_item(
+    item_id: int,
+    item: schemas.MenuItemPatch,
+    db: Session = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    db_item = db.query(models.MenuItem).filter(
+        models.MenuItem.id == item_id,
+        models.MenuItem.admin_id == current_admin.id
+    ).first()
+
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Menu item not found")
+
+    changed = False
+
+    if item.name is not None and item.name != db_item.name:
+        db_item.name = item.name
+        changed = True
+    if item.is_available is not None and item.is_available != db_item.is_available:
+        db_item.is_available = item.is_available
+        changed = True
+    if item.food_category_name or item.food_category_id:
+        category = resolve_category(db, current_admin.id, item.food_category_name, item.food_category_id)
+        if category.id != db_item.food_category_id:
+            db_item.food_category_id = category.id
+            changed = True
+
+    # Only price rows whose price or presence actually changed are written
+    if item.quantity_prices is not None:
+        wanted = {qp.quantity_type.value: qp.price for qp in item.quantity_prices}
+        for price_entry in list(db_item.quantity_prices):
+            new_price = wanted.pop(price_entry.quantity_type.value, None)
+            if new_price is None:
+                db_item.quantity_prices.remove(price_entry)
+                db.delete(price_entry)
+                changed = True
+            elif new_price != price_entry.price:
+                price_entry.price = new_price
+                changed = True
+        for quantity_type, price in wanted.items():
+            db_item.quantity_prices.append(models.MenuItemQuantityPrice(
+                quantity_type=quantity_type,
+                price=price
+            ))
+            changed = True
+
+    if changed:
+        record_menu_change(db, current_admin.id, MENU_ITEM, db_item.id)
     db.commit()
     db.refresh(db_item)
+    if changed:
+        menu_search.index_menu_item(current_admin.id, db_item)
 
     return db_item
 
@@ -181,5 +309,7 @@ def delete_menu_item(
         raise HTTPException(status_code=404, detail="Menu item not found")
 
     db.delete(db_item)
+    record_menu_change(db, current_admin.id, MENU_ITEM, item_id, DELETE)
     db.commit()
+    menu_search.unindex_menu_item(current_admin.id, item_id)
     return {"message": f"Item {item_id} deleted successfully."}
@@ -1,35 +1,47 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import update
+from sqlalchemy.orm import Session, joinedload, selectinload
 from typing import List, Dict, Optional
-from app import models, schemas
-from app.db import get_db
+from app import models, schemas, prep_list, menu_search, shards, order_status, order_ingest, bills, order_events, statements
+from app.db import get_db, get_read_db
 from app.auth import get_current_admin
+from app.admission import check_tenant, limit_by_ip
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
 # ✅ Order creation without authentication, using table_id only
-@router.post("/", response_model=Dict)
+@router.post("/", response_model=Dict, dependencies=[Depends(limit_by_ip)])
 def create_order(
     order_data: schemas.OrderCreate,
     db: Session = Depends(get_db)
 ):
-    table = db.query(models.Table).filter(models.Table.id == order_data.table_id).first()
+    # table_id is in the body, so point the session at the tenant's shard by hand
+    table_admin_id = menu_search.resolve_table_admin(db, order_data.table_id)
+    if table_admin_id is None:
+        raise HTTPException(status_code=400, detail="Invalid table ID")
+    shards.use_tenant(db, table_admin_id)
+
+    table = db.scalars(statements.table_by_id(order_data.table_id)).first()
     if not table:
         raise HTTPException(status_code=400, detail="Invalid table ID")
 
     admin_id = table.admin_id
-    order = models.Order(table_id=table.id, admin_id=admin_id)
-    db.add(order)
-    db.commit()
-    db.refresh(order)
+    check_tenant(admin_id)
+    table_id, table_number = table.id, table.table_number
+
+    # Price every line up front so nothing is written for a rejected order
+    menu_items = {
+        menu_item.id: menu_item
+        for menu_item in db.scalars(statements.menu_items_for_order(
+            admin_id, {item.menu_item_id for item in order_data.items}
+        ))
+    }
 
     total_amount = 0.0
+    order_items = []
 
     for item in order_data.items:
-        menu_item = db.query(models.MenuItem).filter(
-            models.MenuItem.id == item.menu_item_id,
-            models.MenuItem.admin_id == admin_id
-        ).first()
+        menu_item = menu_items.get(item.menu_item_id)
 
         if not menu_item:
             continue
@@ -50,21 +62,37 @@ def create_order(
         item_total = unit_price * item.quantity
         total_amount += item_total
 
-        order_item = models.OrderItem(
-            order_id=order.id,
+        order_items.append(models.OrderItem(
             menu_item_id=menu_item.id,
             quantity=item.quantity,
             selected_type=item.selected_type,
-            price_at_order=unit_price
-        )
-        db.add(order_item)
+            price_at_order=unit_price,
+            item_name=menu_item.name,
+            category_name=menu_item.food_category.name if menu_item.food_category else None,
+        ))
 
-    order.total_amount = total_amount
-    db.commit()
+    pending = order_ingest.PendingOrder(admin_id, table_id, total_amount, order_items)
+    lines = prep_list.order_lines(order_items)
+
+    if order_ingest.ORDER_GROUP_COMMIT:
+        # Give the connection back while the order waits for its batch
+        db.commit()
+        try:
+            order_id = order_ingest.submit(pending)
+        except TimeoutError:
+            raise HTTPException(
+                status_code=503,
+                detail="Order is taking longer than usual. Please check with staff before ordering again."
+            )
+    else:
+        order_id = order_ingest.write_orders(db, [pending])[0]
+        db.commit()
+
+    prep_list.record_order_opened(admin_id, lines)
     return {
         "message": "Order placed successfully",
-        "order_id": order.id,
-        "table_number": table.table_number,
+        "order_id": order_id,
+        "table_number": table_number,
     }
 
 
@@ -75,32 +103,132 @@ def get_orders(
     db: Session = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    return db.query(models.Order).filter(models.Order.admin_id == current_admin.id).all()
+    # Lines come from the order_items snapshot, so the live menu is never loaded
+    return db.query(models.Order).options(
+        joinedload(models.Order.table),
+        selectinload(models.Order.items),
+    ).filter(models.Order.admin_id == current_admin.id).all()
 
 
 @router.patch("/{order_id}/status")
 def update_order_status(
     order_id: int,
-    status: str,
+    status: schemas.OrderStatus,
     estimated_time: Optional[str] = Query(default=None),
+    expected_version: Optional[int] = Query(default=None),
     db: Session = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin),
 ):
-    order = db.query(models.Order).filter(
+    current = db.query(models.Order.status, models.Order.version).filter(
         models.Order.id == order_id,
         models.Order.admin_id == current_admin.id
     ).first()
 
-    if not order:
+    if not current:
         raise HTTPException(status_code=404, detail="Order not found")
+    if expected_version is not None and current.version != expected_version:
+        raise HTTPException(status_code=409, detail="Order was changed by someone else, reload and retry.")
+    if not order_status.can_transition(current.status, status.value):
+        raise HTTPException(
+            status_code=409,
+            detail=f"Order {order_id} cannot move from '{current.status}' to '{status.value}'."
+        )
 
-    order.status = status
+    values = {"status": status.value, "version": models.Order.version + 1}
+    if estimated_time is not None:
+        values["estimated_time"] = estimated_time
+
+    # Compare-and-set: a concurrent change since the read above matches no row
+    new_version = db.execute(
+        update(models.Order)
+        .where(
+            models.Order.id == order_id,
+            models.Order.admin_id == current_admin.id,
+            models.Order.status == current.status,
+            models.Order.version == current.version,
+        )
+        .values(**values)
+        .returning(models.Order.version)
+    ).scalar()
+    if new_version is None:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Order was changed by someone else, reload and retry.")
+    if status == schemas.OrderStatus.cancelled and current.status != status.value:
+        bills.remove_orders(db, [order_id])
 
+    payload = {"status": status.value, "previous_status": current.status, "version": new_version}
     if estimated_time is not None:
-        order.estimated_time = estimated_time
+        payload["estimated_time"] = estimated_time
+    event_type = order_events.STATUS_CHANGED if current.status != status.value else order_events.UPDATED
+
+    was_open, now_open = prep_list.is_open_status(current.status), prep_list.is_open_status(status.value)
+    lines = []
+    if was_open != now_open:
+        lines = prep_list.order_lines(
+            db.query(models.OrderItem).filter(models.OrderItem.order_id == order_id).all()
+        )
+    order_events.record(db, [(current_admin.id, order_id, event_type, payload)])
+    db.commit()
+
+    if was_open and not now_open:
+        prep_list.record_order_closed(current_admin.id, lines)
+    elif now_open and not was_open:
+        prep_list.record_order_opened(current_admin.id, lines)
+    return {
+        "message": f"Order {order_id} updated to '{status.value}'.",
+        "status": status.value,
+        "version": new_version,
+    }
 
+
+@router.patch("/status")
+def bulk_update_order_status(
+    data: schemas.OrderStatusBulkUpdate,
+    db: Session = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin),
+):
+    if not data.order_ids:
+        return {"updated": [], "skipped_ids": []}
+
+    target = data.status.value
+    if data.expected_status is not None:
+        if not order_status.can_transition(data.expected_status.value, target):
+            raise HTTPException(
+                status_code=409,
+                detail=f"Orders cannot move from '{data.expected_status.value}' to '{target}'."
+            )
+        sources = [data.expected_status.value]
+    else:
+        sources = order_status.sources_for(target)
+
+    # One UPDATE; orders in any other status (or another tenant's) are skipped
+    updated = db.execute(
+        update(models.Order)
+        .where(
+            models.Order.admin_id == current_admin.id,
+            models.Order.id.in_(data.order_ids),
+            models.Order.status.in_(sources),
+        )
+        .values(status=target, version=models.Order.version + 1)
+        .returning(models.Order.id, models.Order.version)
+    ).all()
+    if updated and data.status == schemas.OrderStatus.cancelled:
+        bills.remove_orders(db, [order_id for order_id, _ in updated])
+    order_events.record(db, [
+        (current_admin.id, order_id, order_events.STATUS_CHANGED, {"status": target, "version": version})
+        for order_id, version in sorted(updated)
+    ])
     db.commit()
-    return {"message": f"Order {order_id} updated to '{status}'."}
+
+    # Which orders changed from which status is not returned, so rebuild rather than patch
+    if updated and any(prep_list.is_open_status(source) != prep_list.is_open_status(target) for source in sources):
+        prep_list.reset(current_admin.id)
+
+    updated_ids = {order_id for order_id, _ in updated}
+    return {
+        "updated": [{"id": order_id, "version": version} for order_id, version in sorted(updated)],
+        "skipped_ids": sorted(set(data.order_ids) - updated_ids),
+    }
 
 
 @router.delete("/{order_id}", response_model=Dict)
@@ -117,12 +245,38 @@ def delete_order(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
 
+    lines = prep_list.order_lines(order.items) if prep_list.is_open_status(order.status) else []
+    if order.status != models.OrderStatus.cancelled.value:
+        bills.remove_orders(db, [order_id])
+
     db.delete(order)
+    order_events.record(db, [(current_admin.id, order_id, order_events.DELETED, {"status": order.status})])
     db.commit()
+    prep_list.record_order_closed(current_admin.id, lines)
 
     return {"message": f"Order {order_id} deleted successfully"}
 
 
+@router.get("/events", response_model=schemas.OrderEventPage)
+def get_order_events(
+    after: int = Query(default=0, ge=0, description="Last seq already processed; 0 replays from the start"),
+    limit: int = Query(default=500, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    # Consumers keep next_offset and pass it back as `after`; keep pulling while has_more
+    return order_events.read_events(db, current_admin.id, after, limit)
+
+
+@router.get("/prep-list", response_model=List[schemas.PrepListEntryOut])
+def get_prep_list(
+    db: Session = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    # Pending quantity per dish across all open orders, served from memory
+    return prep_list.get_prep_list(db, current_admin.id)
+
+
 
 
 from fastapi import APIRouter, Depends
@@ -149,7 +303,7 @@ def poll_new_orders(
         "orders": [
             {
                 "id": order.id,
-                "table_number": order.table.table_number,
+                "table_number": order.table_number,
                 "created_at": order.created_at.isoformat()
             }
             for order in orders
@@ -157,10 +311,14 @@ def poll_new_orders(
     }
 
 from app import models, schemas, auth
-@router.get("/history", response_model=List[schemas.OrderOut])
+@router.get("/history", response_model=List[schemas.OrderHistoryOut])
 def get_order_history_with_secret(
     secret_key_verified: bool = Depends(auth.verify_secret_key),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_admin: models.Admin = Depends(auth.get_current_admin),
 ):
-    return db.query(models.Order).filter(models.Order.admin_id == current_admin.id).all()
+    # Lines carry their own name/category snapshot, so no menu tables are touched
+    return db.query(models.Order).options(
+        joinedload(models.Order.table),
+        selectinload(models.Order.items),
+    ).filter(models.Order.admin_id == current_admin.id).all()
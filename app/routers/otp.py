@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from app import schemas, models, auth
+from app import schemas, models, auth, shards
 from app.utils import (
     generate_otp,
     save_or_update_otp,
@@ -8,8 +8,9 @@ from app.utils import (
     delete_expired_otps,
 )
 from app.db import get_db
+from app.admission import limit_by_ip
 
-router = APIRouter(prefix="/otp", tags=["otp"])
+router = APIRouter(prefix="/otp", tags=["otp"], dependencies=[Depends(limit_by_ip)])
 
 
 @router.post("/request-otp")
@@ -77,6 +78,7 @@ def verify_and_register(data: schemas.OTPOnly, db: Session = Depends(get_db)):
     db.delete(record)
     db.commit()
     db.refresh(admin)
+    shards.assign_shard(db, admin)
 
     return {"message": "Admin created successfully. Please login."}
 
@@ -1,97 +1,116 @@
 # app/routes/qr.py
 
-import qrcode
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import StreamingResponse
-from io import BytesIO
+import math
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from app.models import Table
 from app.db import get_db
-from PIL import Image, ImageDraw, ImageFont
+from app.admission import check_tenant, limit_by_ip
+from app import qr_render
 
 router = APIRouter(prefix="/qr", tags=["QR Code"])
 
-@router.get("/{table_id}")
+# Preferred first: when a client accepts several equally, it gets the PNG it always got
+QR_FORMATS = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+}
+
+# Print size of the code itself when a vector format is asked for without size_mm
+DEFAULT_PRINT_SIZE_MM = 50
+# PNG without size_mm keeps the original 10 px per module
+DEFAULT_BOX_SIZE = 10
+MAX_PNG_SIDE_PX = 6000
+
+
+def _accept_quality(accept: str, media_type: str) -> float:
+    """q of the most specific range in an Accept header that matches media_type."""
+    main_type = media_type.split("/")[0]
+    best = None   # (specificity, q)
+    for part in accept.split(","):
+        media_range, *params = [piece.strip() for piece in part.split(";")]
+        if media_range == media_type:
+            specificity = 2
+        elif media_range == f"{main_type}/*":
+            specificity = 1
+        elif media_range == "*/*":
+            specificity = 0
+        else:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    pass
+        if best is None or specificity > best[0]:
+            best = (specificity, q)
+    return best[1] if best else 0.0
+
+
+def negotiate_format(accept: Optional[str]) -> str:
+    if not accept:
+        return "png"
+    qualities = {fmt: _accept_quality(accept, media_type) for fmt, media_type in QR_FORMATS.items()}
+    fmt = max(qualities, key=qualities.get)   # ties keep QR_FORMATS order
+    if qualities[fmt] <= 0:
+        raise HTTPException(
+            status_code=406,
+            detail=f"Supported formats: {', '.join(QR_FORMATS.values())}.",
+        )
+    return fmt
+
+
+@router.get("/{table_id}", dependencies=[Depends(limit_by_ip)])
 def generate_qr(
     table_id: int,
+    format: Optional[Literal["png", "svg", "pdf"]] = Query(default=None, description="Overrides the Accept header"),
+    size_mm: Optional[float] = Query(default=None, ge=10, le=1000, description="Printed width of the code"),
+    dpi: int = Query(default=300, ge=72, le=1200, description="PNG resolution when size_mm is given"),
+    accept: Optional[str] = Header(default=None),
     db: Session = Depends(get_db),
 ):
+    fmt = format or negotiate_format(accept)
+
     # Validate table
     table = db.query(Table).filter(Table.id == table_id).first()
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
     if not table.admin:
         raise HTTPException(status_code=400, detail="Table not linked to a restaurant")
+    check_tenant(table.admin_id)
 
-    cafe_name = table.admin.restaurant_name
+    title = f"Welcome to {table.admin.restaurant_name}"
 
     # Generate QR
     qr_url = f"https://www.jiffymenu.com/food?table_id={table.id}"
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_M,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(qr_url)
-    qr.make(fit=True)
-    qr_img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
-
-    try:
-        # Load logo
-        logo_path = "app/static/logo.png"
-        logo = Image.open(logo_path).convert("RGBA")
-
-        # Resize logo
-        logo_height = 60
-        ratio = logo.width / logo.height
-        logo = logo.resize((int(logo_height * ratio), logo_height), Image.LANCZOS)
-
-        # Create a new image with white background for QR + space below
-        spacing = 20
-        footer_height = 120  # space for text and logo
-        final_img = Image.new("RGB", (qr_img.width, qr_img.height + footer_height), "white")
-
-        # Paste QR on top
-        final_img.paste(qr_img, (0, 0))
-
-        draw = ImageDraw.Draw(final_img)
-
-        # Load fonts
-        try:
-            font_large = ImageFont.truetype("arial.ttf", 24)
-            font_small = ImageFont.truetype("arial.ttf", 16)
-        except:
-            font_large = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-
-        # Draw "Welcome to {Cafe Name}"
-        welcome_text = f"Welcome to {cafe_name}"
-        text_w = draw.textlength(welcome_text, font=font_large)
-        draw.text(((qr_img.width - text_w) // 2, qr_img.height + 10), welcome_text, font=font_large, fill="black")
-
-        # Paste logo
-        logo_x = (qr_img.width - logo.width) // 2
-        logo_y = qr_img.height + 40
-        final_img.paste(logo, (logo_x, logo_y), mask=logo)
-
-        # Draw small footer
-        powered_by = "Powered by JiffyMenu"
-        small_text_w = draw.textlength(powered_by, font=font_small)
-        draw.text(((qr_img.width - small_text_w) // 2, qr_img.height + 40 + logo.height + 5), powered_by, font=font_small, fill="gray")
-
-    except FileNotFoundError:
-        print("⚠️ Logo not found, generating QR without branding.")
-        final_img = qr_img
-
-    buffer = BytesIO()
-    final_img.save(buffer, format="PNG")
-    buffer.seek(0)
-
-    return StreamingResponse(
-        buffer,
-        media_type="image/png",
+    matrix = qr_render.qr_matrix(qr_url)
+
+    # Vector formats are drawn straight from the module matrix, no rasterizing
+    if fmt == "svg":
+        content = qr_render.render_svg(matrix, title, size_mm or DEFAULT_PRINT_SIZE_MM)
+    elif fmt == "pdf":
+        content = qr_render.render_pdf(matrix, title, size_mm or DEFAULT_PRINT_SIZE_MM)
+    else:
+        box_size, png_dpi = DEFAULT_BOX_SIZE, None
+        if size_mm:
+            png_dpi = dpi
+            box_size = max(1, math.ceil(size_mm / 25.4 * dpi / len(matrix)))
+            if box_size * len(matrix) > MAX_PNG_SIDE_PX:
+                raise HTTPException(status_code=400, detail="Requested PNG is too large; lower size_mm or dpi, or ask for SVG/PDF.")
+        content = qr_render.render_png(matrix, title, box_size, png_dpi)
+
+    return Response(
+        content=content,
+        media_type=QR_FORMATS[fmt],
         headers={
-            "Content-Disposition": f"attachment; filename=table_{table.table_number}_qr.png"
+            "Content-Disposition": f"attachment; filename=table_{table.table_number}_qr.{fmt}",
+            "Vary": "Accept",
         },
     )
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List
 
-from app import models, schemas, auth
-from app.db import get_db
+from app import models, schemas, auth, shards, profiler
+from app.db import get_db, get_read_db
 from app.auth import get_current_superuser
+from app.purge import queue_tenant_purge, retry_tenant_purge, run_tenant_purge
 
 router = APIRouter(prefix="/superuser", tags=["Superuser"])
 
@@ -31,15 +34,85 @@ def create_admin(
     db.add(new_admin)
     db.commit()
     db.refresh(new_admin)
+    shards.assign_shard(db, new_admin)
     return new_admin
 
 # ---------- LIST ADMINS ----------
 @router.get("/admins", response_model=List[schemas.AdminOut])
 def list_admins(
-    db: Session = Depends(get_db),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: Session = Depends(get_read_db),
+    superuser: models.Admin = Depends(get_current_superuser)
+):
+    return db.query(models.Admin).filter(
+        models.Admin.is_superuser == 0,
+        models.Admin.deleted_at.is_(None)
+    ).order_by(models.Admin.id).offset(skip).limit(limit).all()
+
+# ---------- TENANT OVERVIEW ----------
+@router.get("/tenants", response_model=schemas.TenantPage)
+def list_tenants(
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=50, ge=1, le=200),
+    db: Session = Depends(get_read_db),
     superuser: models.Admin = Depends(get_current_superuser)
 ):
-    return db.query(models.Admin).filter(models.Admin.is_superuser == 0).all()
+    tenant_filter = (models.Admin.is_superuser == 0, models.Admin.deleted_at.is_(None))
+    today_start = models.ist_now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    page = db.query(
+        models.Admin.id,
+        models.Admin.name,
+        models.Admin.email,
+        models.Admin.restaurant_name,
+    ).filter(*tenant_filter).order_by(models.Admin.id).offset(skip).limit(limit).all()
+    total = db.query(func.count(models.Admin.id)).filter(*tenant_filter).scalar()
+
+    # Tenant data lives on each tenant's shard: ask only the shards holding this page
+    groups = shards.shards_of([row.id for row in page])
+    results = shards.fan_out(
+        lambda shard_db, shard: _tenant_stats(shard_db, groups[shard], today_start),
+        groups,
+    )
+
+    items = []
+    for row in page:
+        item = {**row._asdict(), "table_count": 0, "menu_item_count": 0, "orders_today": 0, "revenue_today": 0.0}
+        for stats in results.values():
+            for key, value in stats.get(row.id, {}).items():
+                item[key] += value
+        items.append(item)
+
+    return {
+        "total": total,
+        "skip": skip,
+        "limit": limit,
+        "items": items,
+    }
+
+# Grouped per-tenant aggregates for the admins of one page on one shard
+def _tenant_stats(db: Session, admin_ids: List[int], today_start) -> dict:
+    stats = {admin_id: {} for admin_id in admin_ids}
+    for admin_id, count in db.query(models.Table.admin_id, func.count(models.Table.id)).filter(
+        models.Table.admin_id.in_(admin_ids)
+    ).group_by(models.Table.admin_id):
+        stats[admin_id]["table_count"] = count
+    for admin_id, count in db.query(models.MenuItem.admin_id, func.count(models.MenuItem.id)).filter(
+        models.MenuItem.admin_id.in_(admin_ids)
+    ).group_by(models.MenuItem.admin_id):
+        stats[admin_id]["menu_item_count"] = count
+    for admin_id, count, revenue in db.query(
+        models.Order.admin_id,
+        func.count(models.Order.id),
+        func.coalesce(func.sum(models.Order.total_amount), 0.0),
+    ).filter(
+        models.Order.admin_id.in_(admin_ids),
+        models.Order.created_at >= today_start
+    ).group_by(models.Order.admin_id):
+        stats[admin_id]["orders_today"] = count
+        stats[admin_id]["revenue_today"] = revenue
+    return stats
 
 # ---------- UPDATE ADMIN ----------
 @router.put("/admins/{admin_id}", response_model=schemas.AdminOut)
@@ -49,7 +122,11 @@ def update_admin(
     db: Session = Depends(get_db),
     superuser: models.Admin = Depends(get_current_superuser)
 ):
-    admin = db.query(models.Admin).filter(models.Admin.id == admin_id, models.Admin.is_superuser == 0).first()
+    admin = db.query(models.Admin).filter(
+        models.Admin.id == admin_id,
+        models.Admin.is_superuser == 0,
+        models.Admin.deleted_at.is_(None)
+    ).first()
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
 
@@ -64,19 +141,84 @@ def update_admin(
     return admin
 
 # ---------- DELETE ADMIN ----------
-@router.delete("/admins/{admin_id}")
+@router.delete("/admins/{admin_id}", status_code=status.HTTP_202_ACCEPTED)
 def delete_admin(
     admin_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     superuser: models.Admin = Depends(get_current_superuser)
 ):
-    admin = db.query(models.Admin).filter(models.Admin.id == admin_id, models.Admin.is_superuser == 0).first()
+    admin = db.query(models.Admin).filter(
+        models.Admin.id == admin_id,
+        models.Admin.is_superuser == 0,
+        models.Admin.deleted_at.is_(None)
+    ).first()
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
 
-    db.delete(admin)
-    db.commit()
-    return {"message": f"Admin with ID {admin_id} deleted."}
+    # The admin is locked out now; their data is removed in batches after the response
+    job = queue_tenant_purge(db, admin)
+    background_tasks.add_task(run_tenant_purge, job.id)
+    return {"message": f"Admin with ID {admin_id} scheduled for deletion.", "job_id": job.id}
+
+# ---------- PURGE JOB PROGRESS ----------
+@router.get("/purge-jobs/{job_id}", response_model=schemas.TenantPurgeJobOut)
+def get_purge_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    superuser: models.Admin = Depends(get_current_superuser)
+):
+    job = db.query(models.TenantPurgeJob).filter(models.TenantPurgeJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Purge job not found")
+    return job
+
+# ---------- RETRY FAILED PURGE ----------
+@router.post("/purge-jobs/{job_id}/retry", response_model=schemas.TenantPurgeJobOut, status_code=status.HTTP_202_ACCEPTED)
+def retry_purge_job(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    superuser: models.Admin = Depends(get_current_superuser)
+):
+    job = db.query(models.TenantPurgeJob).filter(models.TenantPurgeJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Purge job not found")
+    if job.status != "failed":
+        raise HTTPException(status_code=409, detail=f"Purge job {job_id} is {job.status}, only failed jobs are retried.")
+
+    # Picks up where the failed run stopped; rows already deleted stay deleted
+    retry_tenant_purge(db, job)
+    background_tasks.add_task(run_tenant_purge, job.id)
+    db.refresh(job)
+    return job
+
+# ---------- REQUEST PROFILES ----------
+# Summary and SQL statements of a request profiled with "X-Profile: 1"
+@router.get("/profiles/{profile_id}")
+def get_request_profile(
+    profile_id: str,
+    superuser: models.Admin = Depends(get_current_superuser)
+):
+    profile = profiler.load_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+    profile.pop("speedscope")
+    return profile
+
+# The sampled stacks; open the download in https://www.speedscope.app
+@router.get("/profiles/{profile_id}/speedscope")
+def get_request_profile_speedscope(
+    profile_id: str,
+    superuser: models.Admin = Depends(get_current_superuser)
+):
+    profile = profiler.load_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found or expired")
+    return JSONResponse(
+        content=profile["speedscope"],
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'},
+    )
 
 # ---------- SIGNUP ADMIN ----------
 @router.post("/signup", response_model=schemas.AdminOut)
@@ -97,4 +239,5 @@ def signup_admin(admin_data: schemas.AdminCreate, db: Session = Depends(get_db))
     db.add(new_admin)
     db.commit()
     db.refresh(new_admin)
+    shards.assign_shard(db, new_admin)
     return new_admin
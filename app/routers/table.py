@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
-from app import models, schemas
-from app.db import get_db
+from app import models, schemas, menu_search, shards
+from app.db import dialect_insert, get_db, get_read_db
 from app.auth import get_current_admin
+from app.admission import limit_by_ip
 
 router = APIRouter(prefix="/tables", tags=["Tables"])
 
@@ -14,20 +17,65 @@ def create_table(
     db: Session = Depends(get_db),
     current_admin: models.Admin = Depends(get_current_admin)
 ):
-    # Ensure unique table number for this admin
-    existing = db.query(models.Table).filter(
-        models.Table.admin_id == current_admin.id,
-        models.Table.table_number == table.table_number
-    ).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Table number already exists.")
+    # Ids come from the directory so they are unique across shards
+    entry = models.TableDirectory(admin_id=current_admin.id)
+    db.add(entry)
+    db.flush()
 
-    table_obj = models.Table(**table.dict(), admin_id=current_admin.id)
+    table_obj = models.Table(**table.dict(), id=entry.id, admin_id=current_admin.id)
     db.add(table_obj)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # uq_tables_admin_id_table_number keeps numbers unique, however close two requests are
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Table number already exists.")
     db.refresh(table_obj)
     return table_obj
 
+# 🔹 Create many tables at once, e.g. tables 1-50 when onboarding a venue
+@router.post("/bulk", response_model=schemas.TableBulkOut)
+def create_tables(
+    payload: schemas.TableBulkCreate,
+    db: Session = Depends(get_db),
+    current_admin: models.Admin = Depends(get_current_admin)
+):
+    numbers = payload.numbers()
+
+    # One directory id per number; the ones the insert below does not use are handed back
+    ids = db.execute(
+        insert(models.TableDirectory).returning(models.TableDirectory.id),
+        [{"admin_id": current_admin.id}] * len(numbers)
+    ).scalars().all()
+
+    # A single statement: numbers the restaurant already has are skipped, not errors
+    created = db.execute(
+        dialect_insert(db, models.Table)
+        .values([
+            {"id": table_id, "admin_id": current_admin.id, "table_number": number}
+            for table_id, number in zip(ids, numbers)
+        ])
+        .on_conflict_do_nothing(index_elements=["admin_id", "table_number"])
+        .returning(models.Table.id, models.Table.table_number)
+    ).all()
+
+    unused_ids = set(ids) - {row.id for row in created}
+    if unused_ids:
+        db.query(models.TableDirectory).filter(
+            models.TableDirectory.id.in_(unused_ids)
+        ).delete(synchronize_session=False)
+    db.commit()
+
+    # Ready for QR generation: GET /qr/{id} for each created table
+    created_numbers = {row.table_number for row in created}
+    return {
+        "created": sorted(
+            ({"id": row.id, "table_number": row.table_number} for row in created),
+            key=lambda table: table["table_number"]
+        ),
+        "existing_table_numbers": [number for number in numbers if number not in created_numbers],
+    }
+
 # 🔹 Get tables of the current admin
 @router.get("/", response_model=List[schemas.TableOut])
 def get_tables(
@@ -37,9 +85,21 @@ def get_tables(
     return db.query(models.Table).filter(models.Table.admin_id == current_admin.id).all()
 
 # 🔹 Public endpoint to get all tables (used only if superuser/frontend needs it)
-@router.get("/public", response_model=List[schemas.TableOut])
-def get_all_tables(db: Session = Depends(get_db)):
-    return db.query(models.Table).all()
+@router.get("/public", response_model=List[schemas.TableOut], dependencies=[Depends(limit_by_ip)])
+def get_all_tables(
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=500),
+    db: Session = Depends(get_read_db)
+):
+    if not shards.is_sharded():
+        return db.query(models.Table).order_by(models.Table.id).offset(skip).limit(limit).all()
+
+    # Each shard returns its first skip+limit tables; the page is cut from the merged list
+    results = shards.fan_out(
+        lambda shard_db, shard: shard_db.query(models.Table).order_by(models.Table.id).limit(skip + limit).all()
+    )
+    merged = sorted((table for tables in results.values() for table in tables), key=lambda table: table.id)
+    return merged[skip:skip + limit]
 
 # 🔹 Update a table (admin-scoped)
 @router.put("/{table_id}", response_model=schemas.TableOut)
@@ -58,7 +118,11 @@ def update_table(
         raise HTTPException(status_code=404, detail="Table not found")
 
     table_obj.table_number = table.table_number
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Table number already exists.")
     db.refresh(table_obj)
     return table_obj
 
@@ -78,5 +142,7 @@ def delete_table(
         raise HTTPException(status_code=404, detail="Table not found")
 
     db.delete(table_obj)
+    db.query(models.TableDirectory).filter(models.TableDirectory.id == table_id).delete()
     db.commit()
+    menu_search.forget_table(table_id)
     return {"message": f"Table {table_id} deleted."}
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, ConfigDict, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, ConfigDict, field_validator, model_validator
+from typing import Any, Dict, Optional, List
 from enum import Enum
 from datetime import datetime
 
@@ -9,6 +9,15 @@ class QuantityEnum(str, Enum):
     half = "half"
     full = "full"
 
+class OrderStatus(str, Enum):
+    pending = "pending"
+    accepted = "accepted"
+    preparing = "preparing"
+    ready = "ready"
+    served = "served"
+    completed = "completed"
+    cancelled = "cancelled"
+
 # ---------- AUTH ----------
 class LoginRequest(BaseModel):
     email: EmailStr
@@ -36,6 +45,34 @@ class AdminOut(AdminBase):
     is_superuser: int
     model_config = ConfigDict(from_attributes=True)
 
+class TenantPurgeJobOut(BaseModel):
+    id: int
+    admin_id: int
+    status: str
+    current_step: Optional[str]
+    deleted_rows: int
+    error: Optional[str]
+    created_at: datetime
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime]
+    model_config = ConfigDict(from_attributes=True)
+
+class TenantSummaryOut(BaseModel):
+    id: int
+    name: str
+    email: Optional[str]
+    restaurant_name: str
+    table_count: int
+    menu_item_count: int
+    orders_today: int
+    revenue_today: float
+
+class TenantPage(BaseModel):
+    total: int
+    skip: int
+    limit: int
+    items: List[TenantSummaryOut]
+
 class UserOut(BaseModel):
     id: int
     email: EmailStr
@@ -63,6 +100,7 @@ class FoodCategoryOut(FoodCategoryBase):
 class QuantityPrice(BaseModel):
     quantity_type: QuantityEnum
     price: float
+    model_config = ConfigDict(from_attributes=True)
 
 # ---------- MENU ITEM ----------
 class MenuItemBase(BaseModel):
@@ -77,6 +115,18 @@ class MenuItemCreate(BaseModel):
     food_category_id: Optional[int] = None    # Or by ID
     quantity_prices: List[QuantityPrice]      # Full, half, etc.
 
+# Only the fields sent are changed; quantity_prices, when sent, replaces the price list
+class MenuItemPatch(BaseModel):
+    name: Optional[str] = None
+    is_available: Optional[bool] = None
+    food_category_name: Optional[str] = None
+    food_category_id: Optional[int] = None
+    quantity_prices: Optional[List[QuantityPrice]] = None
+
+class MenuAvailabilityUpdate(BaseModel):
+    ids: List[int]
+    is_available: bool
+
 class MenuItemOut(BaseModel):
     id: int
     name: str
@@ -85,6 +135,16 @@ class MenuItemOut(BaseModel):
     quantity_prices: List[QuantityPrice]
     model_config = ConfigDict(from_attributes=True)
 
+# Everything that changed after the client's `since` version
+class MenuChangesOut(BaseModel):
+    version: int
+    menu_items: List[MenuItemOut]
+    food_categories: List[FoodCategoryOut]
+    deleted_menu_item_ids: List[int]
+    deleted_food_category_ids: List[int]
+    # True when the client must drop its cached menu and use this response as the full menu
+    reset: bool = False
+
 # ---------- TABLE ----------
 class TableBase(BaseModel):
     table_number: int
@@ -96,15 +156,52 @@ class TableOut(TableBase):
     id: int
     model_config = ConfigDict(from_attributes=True)
 
+MAX_BULK_TABLES = 500
+
+# Either an explicit list of numbers or an inclusive range, e.g. start=1, end=50
+class TableBulkCreate(BaseModel):
+    table_numbers: Optional[List[int]] = None
+    start: Optional[int] = None
+    end: Optional[int] = None
+
+    @model_validator(mode="after")
+    def check_one_form(self):
+        has_range = self.start is not None or self.end is not None
+        if (self.table_numbers is None) == (not has_range):
+            raise ValueError("Give either table_numbers or start and end.")
+        if has_range and (self.start is None or self.end is None or self.end < self.start):
+            raise ValueError("start and end must both be set, with end >= start.")
+        count = len(self.table_numbers) if self.table_numbers is not None else self.end - self.start + 1
+        if count == 0:
+            raise ValueError("No table numbers given.")
+        if count > MAX_BULK_TABLES:
+            raise ValueError(f"At most {MAX_BULK_TABLES} tables per request.")
+        return self
+
+    def numbers(self) -> List[int]:
+        if self.table_numbers is not None:
+            return sorted(set(self.table_numbers))
+        return list(range(self.start, self.end + 1))
+
+class TableBulkOut(BaseModel):
+    created: List[TableOut]
+    # Numbers the restaurant already had; those tables are left as they were
+    existing_table_numbers: List[int]
+
 # ---------- ORDER ITEM ----------
 class OrderItemCreate(BaseModel):
     menu_item_id: int
     quantity: int
     selected_type: QuantityEnum
 
-class OrderItemOut(OrderItemCreate):
+# Slim order line built only from the snapshot columns on order_items
+class OrderLineOut(BaseModel):
+    menu_item_id: Optional[int]
+    item_name: Optional[str]
+    category_name: Optional[str]
+    quantity: int
+    selected_type: QuantityEnum
     price_at_order: float
-    menu_item: MenuItemOut
     model_config = ConfigDict(from_attributes=True)
 
 # ---------- ORDER ----------
@@ -114,15 +211,87 @@ class OrderCreate(BaseModel):
 
 class OrderOut(BaseModel):
     id: int
-    table_id: int
+    table_id: Optional[int]
     status: str
+    version: int
     estimated_time: Optional[str]
     total_amount: float
-    table_number: int
+    table_number: Optional[int]
+    created_at: datetime
+    table_session_id: Optional[int] = None
+    items: List[OrderLineOut]
+    model_config = ConfigDict(from_attributes=True)
+
+class OrderHistoryOut(BaseModel):
+    id: int
+    table_id: Optional[int]
+    status: str
+    version: int
+    estimated_time: Optional[str]
+    total_amount: float
+    table_number: Optional[int]
+    created_at: datetime
+    table_session_id: Optional[int] = None
+    items: List[OrderLineOut]
+    model_config = ConfigDict(from_attributes=True)
+
+class PrepListEntryOut(BaseModel):
+    menu_item_id: Optional[int]
+    item_name: Optional[str]
+    selected_type: QuantityEnum
+    pending_quantity: int
+
+class OrderStatusBulkUpdate(BaseModel):
+    order_ids: List[int]
+    status: OrderStatus
+    # Only orders currently in this status move; by default any status that may reach `status`
+    expected_status: Optional[OrderStatus] = None
+
+class OrderEventOut(BaseModel):
+    seq: int
+    order_id: Optional[int]
+    type: str
+    payload: Dict[str, Any]
     created_at: datetime
-    items: List[OrderItemOut]
     model_config = ConfigDict(from_attributes=True)
 
+class OrderEventPage(BaseModel):
+    events: List[OrderEventOut]
+    next_offset: int
+    has_more: bool
+
+# ---------- TABLE BILL ----------
+class BillItemOut(BaseModel):
+    item_name: Optional[str]
+    selected_type: str
+    unit_price: float
+    quantity: int
+    amount: float
+
+class BillOut(BaseModel):
+    id: int
+    table_id: Optional[int]
+    table_number: Optional[int]
+    status: str
+    order_count: int
+    subtotal: float
+    tax_rate: float
+    tax: float
+    total: float
+    opened_at: datetime
+    closed_at: Optional[datetime]
+    items: List[BillItemOut]
+    # Only on closed bills
+    order_ids: Optional[List[int]] = None
+
+# ---------- DASHBOARD ----------
+class DashboardBootstrapOut(BaseModel):
+    tables: List[TableOut]
+    menu_items: List[MenuItemOut]
+    food_categories: List[FoodCategoryOut]
+    active_orders: List[OrderHistoryOut]
+    menu_version: int
+
 # ---------- EMAIL/OTP ----------
 class EmailOnly(BaseModel):
     email: EmailStr
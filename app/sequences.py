@@ -0,0 +1,28 @@
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.db import dialect_insert
+
+
+def allocate(db: Session, model, admin_id: int, count: int = 1) -> int:
+    """Reserve `count` numbers from a tenant's counter row and return the last one.
+
+    `model` has admin_id (unique) and last_seq columns. The row stays locked
+    until the caller commits, so a tenant's numbers become visible in order and
+    a reader that moves past one never misses a lower one committed late."""
+    bump = (
+        update(model)
+        .where(model.admin_id == admin_id)
+        .values(last_seq=model.last_seq + count)
+        .returning(model.last_seq)
+    )
+    last_seq = db.execute(bump).scalar()
+    if last_seq is None:
+        # First number for this tenant (or on this shard)
+        db.execute(
+            dialect_insert(db, model)
+            .values(admin_id=admin_id, last_seq=0)
+            .on_conflict_do_nothing(index_elements=["admin_id"])
+        )
+        last_seq = db.execute(bump).scalar()
+    return last_seq
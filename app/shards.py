@@ -0,0 +1,363 @@
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app import cache, menu_search
+from app.db import DEFAULT_SHARD, SessionLocal, choose_read_engine, engine, shard_engines
+from app.menu_changes import MENU, RESET
+from app.models import (
+    Admin, FoodCategory, MenuChange, MenuChangeSequence, MenuItem, MenuItemQuantityPrice, Order, OrderEvent,
+    OrderEventSequence, OrderItem, Table, TableSession, TableSessionItem, TenantShard, ist_now
+)
+
+# Workers re-read a tenant's shard at least this often even if an invalidation
+# is missed; a tenant move waits this long after pausing the tenant
+SHARD_MAP_TTL_SECONDS = float(os.getenv("SHARD_MAP_TTL_SECONDS", 30))
+
+MOVE_BATCH_SIZE = int(os.getenv("MOVE_BATCH_SIZE", 500))
+
+# Parents of all tenant data, deleted in this order; their children (order items,
+# bill lines, quantity prices) go with them through ON DELETE CASCADE
+TENANT_PARENT_MODELS = (
+    Order, TableSession, Table, MenuItem, FoodCategory, MenuChange, MenuChangeSequence, OrderEvent,
+    OrderEventSequence,
+)
+
+_shard_map = {}   # admin_id -> (shard, moving, loaded_at)
+
+
+def is_sharded() -> bool:
+    return len(shard_engines) > 1
+
+
+# ---------- SHARD MAP ----------
+
+def _load_shard(admin_id: int):
+    # Always the primary itself: a lagging replica could point at the old shard
+    with engine.connect() as conn:
+        row = conn.execute(
+            select(TenantShard.shard, TenantShard.moving).where(TenantShard.admin_id == admin_id)
+        ).first()
+    return (row.shard, row.moving) if row else (DEFAULT_SHARD, False)
+
+
+def _lookup(admin_id: int):
+    now = time.monotonic()
+    entry = _shard_map.get(admin_id)
+    if entry is None or now - entry[2] >= SHARD_MAP_TTL_SECONDS:
+        shard, moving = _load_shard(admin_id)
+        entry = (shard, moving, now)
+        _shard_map[admin_id] = entry
+    return entry[0], entry[1]
+
+
+def shard_for_admin(admin_id: int) -> str:
+    shard, moving = _lookup(admin_id)
+    if moving:
+        raise HTTPException(
+            status_code=503,
+            detail="This restaurant is being moved, retry shortly.",
+            headers={"Retry-After": "5"},
+        )
+    if shard not in shard_engines:
+        raise RuntimeError(f"Admin {admin_id} is mapped to unknown shard {shard!r}, check SHARD_URLS")
+    return shard
+
+
+def shard_for_session(db: Session) -> str:
+    """Shard of the tenant a session works for: set with use_tenant, the JWT admin, or a table_id in the path."""
+    admin_id = db.info.get("admin_id")
+    request = db.info.get("request")
+    if admin_id is None and request is not None:
+        admin_id = getattr(request.state, "admin_id", None)
+        if admin_id is None and "table_id" in request.path_params:
+            admin_id = menu_search.resolve_table_admin(db, int(request.path_params["table_id"]))
+    if admin_id is None:
+        return DEFAULT_SHARD
+    return shard_for_admin(admin_id)
+
+
+def use_tenant(db: Session, admin_id: int):
+    """Point a session at a tenant found some other way (request body, background job)."""
+    db.info["admin_id"] = admin_id
+    db.info.pop("shard_engine", None)
+
+
+def tenant_session(admin_id: int) -> Session:
+    return SessionLocal(info={"admin_id": admin_id})
+
+
+def shards_of(admin_ids) -> dict:
+    """{shard: [admin_id, ...]} for the given tenants."""
+    groups = {}
+    for admin_id in admin_ids:
+        groups.setdefault(_lookup(admin_id)[0], []).append(admin_id)
+    return groups
+
+
+def _forget(key: str):
+    _shard_map.pop(int(key.split(":", 1)[1]), None)
+
+
+cache.on_invalidate("shard:", _forget)
+
+
+# ---------- FAN-OUT ----------
+
+def fan_out(fn, shards=None) -> dict:
+    """Run a read-only fn(session, shard) on each shard in parallel; returns {shard: result}."""
+    names = list(shards if shards is not None else shard_engines)
+
+    def run(name):
+        bind = choose_read_engine() if name == DEFAULT_SHARD else shard_engines[name]
+        with Session(bind=bind) as db:
+            return fn(db, name)
+
+    if len(names) <= 1:
+        return {name: run(name) for name in names}
+    with ThreadPoolExecutor(max_workers=len(names)) as pool:
+        return dict(zip(names, pool.map(run, names)))
+
+
+# ---------- PLACEMENT ----------
+
+def tenant_counts(db: Session) -> dict:
+    counts = {name: 0 for name in shard_engines}
+    for shard, count in db.query(TenantShard.shard, func.count(TenantShard.admin_id)).group_by(TenantShard.shard):
+        counts[shard] = counts.get(shard, 0) + count
+    counts[DEFAULT_SHARD] += db.query(func.count(Admin.id)).outerjoin(
+        TenantShard, TenantShard.admin_id == Admin.id
+    ).filter(TenantShard.admin_id.is_(None), Admin.is_superuser == 0).scalar()
+    return counts
+
+
+def assign_shard(db: Session, admin: Admin):
+    """Place a new tenant on the shard with the fewest tenants."""
+    if not is_sharded() or admin.is_superuser:
+        return
+    counts = tenant_counts(db)
+    shard = min(counts, key=lambda name: (counts[name], name != DEFAULT_SHARD))
+    if shard != DEFAULT_SHARD:
+        _copy_admin_row(admin.id, shard_engines[shard])
+    db.add(TenantShard(admin_id=admin.id, shard=shard))
+    db.commit()
+
+
+# Tenant rows reference admins.id, so each shard keeps a copy of its tenants'
+# admin rows. Only the primary's copy is ever read or updated.
+def _copy_admin_row(admin_id: int, target):
+    admins = Admin.__table__
+    with engine.connect() as src:
+        row = src.execute(select(admins).where(admins.c.id == admin_id)).mappings().one()
+    with target.begin() as dst:
+        if dst.execute(select(admins.c.id).where(admins.c.id == admin_id)).first() is None:
+            dst.execute(insert(admins).values(**row))
+
+
+def drop_admin_row(admin_id: int, shard: str):
+    if shard == DEFAULT_SHARD or shard not in shard_engines:
+        return
+    admins = Admin.__table__
+    with shard_engines[shard].begin() as conn:
+        conn.execute(delete(admins).where(admins.c.id == admin_id))
+
+
+# ---------- MOVE / REBALANCE ----------
+
+def _set_shard(admin_id: int, shard: str, moving: bool):
+    with Session(bind=engine) as db:
+        row = db.get(TenantShard, admin_id)
+        if row is None:
+            row = TenantShard(admin_id=admin_id)
+            db.add(row)
+        row.shard = shard
+        row.moving = moving
+        db.commit()
+    _shard_map.pop(admin_id, None)
+    cache.invalidate(f"shard:{admin_id}")
+
+
+def _copy_rows(src, dst, table, where, remap=None, keep_ids=False, adjust=None) -> dict:
+    """Copy matching rows between shards, MOVE_BATCH_SIZE per multi-row INSERT;
+    returns {old id: new id}. `adjust` may rewrite a row's values before insert."""
+    ids = {}
+    rows = src.execute(
+        select(table).where(where).order_by(table.c.id).execution_options(yield_per=MOVE_BATCH_SIZE)
+    )
+    # RETURNING in parameter order lines each new id up with the row it came from
+    copy = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+    for batch in rows.mappings().partitions():
+        old_ids, values = [], []
+        for row in batch:
+            row = dict(row)
+            old_ids.append(row["id"] if keep_ids else row.pop("id"))
+            for column, mapping in (remap or {}).items():
+                if row[column] is not None:
+                    row[column] = mapping[row[column]]
+            if adjust is not None:
+                adjust(row)
+            values.append(row)
+        ids.update(zip(old_ids, dst.execute(copy, values).scalars()))
+    return ids
+
+
+def _copy_tenant(admin_id: int, source, target) -> int:
+    """Copy one tenant in a single target transaction. Table ids come from the
+    directory and are kept; every other id is reassigned by the target."""
+    categories_t = FoodCategory.__table__
+    items_t = MenuItem.__table__
+    prices_t = MenuItemQuantityPrice.__table__
+    tables_t = Table.__table__
+    orders_t = Order.__table__
+    order_items_t = OrderItem.__table__
+    bills_t = TableSession.__table__
+    bill_items_t = TableSessionItem.__table__
+    events_t = OrderEvent.__table__
+    sequences_t = OrderEventSequence.__table__
+    menu_versions_t = MenuChangeSequence.__table__
+
+    with source.connect() as src, target.begin() as dst:
+        categories = _copy_rows(src, dst, categories_t, categories_t.c.admin_id == admin_id)
+        items = _copy_rows(src, dst, items_t, items_t.c.admin_id == admin_id, {"food_category_id": categories})
+        prices = _copy_rows(
+            src, dst, prices_t,
+            prices_t.c.menu_item_id.in_(select(items_t.c.id).where(items_t.c.admin_id == admin_id)),
+            {"menu_item_id": items},
+        )
+        tables = _copy_rows(src, dst, tables_t, tables_t.c.admin_id == admin_id, keep_ids=True)
+        bills = _copy_rows(src, dst, bills_t, bills_t.c.admin_id == admin_id)
+        bill_items = _copy_rows(
+            src, dst, bill_items_t,
+            bill_items_t.c.session_id.in_(select(bills_t.c.id).where(bills_t.c.admin_id == admin_id)),
+            {"session_id": bills},
+        )
+        orders = _copy_rows(src, dst, orders_t, orders_t.c.admin_id == admin_id, {"table_session_id": bills})
+        order_items = _copy_rows(
+            src, dst, order_items_t,
+            order_items_t.c.order_id.in_(select(orders_t.c.id).where(orders_t.c.admin_id == admin_id)),
+            {"order_id": orders, "menu_item_id": items},
+        )
+        # Seqs are copied as they are, so consumers' offsets stay valid; events
+        # of orders deleted before the move lose their order_id. Ids inside the
+        # payload are renumbered like the columns; ones deleted before the move become null
+        def renumber_payload(row):
+            payload = dict(row["payload"])
+            if payload.get("table_session_id") is not None:
+                payload["table_session_id"] = bills.get(payload["table_session_id"])
+            if "items" in payload:
+                payload["items"] = [
+                    {**item, "menu_item_id": items.get(item["menu_item_id"])} if item.get("menu_item_id") is not None else item
+                    for item in payload["items"]
+                ]
+            row["payload"] = payload
+
+        events = _copy_rows(
+            src, dst, events_t, events_t.c.admin_id == admin_id,
+            {"order_id": defaultdict(lambda: None, orders)}, adjust=renumber_payload,
+        )
+        sequences = _copy_rows(src, dst, sequences_t, sequences_t.c.admin_id == admin_id)
+        # Menu ids changed, so clients syncing the menu must start over. The
+        # version counter moves with the tenant, so the reset is newer than
+        # any version a client holds
+        last_version = src.execute(
+            select(menu_versions_t.c.last_seq).where(menu_versions_t.c.admin_id == admin_id)
+        ).scalar() or 0
+        dst.execute(insert(menu_versions_t).values(admin_id=admin_id, last_seq=last_version + 1))
+        dst.execute(insert(MenuChange.__table__).values(
+            admin_id=admin_id, version=last_version + 1, entity=MENU, entity_id=0, op=RESET, created_at=ist_now()
+        ))
+
+    return sum(len(ids) for ids in (
+        categories, items, prices, tables, bills, bill_items, orders, order_items, events, sequences,
+    ))
+
+
+def _delete_tenant(admin_id: int, shard_engine):
+    for model in TENANT_PARENT_MODELS:
+        table = model.__table__
+        while True:
+            with shard_engine.begin() as conn:
+                ids = conn.execute(
+                    select(table.c.id).where(table.c.admin_id == admin_id).limit(MOVE_BATCH_SIZE)
+                ).scalars().all()
+                if not ids:
+                    break
+                conn.execute(delete(table).where(table.c.id.in_(ids)))
+
+
+def move_tenant(admin_id: int, target: str, log=print):
+    """Pause a tenant, copy it to `target`, switch the shard map, then clean up the source."""
+    if target not in shard_engines:
+        raise ValueError(f"Unknown shard {target!r}")
+    source, moving = _load_shard(admin_id)
+    if moving:
+        raise RuntimeError(f"Tenant {admin_id} is already being moved")
+    if source == target:
+        log(f"Tenant {admin_id} is already on {target}")
+        return
+
+    # Requests for the tenant get 503 from here until the switch
+    _set_shard(admin_id, source, moving=True)
+    log(f"Tenant {admin_id}: paused, waiting {SHARD_MAP_TTL_SECONDS:g}s for every worker to notice")
+    time.sleep(SHARD_MAP_TTL_SECONDS)
+
+    try:
+        if target != DEFAULT_SHARD:
+            _copy_admin_row(admin_id, shard_engines[target])
+        copied = _copy_tenant(admin_id, shard_engines[source], shard_engines[target])
+    except Exception:
+        _set_shard(admin_id, source, moving=False)
+        raise
+
+    _set_shard(admin_id, target, moving=False)
+    # Worker-local menu index and prep list hold ids from the old shard
+    cache.invalidate(f"menu:{admin_id}")
+    cache.invalidate(f"prep:{admin_id}")
+    log(f"Tenant {admin_id}: {copied} rows copied {source} -> {target}, now serving from {target}")
+
+    _delete_tenant(admin_id, shard_engines[source])
+    drop_admin_row(admin_id, source)
+    log(f"Tenant {admin_id}: removed from {source}")
+
+
+def plan_rebalance(days: int = 7, max_moves: int = 10) -> list:
+    """Greedy (admin_id, source, target) moves that even out recent order volume across shards."""
+    with Session(bind=engine) as db:
+        tenants = dict(db.query(Admin.id, func.coalesce(TenantShard.shard, DEFAULT_SHARD)).outerjoin(
+            TenantShard, TenantShard.admin_id == Admin.id
+        ).filter(Admin.is_superuser == 0, Admin.deleted_at.is_(None)).all())
+
+    since = ist_now() - timedelta(days=days)
+    volumes = fan_out(lambda db, shard: dict(
+        db.query(Order.admin_id, func.count(Order.id)).filter(Order.created_at >= since).group_by(Order.admin_id).all()
+    ))
+    # Every tenant weighs at least 1 so idle tenants still spread out
+    weight = {admin_id: 1 + volumes.get(shard, {}).get(admin_id, 0) for admin_id, shard in tenants.items()}
+    load = {name: 0 for name in shard_engines}
+    for admin_id, shard in tenants.items():
+        load[shard] = load.get(shard, 0) + weight[admin_id]
+
+    moves, moved = [], set()
+    for _ in range(max_moves):
+        heavy = max(load, key=load.get)
+        light = min(load, key=load.get)
+        gap = load[heavy] - load[light]
+        candidates = [
+            admin_id for admin_id, shard in tenants.items()
+            if shard == heavy and admin_id not in moved and weight[admin_id] < gap
+        ]
+        if not candidates:
+            break
+        admin_id = min(candidates, key=lambda candidate: abs(gap / 2 - weight[candidate]))
+        moves.append((admin_id, heavy, light))
+        moved.add(admin_id)
+        tenants[admin_id] = light
+        load[heavy] -= weight[admin_id]
+        load[light] += weight[admin_id]
+    return moves
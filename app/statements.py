@@ -0,0 +1,38 @@
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models import Admin, FoodCategory, MenuItem, Table
+
+# The lookups behind almost every request. A lambda statement is cached by
+# the lambda's code location: after the first call, SQLAlchemy only pulls the
+# closure variables out as bound parameters instead of rebuilding the select,
+# re-deriving its cache key and binding it again. The SQL text stays identical
+# between calls, so Postgres drivers that prepare statements can reuse them.
+# Closure variables must be plain values (ids, emails, collections of ids).
+
+
+def table_by_id(table_id: int):
+    return lambda_stmt(lambda: select(Table).where(Table.id == table_id))
+
+
+def active_admin_by_email(email: str):
+    return lambda_stmt(lambda: select(Admin).where(Admin.email == email, Admin.deleted_at.is_(None)))
+
+
+def menu_items_of_admin(admin_id: int):
+    return lambda_stmt(lambda: select(MenuItem).where(MenuItem.admin_id == admin_id))
+
+
+def categories_of_admin(admin_id: int):
+    return lambda_stmt(lambda: select(FoodCategory).where(FoodCategory.admin_id == admin_id))
+
+
+def menu_items_for_order(admin_id: int, menu_item_ids):
+    """The ordered items with their category and prices, for pricing an order."""
+    return lambda_stmt(lambda: select(MenuItem).options(
+        joinedload(MenuItem.food_category),
+        selectinload(MenuItem.quantity_prices),
+    ).where(
+        MenuItem.id.in_(menu_item_ids),
+        MenuItem.admin_id == admin_id
+    ))
@@ -57,16 +57,14 @@ def delete_expired_otps(db: Session):
     db.commit()
 
 # ---------------- Email Sending ----------------
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-from app.auth import SENDGRID_API_KEY, FROM_EMAIL
-
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
 from app.auth import SENDGRID_API_KEY, FROM_EMAIL
 from fastapi import HTTPException
 
 def send_email(to_email: str, subject: str, content: str):
+    # Imported on first use: SendGrid is slow to load and only the OTP flows need it
+    from sendgrid import SendGridAPIClient
+    from sendgrid.helpers.mail import Mail
+
     message = Mail(
         from_email=FROM_EMAIL,
         to_emails=to_email,
@@ -0,0 +1,32 @@
+import os
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from dotenv import load_dotenv
+
+from app.auth import pwd_context
+from app.db import replica_engines, shard_engines
+
+load_dotenv()
+
+PREWARM_ON_STARTUP = os.getenv("PREWARM_ON_STARTUP", "true").lower() == "true"
+
+
+def prewarm():
+    """Pay before the first request for what every first request would: DB connections and bcrypt."""
+    started = time.perf_counter()
+
+    # One pooled connection per database, opened in this worker (never inherited from the master)
+    for db_engine in [*shard_engines.values(), *replica_engines]:
+        try:
+            with db_engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+        except SQLAlchemyError as e:
+            # Not fatal: /health/ready reports it and the pool retries on demand
+            print(f"⚠️ Pre-warming {db_engine.url.render_as_string(hide_password=True)} failed: {e}")
+
+    # passlib loads and self-tests the bcrypt backend on first use, i.e. on the first login
+    pwd_context.handler("bcrypt").get_backend()
+
+    print(f"✅ Pre-warmed in {(time.perf_counter() - started) * 1000:.0f} ms")
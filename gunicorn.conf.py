@@ -0,0 +1,44 @@
+# Production server settings; start.sh runs `gunicorn -c gunicorn.conf.py app.main:app`.
+# Every value can be overridden from the environment.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# One async worker per core by default
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# Cache invalidations, read-your-writes pins and saved profiles only reach
+# other workers through a shared backend; memory:// would silently split them
+from app import cache  # noqa: E402
+
+if workers > 1 and isinstance(cache.backend, cache.MemoryCache):
+    raise RuntimeError(
+        f"{workers} workers need a shared cache: set CACHE_URL to sqlite:///./cache.db or redis://..., "
+        "or run a single worker with WEB_CONCURRENCY=1"
+    )
+
+# Recycle each worker after this many requests (plus jitter so they don't all
+# restart together) to bound slow leaks
+max_requests = int(os.getenv("MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", 100))
+
+# A worker silent for this long (e.g. stuck in a bcrypt or QR render) is killed
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+
+# On SIGTERM/deploy, stop accepting and let in-flight requests finish
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = os.getenv("PRELOAD_APP", "true").lower() == "true"
+
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared with forked workers
+    from app.db import replica_engines, shard_engines
+    for db_engine in [*shard_engines.values(), *replica_engines]:
+        db_engine.dispose(close=False)
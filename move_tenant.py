@@ -0,0 +1,38 @@
+# filename: move_tenant.py
+#
+#   python move_tenant.py <admin_id> <shard>      move one tenant to a shard
+#   python move_tenant.py --rebalance             print moves that even out recent order volume
+#   python move_tenant.py --rebalance --apply     ...and carry them out, one tenant at a time
+
+import argparse
+
+from app.shards import move_tenant, plan_rebalance
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move tenants between database shards.")
+    parser.add_argument("admin_id", type=int, nargs="?")
+    parser.add_argument("shard", nargs="?")
+    parser.add_argument("--rebalance", action="store_true")
+    parser.add_argument("--apply", action="store_true", help="carry out the rebalance plan")
+    parser.add_argument("--days", type=int, default=7, help="order history used to weigh tenants")
+    parser.add_argument("--max-moves", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.rebalance:
+        moves = plan_rebalance(days=args.days, max_moves=args.max_moves)
+        if not moves:
+            print("✅ Shards are already balanced.")
+        for admin_id, source, target in moves:
+            print(f"Tenant {admin_id}: {source} -> {target}")
+            if args.apply:
+                move_tenant(admin_id, target)
+        return
+
+    if args.admin_id is None or not args.shard:
+        parser.error("give an admin_id and a shard, or --rebalance")
+    move_tenant(args.admin_id, args.shard)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,8 @@
 alembic upgrade head
-uvicorn app.main:app --host 0.0.0.0 --port 8000
+# Every shard in SHARD_URLS (name=url,...) carries the same schema
+for shard in $(echo "$SHARD_URLS" | tr ',' ' '); do
+  DATABASE_URL="${shard#*=}" alembic upgrade head
+done
+# Workers share invalidations, read-your-writes pins and profiles through this
+export CACHE_URL="${CACHE_URL:-sqlite:///./cache.db}"
+exec gunicorn -c gunicorn.conf.py app.main:app
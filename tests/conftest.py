@@ -0,0 +1,64 @@
+import os
+import tempfile
+
+import pytest
+
+# Point the app at a throwaway database before anything imports app.db
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'test.db')}")
+os.environ.setdefault("CACHE_URL", "memory://")
+
+
+@pytest.fixture
+def db():
+    from app import models  # noqa: F401  registers the tables on Base
+    from app.db import Base, SessionLocal, engine
+
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        _forget_tenants()
+
+
+def _forget_tenants():
+    """Ids restart with every test database, so per-tenant state held in memory must go too."""
+    from app import cache, menu_search, prep_list, shards
+
+    prep_list._prep_lists.clear()
+    menu_search._indexes.clear()
+    menu_search._table_admins.clear()
+    shards._shard_map.clear()
+    if isinstance(cache.backend, cache.MemoryCache):
+        cache.backend._data.clear()
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app import admission
+    from app.main import app
+
+    # Many requests from one test client would trip the per-IP and per-tenant limits
+    monkeypatch.setattr(admission.ip_limiter, "acquire", lambda key: 0.0)
+    monkeypatch.setattr(admission.tenant_limiter, "acquire", lambda key: 0.0)
+    return TestClient(app)
+
+
+@pytest.fixture
+def make_admin(db):
+    """Creates a tenant admin and returns the Authorization headers for it."""
+    from app import auth, models
+
+    def make(email="admin@example.com", secret_key="secret"):
+        db.add(models.Admin(
+            name="Admin", email=email, contact="0", restaurant_name=f"Restaurant {email}",
+            hashed_password="unused", secret_key=auth.hash_password(secret_key), is_superuser=0,
+        ))
+        db.commit()
+        return {"Authorization": f"Bearer {auth.create_access_token({'sub': email})}"}
+
+    return make
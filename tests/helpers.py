@@ -0,0 +1,41 @@
+"""Shared setup for the API tests: a tenant's tables and dishes, orders, query capture."""
+from sqlalchemy import event
+
+from app.db import engine
+
+
+def setup_menu(client, headers, tables=1):
+    """Tables 1..tables and two dishes; returns (table ids, dish ids)."""
+    created = client.post("/tables/bulk", json={"start": 1, "end": tables}, headers=headers).json()["created"]
+    dishes = [
+        client.post("/menu/", json={
+            "name": name, "food_category_name": "Main",
+            "quantity_prices": [{"quantity_type": "full", "price": price}, {"quantity_type": "half", "price": price / 2}],
+        }, headers=headers).json()["id"]
+        for name, price in (("Dal", 100), ("Paneer", 240))
+    ]
+    return [table["id"] for table in created], dishes
+
+
+def place_order(client, table_id, lines):
+    response = client.post("/orders/", json={
+        "table_id": table_id,
+        "items": [{"menu_item_id": item, "quantity": quantity, "selected_type": "full"} for item, quantity in lines],
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["order_id"]
+
+
+class QueryLog:
+    def __init__(self):
+        self.statements = []
+
+    def __enter__(self):
+        event.listen(engine, "before_cursor_execute", self._capture)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._capture)
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
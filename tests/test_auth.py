@@ -0,0 +1,83 @@
+import pytest
+
+from app import auth
+from app.models import Admin
+
+
+@pytest.fixture
+def hashing_policy():
+    """Lets a test retune pwd_context and puts the original policy back afterwards."""
+    saved = auth.pwd_context.to_dict()
+    yield
+    auth.pwd_context.load(saved)
+
+
+def rounds_of(hashed: str) -> int:
+    return int(hashed.split("$")[2])
+
+
+# ---------- TUNING ----------
+
+@pytest.mark.parametrize("probe_ms, expected", [
+    (250 / 2 ** 4, 12),         # 16 times under budget at 8 rounds: four more rounds
+    (250 / 2 ** 4 * 1.5, 11),   # rounds down rather than overshoot
+    (0.001, 16),                # clamped to PASSWORD_HASH_MAX_ROUNDS
+    (100, 10),                  # clamped to PASSWORD_HASH_MIN_ROUNDS
+])
+def test_rounds_are_sized_to_the_target(hashing_policy, monkeypatch, probe_ms, expected):
+    monkeypatch.setattr(auth, "PASSWORD_HASH_ROUNDS", None)
+    monkeypatch.setattr(auth, "_time_hash", lambda handler: probe_ms / 1000)
+    assert auth.tune_password_hashing() == expected
+
+
+def test_pinned_rounds_skip_the_benchmark(hashing_policy, monkeypatch):
+    monkeypatch.setattr(auth, "PASSWORD_HASH_ROUNDS", "5")
+    monkeypatch.setattr(auth, "_time_hash", lambda handler: pytest.fail("benchmarked"))
+    assert auth.tune_password_hashing() == 5
+    assert rounds_of(auth.hash_password("pw")) == 5
+
+
+# ---------- REHASH ON LOGIN ----------
+
+def login(client, password):
+    return client.post("/login", data={"username": "admin@example.com", "password": password})
+
+
+def stored_hash(db) -> str:
+    db.expire_all()
+    return db.query(Admin).one().hashed_password
+
+
+def test_login_rehashes_with_the_current_rounds(client, db, make_admin, hashing_policy, monkeypatch):
+    make_admin()
+    monkeypatch.setattr(auth, "PASSWORD_HASH_ROUNDS", "4")
+    auth.tune_password_hashing()
+    db.query(Admin).update({Admin.hashed_password: auth.hash_password("pw")})
+    db.commit()
+
+    # This instance now hashes with 5 rounds; 4 is outside [5, 6]
+    monkeypatch.setattr(auth, "PASSWORD_HASH_ROUNDS", "5")
+    auth.tune_password_hashing()
+
+    assert login(client, "wrong").status_code == 401
+    assert rounds_of(stored_hash(db)) == 4   # never rehashed on a failed login
+
+    assert login(client, "pw").status_code == 200
+    rehashed = stored_hash(db)
+    assert rounds_of(rehashed) == 5
+    assert auth.verify_password("pw", rehashed)
+
+    # Within the policy: left alone
+    assert login(client, "pw").status_code == 200
+    assert stored_hash(db) == rehashed
+
+
+def test_rehash_does_not_overwrite_a_changed_password(db, make_admin, hashing_policy, monkeypatch):
+    make_admin()
+    monkeypatch.setattr(auth, "PASSWORD_HASH_ROUNDS", "4")
+    auth.tune_password_hashing()
+    db.query(Admin).update({Admin.hashed_password: auth.hash_password("new")})
+    db.commit()
+
+    auth.rehash_password(1, "old", old_hash="hash the login saw before the change")
+    assert auth.verify_password("new", stored_hash(db))
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta
+
+from pytz import utc
+
+from app import bills
+from tests.helpers import place_order, setup_menu
+
+
+def test_timestamps_are_ist_wall_clock_whatever_the_driver_returns():
+    naive_ist = datetime(2026, 10, 20, 18, 30)
+    assert bills._timestamp(naive_ist) == "2026-10-20T18:30:00"
+    # An aware value (e.g. read back as UTC) is shown in IST, not just stripped
+    assert bills._timestamp(utc.localize(datetime(2026, 10, 20, 13, 0))) == "2026-10-20T18:30:00"
+    assert bills._timestamp(None) is None
+
+
+def test_closed_bill_times_are_on_the_same_clock(client, make_admin):
+    headers = make_admin()
+    (table_id,), (dal, _) = setup_menu(client, headers)
+    place_order(client, table_id, [(dal, 1)])
+    bill = client.get(f"/bills/by-table-id/{table_id}", headers=headers).json()
+
+    closed = client.post(f"/bills/{bill['id']}/close", headers=headers).json()
+    opened_at, closed_at = datetime.fromisoformat(closed["opened_at"]), datetime.fromisoformat(closed["closed_at"])
+    assert opened_at.tzinfo is None and closed_at.tzinfo is None
+    assert timedelta(0) <= closed_at - opened_at < timedelta(minutes=1)
+    assert client.get(f"/bills/{bill['id']}", headers=headers).json()["closed_at"] == closed["closed_at"]
+
+
+def test_bill_totals_follow_orders_and_drop_cancelled_lines(client, make_admin):
+    headers = make_admin()
+    (table_id,), (dal, paneer) = setup_menu(client, headers)
+    first = place_order(client, table_id, [(dal, 1), (paneer, 2)])
+    second = place_order(client, table_id, [(dal, 3)])
+    third = place_order(client, table_id, [(paneer, 1)])
+
+    bill = client.get(f"/bills/by-table-id/{table_id}", headers=headers).json()
+    assert (bill["order_count"], bill["subtotal"], bill["tax"], bill["total"]) == (3, 1120.0, 56.0, 1176.0)
+    # One line per dish, however many orders it came in
+    assert sorted((item["item_name"], item["quantity"], item["amount"]) for item in bill["items"]) == [
+        ("Dal", 4, 400.0), ("Paneer", 3, 720.0),
+    ]
+
+    client.patch(f"/orders/{second}/status", params={"status": "cancelled"}, headers=headers)
+    client.patch("/orders/status", json={"order_ids": [third], "status": "cancelled"}, headers=headers)
+    bill = client.get(f"/bills/by-table-id/{table_id}", headers=headers).json()
+    assert (bill["order_count"], bill["subtotal"], bill["total"]) == (1, 580.0, 609.0)
+    assert sorted((item["item_name"], item["quantity"]) for item in bill["items"]) == [("Dal", 1), ("Paneer", 2)]
+
+    # Deleting a cancelled order does not take it off the bill a second time
+    client.delete(f"/orders/{second}", headers=headers)
+    assert client.get(f"/bills/by-table-id/{table_id}", headers=headers).json()["subtotal"] == 580.0
+
+    closed = client.post(f"/bills/{bill['id']}/close", headers=headers).json()
+    assert closed["status"] == "closed"
+    assert closed["order_ids"] == [first]
+    assert client.post(f"/bills/{bill['id']}/close", headers=headers).status_code == 409
+
+    # The next order at the table starts a new bill
+    place_order(client, table_id, [(dal, 1)])
+    new_bill = client.get(f"/bills/by-table-id/{table_id}", headers=headers).json()
+    assert new_bill["id"] != bill["id"]
+    assert (new_bill["order_count"], new_bill["subtotal"]) == (1, 100.0)
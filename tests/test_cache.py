@@ -0,0 +1,219 @@
+import socketserver
+import threading
+import time
+
+import pytest
+
+from app import cache
+from app.cache import CacheBackend, MemoryCache, RedisCache, SQLiteCache
+
+
+def wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+# ---------- FAKE RESP SERVER ----------
+
+class FakeRedis(socketserver.ThreadingTCPServer):
+    """Just enough of Redis for RedisCache: GET/SET [PX]/DEL/PUBLISH/SUBSCRIBE."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeRedisHandler)
+        self.data = {}
+        self.subscribers = {}   # channel -> [handler]
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"redis://127.0.0.1:{self.server_address[1]}/0"
+
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                args = self.read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            self.dispatch([arg.decode() if i == 0 else arg for i, arg in enumerate(args)])
+
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def reply(self, data: bytes):
+        self.wfile.write(data)
+        self.wfile.flush()
+
+    def bulk(self, value):
+        if value is None:
+            return b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def dispatch(self, args):
+        server = self.server
+        name = args[0].upper()
+        with server.lock:
+            if name == "GET":
+                value, expires_at = server.data.get(args[1], (None, None))
+                if expires_at is not None and expires_at <= time.monotonic():
+                    value = None
+                self.reply(self.bulk(value))
+            elif name == "SET":
+                expires_at = None
+                if len(args) == 5 and args[3].upper() == b"PX":
+                    expires_at = time.monotonic() + int(args[4]) / 1000
+                server.data[args[1]] = (args[2], expires_at)
+                self.reply(b"+OK\r\n")
+            elif name == "DEL":
+                self.reply(b":%d\r\n" % int(server.data.pop(args[1], None) is not None))
+            elif name == "PUBLISH":
+                receivers = server.subscribers.get(args[1], [])
+                for handler in receivers:
+                    handler.reply(b"*3\r\n" + handler.bulk(b"message") + handler.bulk(args[1]) + handler.bulk(args[2]))
+                self.reply(b":%d\r\n" % len(receivers))
+            elif name == "SUBSCRIBE":
+                server.subscribers.setdefault(args[1], []).append(self)
+                self.reply(b"*3\r\n" + self.bulk(b"subscribe") + self.bulk(args[1]) + b":1\r\n")
+            elif name in ("AUTH", "SELECT"):
+                self.reply(b"+OK\r\n")
+            else:
+                self.reply(b"-ERR unknown command\r\n")
+
+
+@pytest.fixture
+def fake_redis():
+    server = FakeRedis()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+# ---------- BACKENDS ----------
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def check_key_value(first, second):
+    """first and second are two handles (workers) on the same store."""
+    assert first.get("missing") is None
+    first.set("menu:1", b"cached")
+    assert second.get("menu:1") == b"cached"
+
+    second.delete("menu:1")
+    assert first.get("menu:1") is None
+
+    first.set("short", b"lived", ttl=0.05)
+    assert second.get("short") == b"lived"
+    time.sleep(0.1)
+    assert second.get("short") is None
+
+
+def check_pub_sub(publisher, subscriber):
+    received = []
+    subscriber.listen("events", received.append)
+    # Listeners may connect in the background; publish until one is heard
+    assert wait_for(lambda: publisher.publish("events", "ready") or "ready" in received)
+    publisher.publish("events", "hello")
+    publisher.publish("other", "not for us")
+    assert wait_for(lambda: "hello" in received)
+    assert "not for us" not in received
+
+
+def test_memory_cache():
+    backend = MemoryCache()
+    check_key_value(backend, backend)
+    check_pub_sub(backend, backend)
+
+
+def test_sqlite_cache_shared_between_connections(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first, second = SQLiteCache(path), SQLiteCache(path)
+    check_key_value(first, second)
+    check_pub_sub(first, second)
+
+
+def test_redis_cache(fake_redis):
+    first, second = RedisCache(fake_redis.url), RedisCache(fake_redis.url)
+    check_key_value(first, second)
+    check_pub_sub(first, second)
+
+
+def test_redis_cache_fails_fast_while_down():
+    backend = RedisCache("redis://127.0.0.1:1/0", timeout=0.5)
+    with pytest.raises(cache.BACKEND_ERRORS):
+        backend.get("table:1")
+    started = time.monotonic()
+    with pytest.raises(cache.BACKEND_ERRORS):
+        backend.get("table:1")
+    assert time.monotonic() - started < 0.1
+
+
+# ---------- INVALIDATION BUS ----------
+
+def test_invalidate_over_redis(fake_redis, monkeypatch):
+    worker = RedisCache(fake_redis.url)
+    peer = RedisCache(fake_redis.url)
+    monkeypatch.setattr(cache, "backend", worker)
+    monkeypatch.setattr(cache, "_handlers", [])
+    monkeypatch.setattr(cache, "_listening", False)
+
+    # Another worker's view of the bus
+    heard = []
+    peer.listen(cache.INVALIDATION_CHANNEL, heard.append)
+    assert wait_for(lambda: len(fake_redis.subscribers.get(b"cache-invalidate", [])) == 1)
+
+    # This worker's handlers run for peers' invalidations, not its own
+    dropped = []
+    cache.on_invalidate("menu:", dropped.append)
+    assert wait_for(lambda: len(fake_redis.subscribers.get(b"cache-invalidate", [])) == 2)
+
+    worker.set("menu:7", b"stale")
+    cache.invalidate("menu:7")
+    assert peer.get("menu:7") is None
+    assert wait_for(lambda: heard == [f"{cache.WORKER_ID}|menu:7"])
+
+    peer.publish(cache.INVALIDATION_CHANNEL, "other-worker|menu:8")
+    peer.publish(cache.INVALIDATION_CHANNEL, "other-worker|prep:8")
+    assert wait_for(lambda: dropped == ["menu:8"])
+    time.sleep(0.1)
+    assert dropped == ["menu:8"]
+
+
+def test_invalidate_survives_backend_outage(monkeypatch):
+    monkeypatch.setattr(cache, "backend", RedisCache("redis://127.0.0.1:1/0", timeout=0.5))
+    cache.invalidate("menu:1")   # logs and carries on
+
+
+def test_table_lookup_falls_back_to_db_while_cache_is_down(db, monkeypatch):
+    from app import menu_search
+    from app.models import Admin, TableDirectory
+
+    db.add(Admin(id=1, name="n", email="a@example.com", contact="0", restaurant_name="R", hashed_password="x"))
+    db.add(TableDirectory(id=5, admin_id=1))
+    db.commit()
+
+    monkeypatch.setattr(cache, "backend", RedisCache("redis://127.0.0.1:1/0", timeout=0.5))
+    monkeypatch.setattr(menu_search, "_table_admins", {})
+    assert menu_search.resolve_table_admin(db, 5) == 1
+    assert menu_search.resolve_table_admin(db, 6) is None
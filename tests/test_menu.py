@@ -0,0 +1,171 @@
+from tests.helpers import QueryLog
+
+
+def add_dish(client, headers, name, category="Main", price=100):
+    response = client.post("/menu/", json={
+        "name": name, "food_category_name": category,
+        "quantity_prices": [{"quantity_type": "full", "price": price}],
+    }, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def changes(client, headers, since):
+    response = client.get("/menu/changes", params={"since": since}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+# ---------- CHANGES SINCE VERSION ----------
+
+def test_menu_changes_since_a_version(client, make_admin):
+    headers = make_admin()
+    dal = add_dish(client, headers, "Dal")            # category + dish
+    paneer = add_dish(client, headers, "Paneer")
+    start = changes(client, headers, 0)
+    assert start["version"] == 3
+    assert {item["name"] for item in start["menu_items"]} == {"Dal", "Paneer"}
+    assert [category["name"] for category in start["food_categories"]] == ["main"]
+
+    # Nothing new: same version, empty delta
+    assert changes(client, headers, 3) == {
+        "version": 3, "menu_items": [], "food_categories": [],
+        "deleted_menu_item_ids": [], "deleted_food_category_ids": [], "reset": False,
+    }
+
+    client.patch(f"/menu/{dal}", json={"is_available": False}, headers=headers)
+    client.patch(f"/menu/{dal}", json={"is_available": True}, headers=headers)
+    client.delete(f"/menu/{paneer}", headers=headers)
+    delta = changes(client, headers, 3)
+    assert delta["version"] == 6
+    # Only the final state of each row, once
+    assert [(item["id"], item["is_available"]) for item in delta["menu_items"]] == [(dal, True)]
+    assert delta["deleted_menu_item_ids"] == [paneer]
+    assert delta["reset"] is False
+
+
+def test_menu_versions_are_per_tenant(client, make_admin):
+    first, second = make_admin("first@example.com"), make_admin("second@example.com")
+    add_dish(client, first, "Dal")
+    for n in range(3):
+        add_dish(client, second, f"Dish {n}")
+    add_dish(client, first, "Paneer")
+
+    # Another tenant's writes leave no gaps in this tenant's versions
+    assert changes(client, first, 0)["version"] == 3
+    assert changes(client, first, 2)["menu_items"][0]["name"] == "Paneer"
+    assert changes(client, second, 0)["version"] == 4
+
+
+def test_version_from_another_menu_gets_a_full_reset(client, make_admin):
+    headers = make_admin()
+    add_dish(client, headers, "Dal")
+    delta = changes(client, headers, 50)
+    assert delta["reset"] is True
+    assert delta["version"] == 2
+    assert [item["name"] for item in delta["menu_items"]] == ["Dal"]
+
+
+# ---------- PARTIAL AND BULK UPDATES ----------
+
+def writes(log, table):
+    return [sql for sql in log.statements if sql.lstrip().upper().startswith(("INSERT", "UPDATE", "DELETE")) and table in sql]
+
+
+def test_availability_patch_leaves_price_rows_alone(client, make_admin):
+    headers = make_admin()
+    dal = add_dish(client, headers, "Dal")
+
+    with QueryLog() as log:
+        response = client.patch(f"/menu/{dal}", json={"is_available": False}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["is_available"] is False
+    assert response.json()["quantity_prices"] == [{"quantity_type": "full", "price": 100.0}]
+    assert not writes(log, "menu_item_quantity_prices")
+    assert len(writes(log, "menu_items")) == 1
+
+
+def test_price_patch_writes_only_the_changed_rows(client, make_admin):
+    headers = make_admin()
+    dal = client.post("/menu/", json={
+        "name": "Dal", "food_category_name": "Main",
+        "quantity_prices": [{"quantity_type": "full", "price": 100}, {"quantity_type": "half", "price": 60}],
+    }, headers=headers).json()["id"]
+
+    with QueryLog() as log:
+        item = client.patch(f"/menu/{dal}", json={"quantity_prices": [
+            {"quantity_type": "full", "price": 100}, {"quantity_type": "half", "price": 65},
+        ]}, headers=headers).json()
+    assert sorted((price["quantity_type"], price["price"]) for price in item["quantity_prices"]) == [
+        ("full", 100.0), ("half", 65.0),
+    ]
+    price_writes = writes(log, "menu_item_quantity_prices")
+    assert len(price_writes) == 1 and price_writes[0].lstrip().upper().startswith("UPDATE")
+
+    # Nothing changed: nothing written, no new menu version
+    version = changes(client, headers, 0)["version"]
+    with QueryLog() as log:
+        client.patch(f"/menu/{dal}", json={"name": "Dal", "is_available": True}, headers=headers)
+    assert not writes(log, "menu_items") and not writes(log, "menu_item_quantity_prices")
+    assert changes(client, headers, 0)["version"] == version
+
+
+def test_bulk_availability_is_one_update_within_the_tenant(client, make_admin):
+    headers, other = make_admin(), make_admin("other@example.com")
+    dishes = [add_dish(client, headers, f"Dish {n}") for n in range(4)]
+    foreign = add_dish(client, other, "Not ours")
+    client.patch(f"/menu/{dishes[0]}", json={"is_available": False}, headers=headers)
+
+    with QueryLog() as log:
+        response = client.patch("/menu/availability", json={"ids": [*dishes, foreign], "is_available": False}, headers=headers)
+    # Already unavailable and other tenants' dishes are skipped
+    assert response.json() == {"updated_ids": dishes[1:]}
+    assert len(writes(log, "UPDATE menu_items")) == 1
+
+    menu = {item["id"]: item["is_available"] for item in client.get("/menu/", headers=headers).json()}
+    assert not any(menu.values())
+    assert client.get("/menu/", headers=other).json()[0]["is_available"] is True
+
+
+# ---------- SEARCH ----------
+
+def search(client, table_id, q):
+    response = client.get(f"/menu/public/search/by-table-id/{table_id}", params={"q": q})
+    assert response.status_code == 200, response.text
+    return [item["name"] for item in response.json()]
+
+
+def test_search_matches_prefixes_typos_and_categories(client, make_admin):
+    headers = make_admin()
+    table_id = client.post("/tables/", json={"table_number": 1}, headers=headers).json()["id"]
+    for name, category in (("Paneer Tikka", "Starters"), ("Palak Paneer", "Main"), ("Pav Bhaji", "Main"),
+                           ("Gulab Jamun", "Desserts"), ("Pan", "Desserts")):
+        add_dish(client, headers, name, category)
+
+    # Exact, then prefix, then one typo away
+    assert search(client, table_id, "pan") == ["Pan", "Palak Paneer", "Paneer Tikka", "Pav Bhaji"]
+    assert search(client, table_id, "paner") == ["Palak Paneer", "Paneer Tikka"]        # missing letter
+    assert search(client, table_id, "pameer") == ["Palak Paneer", "Paneer Tikka"]       # wrong letter
+    assert search(client, table_id, "gulaab") == ["Gulab Jamun"]                        # extra letter
+    assert search(client, table_id, "paneer tik") == ["Paneer Tikka"]                   # every word must match
+    assert search(client, table_id, "dessert") == ["Gulab Jamun", "Pan"]                # category name
+    assert search(client, table_id, "biryani") == []
+
+
+def test_search_index_follows_menu_writes_without_a_rebuild(client, make_admin):
+    headers, other = make_admin(), make_admin("other@example.com")
+    table_id = client.post("/tables/", json={"table_number": 1}, headers=headers).json()["id"]
+    dal = add_dish(client, headers, "Dal Makhani")
+    add_dish(client, other, "Dal Fry")
+    assert search(client, table_id, "dal") == ["Dal Makhani"]   # builds the index
+
+    client.patch(f"/menu/{dal}", json={"name": "Dal Tadka"}, headers=headers)
+    chole = add_dish(client, headers, "Chole")
+    with QueryLog() as log:
+        assert search(client, table_id, "tadka") == ["Dal Tadka"]
+        assert search(client, table_id, "makhani") == []
+        assert search(client, table_id, "chole") == ["Chole"]
+    assert not [sql for sql in log.statements if "menu_items" in sql]
+
+    client.delete(f"/menu/{chole}", headers=headers)
+    assert search(client, table_id, "chole") == []
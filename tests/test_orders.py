@@ -0,0 +1,240 @@
+from tests.helpers import QueryLog, place_order, setup_menu
+
+
+# ---------- READS ----------
+
+def test_order_list_comes_from_the_order_item_snapshot(client, make_admin):
+    headers = make_admin()
+    (table_id,), (dal, paneer) = setup_menu(client, headers)
+    for _ in range(5):
+        place_order(client, table_id, [(dal, 1), (paneer, 2)])
+    # Renaming the dish afterwards does not rewrite orders already placed
+    client.patch(f"/menu/{dal}", json={"name": "Dal Tadka"}, headers=headers)
+
+    with QueryLog() as log:
+        orders = client.get("/orders/", headers=headers).json()
+
+    assert len(orders) == 5
+    assert orders[0]["table_number"] == 1
+    assert orders[0]["items"] == [
+        {"menu_item_id": dal, "item_name": "Dal", "category_name": "main", "quantity": 1,
+         "selected_type": "full", "price_at_order": 100.0},
+        {"menu_item_id": paneer, "item_name": "Paneer", "category_name": "main", "quantity": 2,
+         "selected_type": "full", "price_at_order": 240.0},
+    ]
+    assert not [sql for sql in log.statements if "menu_items" in sql or "quantity_prices" in sql]
+    # auth + orders with their tables + every order's lines, however many orders
+    assert len(log.statements) <= 3
+
+
+# ---------- PREP LIST ----------
+
+def prep_list(client, headers) -> dict:
+    response = client.get("/orders/prep-list", headers=headers)
+    assert response.status_code == 200, response.text
+    return {(entry["item_name"], entry["selected_type"]): entry["pending_quantity"] for entry in response.json()}
+
+
+def test_prep_list_follows_orders_as_they_open_and_close(client, make_admin):
+    from app import prep_list as prep
+
+    headers = make_admin()
+    (table_id,), (dal, paneer) = setup_menu(client, headers)
+    first = place_order(client, table_id, [(dal, 1), (paneer, 2)])
+    assert prep_list(client, headers) == {("Dal", "full"): 1, ("Paneer", "full"): 2}
+
+    # The list is cached now; from here on orders are applied to it incrementally
+    second = place_order(client, table_id, [(dal, 3)])
+    third = place_order(client, table_id, [(paneer, 1)])
+    assert prep_list(client, headers) == {("Dal", "full"): 4, ("Paneer", "full"): 3}
+
+    client.patch(f"/orders/{first}/status", params={"status": "preparing"}, headers=headers)
+    assert prep_list(client, headers) == {("Dal", "full"): 4, ("Paneer", "full"): 3}
+    client.patch(f"/orders/{first}/status", params={"status": "served"}, headers=headers)
+    assert prep_list(client, headers) == {("Dal", "full"): 3, ("Paneer", "full"): 1}
+    client.patch(f"/orders/{third}/status", params={"status": "cancelled"}, headers=headers)
+    assert prep_list(client, headers) == {("Dal", "full"): 3}
+    client.delete(f"/orders/{second}", headers=headers)
+    assert prep_list(client, headers) == {}
+
+    # The incrementally kept list agrees with a rebuild from the DB
+    place_order(client, table_id, [(dal, 2), (paneer, 1)])
+    incremental = prep_list(client, headers)
+    prep.reset(1)   # the only tenant
+    assert prep_list(client, headers) == incremental == {("Dal", "full"): 2, ("Paneer", "full"): 1}
+
+
+# ---------- STATUS TRANSITIONS ----------
+
+def set_status(client, headers, order_id, status, **params):
+    return client.patch(f"/orders/{order_id}/status", params={"status": status, **params}, headers=headers)
+
+
+def test_status_moves_forward_only(client, make_admin):
+    headers = make_admin()
+    (table_id,), (dal, _) = setup_menu(client, headers)
+    order_id = place_order(client, table_id, [(dal, 1)])
+
+    response = set_status(client, headers, order_id, "preparing")   # skipping ahead is fine
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+
+    response = set_status(client, headers, order_id, "accepted")
+    assert response.status_code == 409
+    assert "cannot move from 'preparing' to 'accepted'" in response.json()["detail"]
+
+    assert set_status(client, headers, order_id, "served").status_code == 200
+    assert set_status(client, headers, order_id, "cancelled").status_code == 409   # already served
+    assert set_status(client, headers, order_id, "not-a-status").status_code == 422
+    assert client.get("/orders/", headers=headers).json()[0]["status"] == "served"
+
+
+def test_stale_version_is_rejected(client, make_admin):
+    headers = make_admin()
+    (table_id,), (dal, _) = setup_menu(client, headers)
+    order_id = place_order(client, table_id, [(dal, 1)])
+
+    # Two screens read version 1; the second to write loses
+    assert set_status(client, headers, order_id, "accepted", expected_version=1).status_code == 200
+    response = set_status(client, headers, order_id, "preparing", expected_version=1)
+    assert response.status_code == 409
+    assert set_status(client, headers, order_id, "preparing", expected_version=2).json()["version"] == 3
+
+
+def test_bulk_transition_moves_only_eligible_orders(client, make_admin):
+    headers, other = make_admin(), make_admin("other@example.com")
+    (table_id,), (dal, _) = setup_menu(client, headers)
+    (other_table,), (other_dal, _) = setup_menu(client, other)
+    orders = [place_order(client, table_id, [(dal, 1)]) for _ in range(4)]
+    foreign = place_order(client, other_table, [(other_dal, 1)])
+    set_status(client, headers, orders[0], "served")
+    set_status(client, headers, orders[1], "cancelled")
+
+    with QueryLog() as log:
+        response = client.patch("/orders/status", json={"order_ids": [*orders, foreign], "status": "ready"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "updated": [{"id": orders[2], "version": 2}, {"id": orders[3], "version": 2}],
+        "skipped_ids": sorted([orders[0], orders[1], foreign]),
+    }
+    assert len([sql for sql in log.statements if sql.lstrip().startswith("UPDATE orders")]) == 1
+
+    # expected_status narrows the move and must itself be a legal transition
+    response = client.patch("/orders/status", json={
+        "order_ids": orders, "status": "served", "expected_status": "pending",
+    }, headers=headers)
+    assert response.json()["updated"] == []
+    response = client.patch("/orders/status", json={
+        "order_ids": orders, "status": "pending", "expected_status": "ready",
+    }, headers=headers)
+    assert response.status_code == 409
+
+
+# ---------- GROUP COMMIT ----------
+
+def place_concurrently(client, table_id, dish, count, threads=16) -> list:
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(threads) as pool:
+        return list(pool.map(lambda _: place_order(client, table_id, [(dish, 1)]), range(count)))
+
+
+def test_group_commit_batches_orders_and_gives_each_its_own_id(client, make_admin, monkeypatch):
+    from app import order_ingest
+
+    monkeypatch.setattr(order_ingest, "ORDER_GROUP_COMMIT", True)
+    monkeypatch.setattr(order_ingest, "ORDER_BATCH_LINGER_MS", 20)
+    batch_sizes = []
+    write_orders = order_ingest.write_orders
+    monkeypatch.setattr(order_ingest, "write_orders", lambda db, orders: batch_sizes.append(len(orders)) or write_orders(db, orders))
+
+    headers = make_admin()
+    (table_id,), (dal, _) = setup_menu(client, headers)
+    order_ids = place_concurrently(client, table_id, dal, 60)
+
+    assert len(set(order_ids)) == 60
+    assert sum(batch_sizes) == 60 and max(batch_sizes) > 1
+    orders = client.get("/orders/", headers=headers).json()
+    assert sorted(order["id"] for order in orders) == sorted(order_ids)
+    bill = client.get(f"/bills/by-table-id/{table_id}", headers=headers).json()
+    assert (bill["order_count"], bill["subtotal"]) == (60, 6000.0)
+
+
+def test_group_commit_isolates_a_failing_order(client, make_admin, monkeypatch):
+    from app import order_ingest
+
+    headers = make_admin()
+    (table_id,), _ = setup_menu(client, headers)
+    orders = [order_ingest.PendingOrder(1, table_id, total, []) for total in (100, -1, 300)]
+    write_orders = order_ingest.write_orders
+
+    def write_or_fail(db, batch):
+        if any(order.total_amount < 0 for order in batch):
+            raise RuntimeError("bad order")
+        return write_orders(db, batch)
+
+    monkeypatch.setattr(order_ingest, "write_orders", write_or_fail)
+    batcher = order_ingest._Batcher.__new__(order_ingest._Batcher)   # no writer thread
+    batcher._commit(orders)
+
+    # The batch fails as a whole, then each order is retried on its own
+    assert isinstance(orders[1].future.exception(), RuntimeError)
+    saved = {orders[0].future.result(), orders[2].future.result()}
+    assert {order["id"] for order in client.get("/orders/", headers=headers).json()} == saved
+
+
+# ---------- EVENT LOG ----------
+
+def read_all_events(client, headers, limit=500) -> list:
+    events, after = [], 0
+    while True:
+        page = client.get("/orders/events", params={"after": after, "limit": limit}, headers=headers).json()
+        events += page["events"]
+        after = page["next_offset"]
+        if not page["has_more"]:
+            return events
+
+
+def test_event_log_pages_by_offset(client, make_admin):
+    headers = make_admin()
+    (table_id,), (dal, _) = setup_menu(client, headers)
+    order_id = place_order(client, table_id, [(dal, 2)])
+    set_status(client, headers, order_id, "accepted")
+    set_status(client, headers, order_id, "accepted", estimated_time="10 min")
+    set_status(client, headers, order_id, "pending")   # refused: no event
+    client.delete(f"/orders/{order_id}", headers=headers)
+
+    events = read_all_events(client, headers, limit=2)
+    assert [(event["seq"], event["type"]) for event in events] == [
+        (1, "created"), (2, "status_changed"), (3, "updated"), (4, "deleted"),
+    ]
+    assert all(event["order_id"] == order_id for event in events)
+    assert events[0]["payload"]["items"][0]["quantity"] == 2
+    assert events[1]["payload"]["previous_status"] == "pending"
+
+    # A caught-up consumer gets an empty page and keeps its offset
+    assert client.get("/orders/events", params={"after": 4}, headers=headers).json() == {
+        "events": [], "next_offset": 4, "has_more": False,
+    }
+
+
+def test_event_offsets_stay_gap_free_under_group_commit(client, make_admin, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app import order_ingest
+
+    monkeypatch.setattr(order_ingest, "ORDER_GROUP_COMMIT", True)
+    tenants = []
+    for email in ("first@example.com", "second@example.com"):
+        headers = make_admin(email)
+        (table_id,), (dal, _) = setup_menu(client, headers)
+        tenants.append((headers, table_id, dal))
+
+    # Both tenants' orders share the writer's batches
+    with ThreadPoolExecutor(2) as pool:
+        placed = list(pool.map(lambda tenant: place_concurrently(client, tenant[1], tenant[2], 30, threads=8), tenants))
+
+    for (headers, _, _), order_ids in zip(tenants, placed):
+        events = read_all_events(client, headers, limit=7)
+        assert [event["seq"] for event in events] == list(range(1, 31))
+        assert sorted(event["order_id"] for event in events) == sorted(order_ids)
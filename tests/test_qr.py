@@ -0,0 +1,22 @@
+from io import BytesIO
+
+from PIL import Image
+
+
+def qr_png(client, headers, **params):
+    table_id = client.post("/tables/", json={"table_number": 1}, headers=headers).json()["id"]
+    response = client.get(f"/api/qr/{table_id}", params={"format": "png", **params})
+    assert response.status_code == 200, response.text
+    return Image.open(BytesIO(response.content))
+
+
+def test_screen_png_has_no_print_size(client, make_admin):
+    image = qr_png(client, make_admin())
+    assert "dpi" not in image.info
+
+
+def test_print_png_is_tagged_with_its_resolution(client, make_admin):
+    image = qr_png(client, make_admin(), size_mm=50, dpi=300)
+    assert round(image.info["dpi"][0]) == 300
+    # At least the requested 50 mm of code at 300 dpi
+    assert image.width >= 50 / 25.4 * 300
@@ -0,0 +1,134 @@
+import json
+
+from sqlalchemy import event
+
+from app.db import Base, engine
+
+ADMINS = 3
+TABLES_PER_ADMIN = 10
+ITEMS_PER_ADMIN = 12
+ORDERS_PER_ADMIN = 30
+
+
+# ---------- SEEDING ----------
+
+def seed(client, make_admin):
+    """A few tenants with tables, menus and orders, created through the API."""
+    tenants = []
+    for n in range(1, ADMINS + 1):
+        headers = make_admin(f"admin{n}@example.com")
+
+        tables = client.post("/tables/bulk", json={"start": 1, "end": TABLES_PER_ADMIN}, headers=headers).json()["created"]
+        items = [
+            client.post("/menu/", json={
+                "name": f"Dish {i}", "food_category_name": f"Category {i % 3}",
+                "quantity_prices": [{"quantity_type": "full", "price": 100 + i}, {"quantity_type": "half", "price": 60 + i}],
+            }, headers=headers).json()
+            for i in range(ITEMS_PER_ADMIN)
+        ]
+        order_ids = [
+            client.post("/orders/", json={
+                "table_id": tables[i % len(tables)]["id"],
+                "items": [
+                    {"menu_item_id": items[i % len(items)]["id"], "quantity": 1, "selected_type": "full"},
+                    {"menu_item_id": items[(i + 1) % len(items)]["id"], "quantity": 2, "selected_type": "half"},
+                ],
+            }).json()["order_id"]
+            for i in range(ORDERS_PER_ADMIN)
+        ]
+        tenants.append({"headers": headers, "tables": tables, "items": items, "order_ids": order_ids})
+    return tenants
+
+
+def ok(response):
+    assert response.status_code < 400, f"{response.request.method} {response.request.url}: {response.text}"
+    return response
+
+
+def hot_requests(client, tenant):
+    """The requests behind the busiest screens: customer menu and ordering, kitchen, admin dashboard."""
+    headers, table_id = tenant["headers"], tenant["tables"][0]["id"]
+    item_id, order_id = tenant["items"][0]["id"], tenant["order_ids"][0]
+
+    ok(client.get(f"/menu/public/by-table-id/{table_id}"))
+    ok(client.get(f"/menu/public/categories/by-table-id/{table_id}"))
+    ok(client.get(f"/menu/public/changes/by-table-id/{table_id}", params={"since": 5}))
+    ok(client.post("/orders/", json={"table_id": table_id, "items": [{"menu_item_id": item_id, "quantity": 1, "selected_type": "full"}]}))
+
+    ok(client.get("/menu/", headers=headers))
+    ok(client.get("/menu/changes", params={"since": 5}, headers=headers))
+    ok(client.patch(f"/menu/{item_id}", json={"is_available": False}, headers=headers))
+    ok(client.get("/tables/", headers=headers))
+    ok(client.get("/orders/", headers=headers))
+    ok(client.get("/orders/prep-list", headers=headers))
+    ok(client.get("/orders/events", params={"after": 10}, headers=headers))
+    ok(client.get("/orders/history", params={"secret_key": "secret"}, headers=headers))
+    ok(client.get("/dashboard/bootstrap", headers=headers))
+    ok(client.patch(f"/orders/{order_id}/status", params={"status": "accepted"}, headers=headers))
+    ok(client.patch("/orders/status", json={"order_ids": tenant["order_ids"][1:5], "status": "accepted"}, headers=headers))
+    ok(client.get(f"/bills/by-table-id/{table_id}", headers=headers))
+    ok(client.delete(f"/orders/{tenant['order_ids'][-1]}", headers=headers))
+
+
+# ---------- PLANS ----------
+
+def _sqlite_full_scans(conn, sql, params) -> list:
+    rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+    # "SCAN orders" reads every row; "SEARCH ..." and "SCAN ... USING INDEX" do not
+    return [row[-1] for row in rows if row[-1].startswith("SCAN ") and " USING " not in row[-1]]
+
+
+def _postgres_full_scans(conn, sql, params) -> list:
+    plan = conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + sql, params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    found, nodes = [], [plan[0]["Plan"]]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            found.append(f"Seq Scan on {node['Relation Name']}")
+        nodes.extend(node.get("Plans", ()))
+    return found
+
+
+def test_hot_requests_never_scan_a_whole_table(client, make_admin):
+    tenants = seed(client, make_admin)
+
+    statements = {}
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.setdefault(statement, parameters)
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        hot_requests(client, tenants[1])
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    assert statements, "no queries captured"
+
+    full_scans = _postgres_full_scans if engine.dialect.name == "postgresql" else _sqlite_full_scans
+    failures = []
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            # With seq scans off, whatever still scans has no usable index at all
+            conn.exec_driver_sql("SET enable_seqscan = off")
+        for sql, params in statements.items():
+            scans = full_scans(conn, sql, params)
+            if scans:
+                failures.append(f"{', '.join(scans)}: {' '.join(sql.split())}")
+        conn.rollback()
+    assert not failures, "Hot queries without a usable index:\n" + "\n".join(failures)
+
+
+def test_foreign_keys_are_indexed():
+    """Deleting a parent row looks up its children by the FK column; without an
+    index that is a full scan of the child table per deleted row."""
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        leading_columns = {index.columns[0].name for index in table.indexes}
+        leading_columns |= {constraint.columns[0].name for constraint in table.constraints if constraint.columns and not hasattr(constraint, "elements")}
+        for fk in table.foreign_keys:
+            if fk.parent.name not in leading_columns and not fk.parent.primary_key:
+                missing.append(f"{table.name}.{fk.parent.name}")
+    assert not missing, f"Foreign keys without an index: {', '.join(sorted(missing))}"
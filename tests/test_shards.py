@@ -0,0 +1,124 @@
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app import shards
+from app.db import Base
+from app.models import (
+    Admin, FoodCategory, MenuItem, MenuItemQuantityPrice, Order, OrderEvent, OrderItem, QuantityEnum, Table,
+    TableDirectory, TableSession,
+)
+
+
+def make_shard(path):
+    shard = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(shard)
+    return shard
+
+
+def seed_menu(db: Session, admin_id: int, dishes: int):
+    db.add(Admin(id=admin_id, name="n", email=f"{admin_id}@example.com", contact="0",
+                 restaurant_name=f"R{admin_id}", hashed_password="x"))
+    category = FoodCategory(name="main", admin_id=admin_id)
+    db.add(category)
+    db.flush()
+    items = [MenuItem(name=f"Dish {admin_id}.{n}", admin_id=admin_id, food_category_id=category.id) for n in range(dishes)]
+    db.add_all(items)
+    db.flush()
+    for item in items:
+        db.add(MenuItemQuantityPrice(menu_item_id=item.id, quantity_type=QuantityEnum.full, price=100))
+    return items
+
+
+def test_copy_tenant_remaps_ids_across_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(shards, "MOVE_BATCH_SIZE", 2)
+    source, target = make_shard(tmp_path / "source.db"), make_shard(tmp_path / "target.db")
+
+    # The target already has another tenant, so copied rows get new ids
+    with Session(target) as db:
+        seed_menu(db, admin_id=2, dishes=3)
+        db.commit()
+
+    with Session(source) as db:
+        items = seed_menu(db, admin_id=1, dishes=5)
+        db.add(Table(id=40, table_number=1, admin_id=1))
+        for n, item in enumerate(items):
+            order = Order(table_id=40, admin_id=1, total_amount=100)
+            db.add(order)
+            db.flush()
+            db.add(OrderItem(order_id=order.id, menu_item_id=item.id, quantity=n + 1,
+                             selected_type=QuantityEnum.full, price_at_order=100, item_name=item.name))
+        db.commit()
+
+    copied = shards._copy_tenant(1, source, target)
+    assert copied == 1 + 5 + 5 + 1 + 5 + 5   # categories, items, prices, table, orders, order items
+
+    with Session(target) as db:
+        assert db.get(Table, 40).table_number == 1
+        lines = db.scalars(select(OrderItem).join(Order).where(Order.admin_id == 1).order_by(OrderItem.quantity)).all()
+        assert [(line.quantity, line.menu_item.name, line.menu_item.admin_id) for line in lines] == [
+            (n + 1, f"Dish 1.{n}", 1) for n in range(5)
+        ]
+        assert all(line.order.table_id == 40 for line in lines)
+        prices = db.scalars(select(MenuItemQuantityPrice).join(MenuItem).where(MenuItem.admin_id == 1)).all()
+        assert len(prices) == 5
+
+
+def test_copy_tenant_renumbers_ids_inside_event_payloads(tmp_path):
+    source, target = make_shard(tmp_path / "source.db"), make_shard(tmp_path / "target.db")
+
+    # Bill and dish ids on the target are already taken by another tenant
+    with Session(target) as db:
+        seed_menu(db, admin_id=2, dishes=2)
+        db.add(Table(id=50, table_number=1, admin_id=2))
+        db.add_all([TableSession(admin_id=2, table_id=50, table_number=1, status="closed") for _ in range(3)])
+        db.commit()
+
+    with Session(source) as db:
+        (dish,) = seed_menu(db, admin_id=1, dishes=1)
+        db.add(Table(id=40, table_number=1, admin_id=1))
+        bill = TableSession(admin_id=1, table_id=40, table_number=1)
+        db.add(bill)
+        db.flush()
+        order = Order(table_id=40, admin_id=1, total_amount=100, table_session_id=bill.id)
+        db.add(order)
+        db.flush()
+        db.add_all([
+            OrderEvent(admin_id=1, seq=1, order_id=order.id, type="created", payload={
+                "status": "pending", "table_id": 40, "table_session_id": bill.id,
+                "items": [{"menu_item_id": dish.id, "quantity": 1}],
+            }),
+            OrderEvent(admin_id=1, seq=2, order_id=order.id, type="status_changed", payload={"status": "accepted"}),
+            # A bill deleted before the move
+            OrderEvent(admin_id=1, seq=3, order_id=None, type="deleted", payload={"table_session_id": 999}),
+        ])
+        db.commit()
+        old_bill_id = bill.id
+
+    shards._copy_tenant(1, source, target)
+
+    with Session(target) as db:
+        moved_bill = db.scalars(select(TableSession).where(TableSession.admin_id == 1)).one()
+        moved_dish = db.scalars(select(MenuItem).where(MenuItem.admin_id == 1)).one()
+        created, changed, deleted = db.scalars(
+            select(OrderEvent).where(OrderEvent.admin_id == 1).order_by(OrderEvent.seq)
+        ).all()
+        assert created.payload["table_session_id"] == moved_bill.id != old_bill_id
+        assert created.payload["items"] == [{"menu_item_id": moved_dish.id, "quantity": 1}]
+        assert created.payload["table_id"] == 40
+        assert changed.payload == {"status": "accepted"}
+        assert deleted.payload == {"table_session_id": None}
+
+
+def test_table_directory_never_reuses_ids(db):
+    db.add(Admin(id=1, name="n", email="a@example.com", contact="0", restaurant_name="R", hashed_password="x"))
+    newest = TableDirectory(admin_id=1)
+    db.add_all([TableDirectory(admin_id=1), newest])
+    db.commit()
+    newest_id = newest.id
+
+    db.delete(newest)
+    db.commit()
+    replacement = TableDirectory(admin_id=1)
+    db.add(replacement)
+    db.commit()
+    assert replacement.id > newest_id
@@ -0,0 +1,67 @@
+import os
+import runpy
+import subprocess
+import sys
+
+import pytest
+
+# Cold starts on autoscaled instances pay this import before the first request
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 1500))
+
+# Timing noise only ever adds time, so the fastest of a few fresh imports is compared
+IMPORT_RUNS = 3
+
+# Heavy dependencies only a few endpoints need; they are imported inside those endpoints
+LAZY_MODULES = ("qrcode", "PIL", "sendgrid")
+
+
+def import_times(module: str) -> dict:
+    """Cumulative import time in microseconds of every module loaded by `import module`,
+    measured in a fresh interpreter so nothing is already cached in sys.modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=os.environ.copy(),
+    )
+    assert result.returncode == 0, f"import {module} failed:\n{result.stderr}"
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def test_app_import_stays_within_budget_and_skips_lazy_modules():
+    timings = min((import_times("app.main") for _ in range(IMPORT_RUNS)), key=lambda run: run["app.main"])
+
+    eager = sorted(name for name in timings if name in LAZY_MODULES)
+    assert not eager, f"Imported eagerly: {', '.join(eager)}"
+
+    total_ms = timings["app.main"] / 1000.0
+    slowest = sorted(((us, name) for name, us in timings.items() if "." not in name), reverse=True)[:10]
+    assert total_ms <= IMPORT_BUDGET_MS, (
+        f"import app.main: {total_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms); slowest: "
+        + ", ".join(f"{name} {us / 1000.0:.0f} ms" for us, name in slowest)
+    )
+
+
+def test_factory_builds_independent_apps():
+    from app.main import app, create_app
+
+    fresh = create_app()
+    assert fresh is not app
+    assert {route.path for route in fresh.routes} == {route.path for route in app.routes}
+
+
+def test_gunicorn_refuses_several_workers_on_the_in_process_cache(monkeypatch):
+    from app import cache
+    assert isinstance(cache.backend, cache.MemoryCache)   # CACHE_URL=memory:// in conftest
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    with pytest.raises(RuntimeError, match="shared cache"):
+        runpy.run_path("gunicorn.conf.py")
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "1")
+    assert runpy.run_path("gunicorn.conf.py")["workers"] == 1
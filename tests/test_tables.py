@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app.models import Table, TableDirectory
+from tests.helpers import QueryLog
+
+
+def add_table(client, headers, number):
+    return client.post("/tables/", json={"table_number": number}, headers=headers)
+
+
+# ---------- UNIQUE TABLE NUMBERS ----------
+
+def test_table_numbers_are_unique_per_restaurant(client, make_admin):
+    headers, other = make_admin(), make_admin("other@example.com")
+    first = add_table(client, headers, 1).json()
+    assert add_table(client, other, 1).status_code == 200   # another restaurant's table 1
+
+    response = add_table(client, headers, 1)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Table number already exists."
+
+    second = add_table(client, headers, 2).json()
+    assert client.put(f"/tables/{second['id']}", json={"table_number": 1}, headers=headers).status_code == 400
+    assert [table["table_number"] for table in client.get("/tables/", headers=headers).json()] == [1, 2]
+    assert first["id"] != second["id"]
+
+
+def test_the_database_enforces_unique_table_numbers(db, make_admin):
+    make_admin()
+    db.execute(insert(Table), [{"id": 1, "admin_id": 1, "table_number": 7}])
+    with pytest.raises(IntegrityError):
+        db.execute(insert(Table), [{"id": 2, "admin_id": 1, "table_number": 7}])
+
+
+# ---------- BULK CREATE ----------
+
+def test_bulk_create_skips_existing_numbers_in_one_insert(client, make_admin):
+    headers = make_admin()
+    add_table(client, headers, 3)
+
+    with QueryLog() as log:
+        response = client.post("/tables/bulk", json={"start": 1, "end": 5}, headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert [table["table_number"] for table in body["created"]] == [1, 2, 4, 5]
+    assert body["existing_table_numbers"] == [3]
+    assert len([sql for sql in log.statements if sql.lstrip().startswith("INSERT INTO tables")]) == 1
+
+    # Created rows are ready for QR generation
+    table_id = body["created"][0]["id"]
+    assert client.get(f"/api/qr/{table_id}", params={"format": "svg"}).status_code == 200
+
+    # Directory ids the insert did not use are handed back
+    response = client.post("/tables/bulk", json={"table_numbers": [5, 4, 6, 6]}, headers=headers).json()
+    assert [table["table_number"] for table in response["created"]] == [6]
+    assert response["existing_table_numbers"] == [4, 5]
+
+
+def test_bulk_create_leaves_no_orphan_directory_ids(client, make_admin, db):
+    headers = make_admin()
+    client.post("/tables/bulk", json={"start": 1, "end": 10}, headers=headers)
+    client.post("/tables/bulk", json={"start": 5, "end": 15}, headers=headers)
+    assert db.scalar(select(func.count()).select_from(TableDirectory)) == 15
+    assert db.scalar(select(func.count()).select_from(Table)) == 15
+
+
+@pytest.mark.parametrize("payload", [
+    {},
+    {"start": 5},
+    {"start": 5, "end": 1},
+    {"start": 1, "end": 10, "table_numbers": [1]},
+    {"start": 1, "end": 501},
+])
+def test_bulk_create_rejects_bad_requests(client, make_admin, payload):
+    assert client.post("/tables/bulk", json=payload, headers=make_admin()).status_code == 422